@@ -0,0 +1,101 @@
+import numpy as np
+
+# MediaPipe Pose landmark indices for the body parts used in rep counting
+LANDMARKS = {
+    'nose': 0,
+    'left_shoulder': 11, 'right_shoulder': 12,
+    'left_elbow': 13, 'right_elbow': 14,
+    'left_wrist': 15, 'right_wrist': 16,
+    'left_hip': 23, 'right_hip': 24,
+    'left_knee': 25, 'right_knee': 26,
+    'left_ankle': 27, 'right_ankle': 28
+}
+
+# Landmark names (without the side prefix) that make up each joint angle,
+# ordered as (first point, vertex, third point)
+JOINT_TRIPLES = {
+    'elbow': ('shoulder', 'elbow', 'wrist'),
+    'shoulder': ('elbow', 'shoulder', 'hip'),
+    'knee': ('hip', 'knee', 'ankle'),
+    'hip': ('shoulder', 'hip', 'knee'),
+}
+
+# Vectors shorter than this are treated as degenerate (coincident landmarks)
+MIN_VECTOR_NORM = 1e-9
+
+
+def joint_triple_indices(landmarks, joint_name, side='right'):
+    """
+    Resolve a joint name to the three landmark indices that define its angle.
+
+    Args:
+        landmarks (dict): Mapping of landmark names to MediaPipe indices
+        joint_name (str): One of 'elbow', 'shoulder', 'knee', 'hip'
+        side (str): 'left' or 'right'
+
+    Returns:
+        tuple: Landmark indices (point1, vertex, point3)
+    """
+    if joint_name not in JOINT_TRIPLES:
+        raise ValueError(f"Unknown joint name: {joint_name}")
+    prefix = f"{side}_"
+    return tuple(landmarks[prefix + name] for name in JOINT_TRIPLES[joint_name])
+
+
+def joint_angles(points, use_z=False):
+    """
+    Calculate the angle at the vertex of many point triples at once (in degrees).
+
+    Args:
+        points (np.array): Array of shape (N, 3, 2) or (N, 3, 3) holding
+            (point1, vertex, point3) for each frame
+        use_z (bool): Use the z coordinate as well (requires 3D input)
+
+    Returns:
+        np.array: Array of N angles; frames where either vector has zero
+            length are NaN
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if points.ndim != 3 or points.shape[1] != 3 or points.shape[2] not in (2, 3):
+        raise ValueError(f"Expected points of shape (N, 3, 2|3), got {points.shape}")
+    if use_z:
+        if points.shape[2] != 3:
+            raise ValueError("3D angles require (N, 3, 3) input")
+    else:
+        points = points[:, :, :2]
+
+    vector1 = points[:, 0] - points[:, 1]
+    vector2 = points[:, 2] - points[:, 1]
+
+    dot = np.einsum('ij,ij->i', vector1, vector2)
+    norm1 = np.sqrt(np.einsum('ij,ij->i', vector1, vector1))
+    norm2 = np.sqrt(np.einsum('ij,ij->i', vector2, vector2))
+    norms = norm1 * norm2
+
+    # Each vector on its own: a long limb cannot make up for a collapsed one
+    valid = (norm1 > MIN_VECTOR_NORM) & (norm2 > MIN_VECTOR_NORM)
+    cosine = np.divide(dot, norms, out=np.zeros_like(dot), where=valid)
+    np.clip(cosine, -1.0, 1.0, out=cosine)
+
+    angles = np.degrees(np.arccos(cosine))
+    angles[~valid] = np.nan
+    return angles
+
+
+def fill_missing(values):
+    """
+    Linearly interpolate NaN entries from their valid neighbours.
+
+    Args:
+        values (np.array): 1D signal that may contain NaN
+
+    Returns:
+        np.array: Signal without NaN (unchanged if it is all NaN)
+    """
+    missing = np.isnan(values)
+    if not missing.any() or missing.all():
+        return values
+    filled = values.copy()
+    idx = np.arange(len(values))
+    filled[missing] = np.interp(idx[missing], idx[~missing], values[~missing])
+    return filled
@@ -0,0 +1,276 @@
+import argparse
+import json
+import multiprocessing as mp
+import os
+import signal
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from metrics import to_log_data
+from presets import DEFAULT_PRESET, POSE_PRESETS
+
+VIDEO_EXTENSIONS = ('.mov', '.mp4')
+
+# Extra seconds the parent waits beyond the per-video timeout before giving up
+# on a worker that did not report back (e.g. it crashed)
+TIMEOUT_GRACE = 30
+
+# One ExerciseRepProcessor (and MediaPipe graph) per worker process
+_processor = None
+_init_seconds = 0.0
+_jobs_done = 0
+
+
+class VideoTimeout(Exception):
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise VideoTimeout()
+
+
+def _init_worker(preset, cache_dir):
+    """
+    Build the worker's ExerciseRepProcessor once, when the process starts.
+    """
+    global _processor, _init_seconds
+    start = time.perf_counter()
+    import cv2
+    from pose_cache import PoseCache
+    from reps import ExerciseRepProcessor
+
+    # Parallelism comes from the pool; keep OpenCV from oversubscribing cores
+    cv2.setNumThreads(1)
+    pose_cache = PoseCache(cache_dir) if cache_dir else None
+    _processor = ExerciseRepProcessor(preset, pose_cache=pose_cache)
+    _init_seconds = time.perf_counter() - start
+
+
+def _worker_info():
+    """
+    Report on the calling worker; submitting it also forces the worker to start.
+    """
+    return {'pid': os.getpid(), 'init_seconds': _init_seconds, 'jobs': _jobs_done}
+
+
+def _process_one(video_path, exercise_type, timeout, extract_options=None):
+    """
+    Count reps in one video inside a worker process.
+
+    Args:
+        video_path (str): Path to input video
+        exercise_type (str): Exercise type, or None to auto-detect
+        timeout (float): Seconds allowed for this video, or None
+        extract_options (dict, optional): Extra keyword arguments for extract_poses
+
+    Returns:
+        dict: Per-video result record
+    """
+    global _jobs_done
+    result = {
+        'video': video_path,
+        'status': 'ok',
+        'count': 0,
+        'exercise_type': None,
+        'peaks': [],
+        'boundaries': [],
+        'seconds': 0.0,
+        'worker': os.getpid(),
+    }
+    use_alarm = timeout is not None and hasattr(signal, 'SIGALRM')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    start = time.perf_counter()
+    try:
+        # Start every video with fresh tracking state
+        _processor.reset_tracking()
+        count, detected_type, smoothed, peaks = _processor.process_video(video_path, exercise_type, **(extract_options or {}))
+        if detected_type is None:
+            result['status'] = 'no_pose'
+        result['count'] = int(count)
+        result['exercise_type'] = detected_type
+        result['peaks'] = [int(p) for p in peaks] if peaks is not None else []
+        if smoothed is not None and peaks is not None:
+            result['boundaries'] = [list(b) for b in _processor.rep_boundaries(smoothed, peaks)]
+            result['rep_metrics'] = to_log_data(_processor.rep_metrics(smoothed, peaks, detected_type))['rep_metrics']
+    except VideoTimeout:
+        result['status'] = 'timeout'
+        result['error'] = f"Exceeded {timeout} seconds"
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = f"{type(e).__name__}: {e}"
+        result['traceback'] = traceback.format_exc()
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        result['seconds'] = time.perf_counter() - start
+        _jobs_done += 1
+
+    return result
+
+
+def find_videos(folder):
+    """
+    Recursively collect videos under a folder, skipping generated rep clips.
+
+    Args:
+        folder (str): Root folder
+
+    Returns:
+        list: Sorted video paths
+    """
+    videos = []
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = sorted(d for d in dirs if not d.endswith('_reps'))
+        for filename in sorted(files):
+            if filename.lower().endswith(VIDEO_EXTENSIONS):
+                videos.append(os.path.join(root, filename))
+    return videos
+
+
+def _failed_result(video_path, status, error):
+    return {'video': video_path, 'status': status, 'count': 0, 'exercise_type': None,
+            'peaks': [], 'error': error}
+
+
+def _print_result(result):
+    print(f"[{result['status']}] {result['video']}: {result['count']} reps "
+          f"({result.get('exercise_type')}, {result.get('seconds', 0.0):.1f}s)")
+
+
+def _run_jobs(video_paths, indices, workers, exercise_type, timeout, preset, cache_dir, max_jobs_per_worker,
+              results):
+    """
+    Process some of the videos in a fresh worker pool.
+
+    Args:
+        video_paths (list): Paths to all input videos
+        indices (list): Positions in video_paths to process
+        workers (int): Number of worker processes
+        results (dict): Position -> result record, filled in place
+
+    Returns:
+        list: Positions whose job was lost because a worker process died
+    """
+    # Spawned workers do not inherit a MediaPipe graph from the parent, and
+    # max_tasks_per_child requires a non-fork context
+    executor = ProcessPoolExecutor(max_workers=min(workers, len(indices)), mp_context=mp.get_context('spawn'),
+                                   initializer=_init_worker, initargs=(preset, cache_dir),
+                                   max_tasks_per_child=max_jobs_per_worker)
+    broken = []
+    try:
+        futures = [(index, executor.submit(_process_one, video_paths[index], exercise_type, timeout))
+                   for index in indices]
+        for index, future in futures:
+            path = video_paths[index]
+            try:
+                wait = None if timeout is None else timeout + TIMEOUT_GRACE
+                result = future.result(wait)
+            except BrokenProcessPool:
+                broken.append(index)
+                continue
+            except FutureTimeout:
+                result = _failed_result(path, 'timeout', "Worker did not report back")
+            except Exception as e:
+                result = _failed_result(path, 'error', f"{type(e).__name__}: {e}")
+            results[index] = result
+            _print_result(result)
+    finally:
+        # Kill rather than join so a hung worker cannot block the run
+        processes = list((executor._processes or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+    return broken
+
+
+def process_batch(video_paths, exercise_type=None, workers=None, timeout=None, summary_path=None,
+                  preset=DEFAULT_PRESET, cache_dir=None, max_jobs_per_worker=None):
+    """
+    Count reps in many videos in parallel, one MediaPipe graph per worker.
+
+    Args:
+        video_paths (list): Paths to input videos
+        exercise_type (str, optional): Exercise type for every video
+        workers (int, optional): Number of worker processes (default: CPU count)
+        timeout (float, optional): Seconds allowed per video
+        summary_path (str, optional): JSON file to write the summary to
+        preset (str): Pose configuration preset for the workers
+        cache_dir (str, optional): Pose landmark cache shared by the workers
+        max_jobs_per_worker (int, optional): Videos before a worker process is
+            replaced, bounding memory growth on long runs
+
+    Returns:
+        dict: Summary with per-video results and totals; a video whose worker
+            process died (e.g. killed for running out of memory) is recorded
+            as an error
+    """
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(video_paths)))
+    print(f"Processing {len(video_paths)} videos with {workers} workers")
+
+    start = time.perf_counter()
+    results = {}
+    queue = list(range(len(video_paths)))
+    while queue:
+        broken = _run_jobs(video_paths, queue, workers, exercise_type, timeout, preset, cache_dir,
+                           max_jobs_per_worker, results)
+        queue = []
+        if broken:
+            # A dead worker breaks every queued job, not just its own; retry them
+            # one at a time to find the video that killed it, then go back to
+            # the full pool for the rest
+            print(f"A worker process died; retrying {len(broken)} videos one at a time")
+            for i, index in enumerate(broken):
+                if _run_jobs(video_paths, [index], 1, exercise_type, timeout, preset, cache_dir,
+                             max_jobs_per_worker, results):
+                    results[index] = _failed_result(video_paths[index], 'error', "Worker process died")
+                    _print_result(results[index])
+                    queue = broken[i + 1:]
+                    break
+    results = [results[index] for index in range(len(video_paths))]
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        'workers': workers,
+        'preset': preset,
+        'exercise_type': exercise_type,
+        'timeout': timeout,
+        'total_seconds': elapsed,
+        'videos': len(results),
+        'succeeded': sum(r['status'] == 'ok' for r in results),
+        'failed': sum(r['status'] not in ('ok', 'no_pose') for r in results),
+        'results': results,
+    }
+
+    if summary_path:
+        with open(summary_path, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"Summary saved to {summary_path}")
+
+    print(f"Processed {summary['videos']} videos in {elapsed:.1f}s "
+          f"({summary['failed']} failed)")
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Count reps in a folder of videos using a process pool.")
+    parser.add_argument("folder", type=str, help="Folder (searched recursively) containing videos")
+    parser.add_argument("--exercise-type", type=str, default=None, help="Exercise type (auto-detect if omitted)")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds allowed per video")
+    parser.add_argument("--summary", type=str, default="batch_summary.json", help="Output summary JSON file")
+    parser.add_argument("--preset", type=str, default=DEFAULT_PRESET, choices=list(POSE_PRESETS),
+                        help="Pose model speed/accuracy preset")
+    parser.add_argument("--cache-dir", type=str, default=None,
+                        help="Directory of cached pose landmarks to reuse across runs")
+    parser.add_argument("--max-jobs-per-worker", type=int, default=None,
+                        help="Videos before a worker process is recycled to bound memory growth")
+
+    args = parser.parse_args()
+    process_batch(find_videos(args.folder), args.exercise_type, args.workers, args.timeout, args.summary,
+                  args.preset, args.cache_dir, args.max_jobs_per_worker)
@@ -0,0 +1,68 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from angles import joint_angles
+
+
+def legacy_angles(p1, p2, p3):
+    """
+    Reference implementation: the original per-frame loop from get_angle_over_time.
+    """
+    angles = []
+    for i in range(len(p1)):
+        vector1 = np.array(p1[i]) - np.array(p2[i])
+        vector2 = np.array(p3[i]) - np.array(p2[i])
+        cosine = np.dot(vector1, vector2) / (np.linalg.norm(vector1) * np.linalg.norm(vector2))
+        cosine = np.clip(cosine, -1.0, 1.0)
+        angles.append(np.degrees(np.arccos(cosine)))
+    return np.array(angles)
+
+
+def best_of(fn, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(csv_path, frames, repeats):
+    if csv_path:
+        df = pd.read_csv(csv_path)
+        points = np.empty((len(df), 3, 2))
+        # Right shoulder -> right elbow -> right wrist
+        for i, idx in enumerate((12, 14, 16)):
+            points[:, i, 0] = df[f'landmark_{idx}_x'].values
+            points[:, i, 1] = df[f'landmark_{idx}_y'].values
+        source = csv_path
+    else:
+        rng = np.random.default_rng(0)
+        points = rng.random((frames, 3, 2))
+        source = "synthetic"
+
+    p1, p2, p3 = points[:, 0].tolist(), points[:, 1].tolist(), points[:, 2].tolist()
+
+    legacy_time, legacy = best_of(lambda: legacy_angles(p1, p2, p3), repeats)
+    batched_time, batched = best_of(lambda: joint_angles(points), repeats)
+
+    if not np.allclose(legacy, batched, equal_nan=True):
+        raise AssertionError("Batched angles differ from the per-frame implementation")
+
+    print(f"Source: {source} ({len(points)} frames, best of {repeats})")
+    print(f"Per-frame loop: {legacy_time * 1e3:9.3f} ms")
+    print(f"Batched:        {batched_time * 1e3:9.3f} ms")
+    print(f"Speedup:        {legacy_time / batched_time:9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batched joint angles against the per-frame loop.")
+    parser.add_argument("--csv", type=str, default=None, help="Pose data CSV to take the right elbow from")
+    parser.add_argument("--frames", type=int, default=20000, help="Number of synthetic frames")
+    parser.add_argument("--repeats", type=int, default=5, help="Timing repetitions")
+
+    args = parser.parse_args()
+    main(args.csv, args.frames, args.repeats)
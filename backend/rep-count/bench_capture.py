@@ -0,0 +1,73 @@
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from mediapipe.framework.formats import landmark_pb2
+
+from landmark_store import NUM_LANDMARKS, POSE_COLUMNS, LandmarkBuffer
+
+
+def legacy_capture(poses):
+    """
+    Reference implementation: the original per-frame list building plus DataFrame.
+    """
+    data = []
+    for frame_count, pose_landmarks in enumerate(poses):
+        landmarks_row = []
+        for l in pose_landmarks.landmark:
+            landmarks_row.extend([l.x, l.y, l.z, l.visibility])
+        landmarks_row.append(frame_count)
+        data.append(landmarks_row)
+    return pd.DataFrame(data, columns=POSE_COLUMNS)
+
+
+def buffer_capture(poses):
+    buffer = LandmarkBuffer()
+    for frame_count, pose_landmarks in enumerate(poses):
+        buffer.append_pose(frame_count, pose_landmarks)
+    return buffer.to_sequence()
+
+
+def measure(fn, poses, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(poses)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    result = fn(poses)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return best, peak
+
+
+def main(frames, repeats):
+    # Distinct landmark messages per frame, as MediaPipe returns them
+    rng = np.random.default_rng(0)
+    poses = []
+    for values in rng.random((frames, NUM_LANDMARKS, 4)).astype(np.float32):
+        pose_landmarks = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z, visibility in values:
+            pose_landmarks.landmark.add(x=x, y=y, z=z, visibility=visibility)
+        poses.append(pose_landmarks)
+
+    legacy_time, legacy_peak = measure(legacy_capture, poses, repeats)
+    buffer_time, buffer_peak = measure(buffer_capture, poses, repeats)
+
+    print(f"Frames: {frames}")
+    print(f"Legacy lists + DataFrame: {1e6 * legacy_time / frames:.1f} us/frame, peak {legacy_peak / 2 ** 20:.1f} MiB")
+    print(f"Float32 buffer:           {1e6 * buffer_time / frames:.1f} us/frame, peak {buffer_peak / 2 ** 20:.1f} MiB")
+    print(f"Speedup: {legacy_time / buffer_time:.1f}x, memory: {legacy_peak / buffer_peak:.1f}x less")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark landmark capture into lists vs a preallocated buffer.")
+    parser.add_argument("--frames", type=int, default=20000, help="Number of frames to capture")
+    parser.add_argument("--repeats", type=int, default=3, help="Timing repeats (best is reported)")
+
+    args = parser.parse_args()
+    main(args.frames, args.repeats)
@@ -0,0 +1,78 @@
+import argparse
+import glob
+import os
+import time
+
+from decoding import make_decoder
+
+
+def benchmark(video_paths, configurations, stride=1, repeats=1):
+    """
+    Time full decodes of each video with each decoder configuration.
+
+    Args:
+        video_paths (list): Videos to decode
+        configurations (dict): Label -> decode option for make_decoder
+        stride (int): Frame stride to request
+        repeats (int): Decodes per video and configuration (best is kept)
+
+    Returns:
+        list: One dict per configuration with frames, seconds and fps
+    """
+    rows = []
+    for label, option in configurations.items():
+        decoder = make_decoder(option)
+        frames, seconds = 0, 0.0
+        for video_path in video_paths:
+            best = None
+            for _ in range(repeats):
+                start = time.perf_counter()
+                decoded = sum(1 for _ in decoder.frames(video_path, stride=stride))
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            frames += decoded
+            seconds += best
+        rows.append({'decoder': label, 'frames': frames, 'seconds': seconds,
+                     'fps': frames / seconds if seconds else 0.0})
+    return rows
+
+
+def main(paths, stride, max_size, repeats):
+    video_paths = []
+    for path in paths:
+        if os.path.isdir(path):
+            video_paths += sorted(p for p in glob.glob(os.path.join(path, '*'))
+                                  if p.lower().endswith(('.mov', '.mp4', '.avi', '.mkv')))
+        else:
+            video_paths.append(path)
+
+    configurations = {
+        'opencv default': {'backend': 'opencv', 'max_size': max_size},
+        'opencv threads=auto': {'backend': 'opencv', 'threads': 0, 'max_size': max_size},
+        'opencv hw_accel': {'backend': 'opencv', 'threads': 0, 'hw_accel': True, 'max_size': max_size},
+    }
+    try:
+        import av  # noqa: F401
+        configurations['pyav threads=1'] = {'backend': 'pyav', 'threads': 1, 'max_size': max_size,
+                                            'skip_nonref': False}
+        configurations['pyav threads=auto'] = {'backend': 'pyav', 'threads': 0, 'max_size': max_size,
+                                               'skip_nonref': False}
+        if stride > 1:
+            configurations['pyav skip non-ref'] = {'backend': 'pyav', 'threads': 0, 'max_size': max_size}
+    except ImportError:
+        print("PyAV not installed; benchmarking OpenCV only")
+
+    print(f"Decoding {len(video_paths)} videos, stride {stride}, max size {max_size}, {os.cpu_count()} CPUs")
+    for row in benchmark(video_paths, configurations, stride, repeats):
+        print(f"{row['decoder']:>20}: {row['frames']} frames in {row['seconds']:.2f}s ({row['fps']:.1f} fps)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark video decoder backends and settings.")
+    parser.add_argument("paths", type=str, nargs='+', help="Videos, or folders of videos, to decode")
+    parser.add_argument("--stride", type=int, default=1, help="Decode every n-th frame")
+    parser.add_argument("--max-size", type=int, default=None, help="Cap on the long side of decoded frames")
+    parser.add_argument("--repeats", type=int, default=1, help="Decodes per video (best is reported)")
+
+    args = parser.parse_args()
+    main(args.paths, args.stride, args.max_size, args.repeats)
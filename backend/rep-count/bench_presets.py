@@ -0,0 +1,59 @@
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from presets import POSE_PRESETS
+from reps import ExerciseRepProcessor
+
+
+def main(folder, exercise_type, presets, reference, limit):
+    videos = sorted(os.path.join(folder, f) for f in os.listdir(folder)
+                    if f.lower().endswith(('.mov', '.mp4')))[:limit]
+
+    counts = {}
+    rows = []
+    for preset in presets:
+        try:
+            processor = ExerciseRepProcessor(preset)
+        except Exception as e:
+            print(f"Skipping preset {preset}: {type(e).__name__}: {e}")
+            continue
+
+        for video_path in videos:
+            processor.reset_tracking()
+            start = time.perf_counter()
+            sequence, frame_count = processor.extract_landmarks(video_path, pipelined=False)
+            elapsed = time.perf_counter() - start
+
+            count = 0
+            if len(sequence):
+                count, _, _, _ = processor.count_reps(sequence=sequence,
+                                                      exercise_type=exercise_type)
+            counts[(preset, video_path)] = count
+            rows.append({'preset': preset, 'video': os.path.basename(video_path),
+                         'fps': frame_count / elapsed, 'count': count})
+
+    results = pd.DataFrame(rows)
+    results['count_error'] = [
+        abs(row.count - counts[(reference, os.path.join(folder, row.video))])
+        if (reference, os.path.join(folder, row.video)) in counts else float('nan')
+        for row in results.itertuples()
+    ]
+    print(results.to_string(index=False, float_format='%.2f'))
+    print()
+    print(f"Count error is relative to the {reference} preset")
+    print(results.groupby('preset', sort=False)[['fps', 'count_error']].mean().to_string(float_format='%.2f'))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure frames/sec and rep-count error for each pose preset.")
+    parser.add_argument("--folder", type=str, default="pose_data/good_shoulder_press", help="Folder of videos")
+    parser.add_argument("--exercise-type", type=str, default="shoulder_press", help="Exercise type to count")
+    parser.add_argument("--presets", type=str, nargs='+', default=list(POSE_PRESETS), help="Presets to measure")
+    parser.add_argument("--reference", type=str, default="balanced", help="Preset used as the accuracy reference")
+    parser.add_argument("--limit", type=int, default=None, help="Only benchmark the first N videos")
+
+    args = parser.parse_args()
+    main(args.folder, args.exercise_type, args.presets, args.reference, args.limit)
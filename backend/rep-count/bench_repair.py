@@ -0,0 +1,68 @@
+import argparse
+import time
+
+import numpy as np
+
+from landmark_store import LandmarkSequence, load_landmarks
+from repair import repair_landmarks
+
+
+def damage(sequence, rng, dropouts=4, dropout_frames=5, glitches=6, glitch_size=0.15, occlusions=3):
+    """
+    Copy of a sequence with the failure modes seen in real extractions: runs
+    of frames without a detection, single-frame landmark jumps and
+    low-visibility stretches where the estimate wanders.
+    """
+    landmarks = np.array(sequence.landmarks)
+    frames = np.array(sequence.frame_numbers)
+    num_frames = len(frames)
+
+    for _ in range(glitches):
+        i = rng.integers(num_frames)
+        landmarks[i, rng.integers(11, 17), :2] += glitch_size * rng.choice([-1, 1], 2)
+    for _ in range(occlusions):
+        i = rng.integers(num_frames - 4)
+        landmark = rng.integers(11, 17)
+        landmarks[i:i + 4, landmark, 3] = 0.1
+        landmarks[i:i + 4, landmark, :2] += rng.normal(0, 0.1, 2)
+
+    keep = np.ones(num_frames, dtype=bool)
+    for _ in range(dropouts):
+        i = rng.integers(num_frames - dropout_frames)
+        keep[i:i + dropout_frames] = False
+    return LandmarkSequence(landmarks[keep], frames[keep], sequence.metadata)
+
+
+def main(pose_paths, exercise_type, trials, seed):
+    from reps import ExerciseRepProcessor
+
+    rng = np.random.default_rng(seed)
+    raw = ExerciseRepProcessor(repair=False)
+    repaired = ExerciseRepProcessor(repair=True)
+    for pose_path in pose_paths:
+        sequence = load_landmarks(pose_path, mmap=False)
+        expected, _, _, _ = raw.count_reps(sequence=sequence, exercise_type=exercise_type)
+        errors = {'raw': 0, 'repaired': 0}
+        seconds = []
+        for _ in range(trials):
+            damaged = damage(sequence, rng)
+            start = time.perf_counter()
+            repair_landmarks(damaged)
+            seconds.append(time.perf_counter() - start)
+            for name, processor in (('raw', raw), ('repaired', repaired)):
+                count, _, _, _ = processor.count_reps(sequence=damaged, exercise_type=exercise_type)
+                errors[name] += abs(count - expected)
+        print(f"{pose_path}: {expected} reps clean; mean miscount over {trials} damaged copies: "
+              f"raw {errors['raw'] / trials:.2f}, repaired {errors['repaired'] / trials:.2f}; "
+              f"repair {1e3 * np.median(seconds):.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare rep counts on damaged pose data with and without repair.")
+    parser.add_argument("pose_paths", type=str, nargs='+', help="Stored pose data (.npz or .csv)")
+    parser.add_argument("--exercise-type", type=str, default="shoulder_press", help="Exercise type to count")
+    parser.add_argument("--trials", type=int, default=20, help="Damaged copies per clip")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+    args = parser.parse_args()
+    main(args.pose_paths, args.exercise_type, args.trials, args.seed)
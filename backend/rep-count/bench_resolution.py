@@ -0,0 +1,63 @@
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from reps import ExerciseRepProcessor
+
+SETTINGS = ['stretch@1000', 'letterbox@1000', 'letterbox@640', 'letterbox@256',
+            'cap@1000', 'cap@640', 'cap@480', 'native']
+
+
+def main(folder, exercise_type, settings, limit):
+    videos = sorted(os.path.join(folder, f) for f in os.listdir(folder)
+                    if f.lower().endswith(('.mov', '.mp4')))[:limit]
+    processor = ExerciseRepProcessor()
+
+    rows = []
+    for video_path in videos:
+        reference = None
+        for setting in settings:
+            processor.reset_tracking()
+            start = time.perf_counter()
+            sequence, frame_count = processor.extract_landmarks(video_path, pipelined=False, resize=setting)
+            elapsed = time.perf_counter() - start
+
+            count = 0
+            if len(sequence):
+                count, _, _, _ = processor.count_reps(sequence=sequence,
+                                                      exercise_type=exercise_type)
+            if reference is None:
+                reference = count
+            rows.append({
+                'video': os.path.basename(video_path),
+                'setting': setting,
+                'ms_per_frame': 1000 * elapsed / max(frame_count, 1),
+                'detected': len(sequence) / max(frame_count, 1),
+                'count': count,
+                'count_error': count - reference,
+            })
+
+    results = pd.DataFrame(rows)
+    summary = results.groupby('setting', sort=False).agg(
+        ms_per_frame=('ms_per_frame', 'mean'),
+        detected=('detected', 'mean'),
+        mean_abs_count_error=('count_error', lambda e: e.abs().mean()),
+    )
+    print(results.to_string(index=False, float_format='%.2f'))
+    print()
+    print(f"Count error is relative to {settings[0]}")
+    print(summary.to_string(float_format='%.2f'))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark per-frame latency and rep counts per inference resolution.")
+    parser.add_argument("--folder", type=str, default="pose_data/good_shoulder_press", help="Folder of videos")
+    parser.add_argument("--exercise-type", type=str, default="shoulder_press", help="Exercise type to count")
+    parser.add_argument("--settings", type=str, nargs='+', default=SETTINGS,
+                        help="Resize settings; the first is the accuracy reference")
+    parser.add_argument("--limit", type=int, default=None, help="Only benchmark the first N videos")
+
+    args = parser.parse_args()
+    main(args.folder, args.exercise_type, args.settings, args.limit)
@@ -0,0 +1,62 @@
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+from presets import DEFAULT_PRESET, POSE_PRESETS
+from processor_pool import ProcessorPool
+
+# Run in a fresh interpreter: what a single CLI invocation pays before and while counting
+COLD_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from reps import ExerciseRepProcessor
+imported = time.perf_counter()
+processor = ExerciseRepProcessor(sys.argv[3])
+built = time.perf_counter()
+processor.process_video(sys.argv[1], sys.argv[2] or None, output_format=None)
+done = time.perf_counter()
+print(json.dumps({'import': imported - start, 'graph': built - imported, 'process': done - built}))
+"""
+
+
+def cold_run(video_path, exercise_type, preset):
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', COLD_SCRIPT, video_path, exercise_type or '', preset],
+                            capture_output=True, text=True, check=True).stdout
+    total = time.perf_counter() - start
+    phases = json.loads(output.strip().splitlines()[-1])
+    return {'mode': 'cold', 'total': total, **phases}
+
+
+def main(video_path, exercise_type, preset, runs):
+    rows = [cold_run(video_path, exercise_type, preset) for _ in range(runs)]
+
+    start = time.perf_counter()
+    with ProcessorPool(workers=1, preset=preset) as pool:
+        pool_start = time.perf_counter() - start
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = pool.submit(video_path, exercise_type, extract_options={'output_format': None}).result()
+            rows.append({'mode': 'warm', 'total': time.perf_counter() - start, 'process': result['seconds']})
+
+    results = pd.DataFrame(rows)
+    print(results.to_string(index=False, float_format='%.2f'))
+    print()
+    print(f"Pool start (one-off, paid before the first request): {pool_start:.2f}s")
+    print(results.groupby('mode', sort=False).mean().to_string(float_format='%.2f'))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare cold-start and warm-pool latency for one video.")
+    parser.add_argument("video_path", type=str, help="Path to the input video file")
+    parser.add_argument("--exercise-type", type=str, default=None, help="Exercise type (auto-detect if omitted)")
+    parser.add_argument("--preset", type=str, default=DEFAULT_PRESET, choices=list(POSE_PRESETS),
+                        help="Pose model speed/accuracy preset")
+    parser.add_argument("--runs", type=int, default=3, help="Requests per mode")
+
+    args = parser.parse_args()
+    main(args.video_path, args.exercise_type, args.preset, args.runs)
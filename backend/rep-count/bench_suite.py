@@ -0,0 +1,231 @@
+import argparse
+import json
+import multiprocessing as mp
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from presets import DEFAULT_PRESET, POSE_PRESETS
+
+# Relative slowdown (per stage and video) tolerated before a run counts as a regression
+DEFAULT_THRESHOLD = 0.10
+
+# Stages shorter than this are too noisy to compare against the baseline
+MIN_COMPARABLE_SECONDS = 0.05
+
+STAGES = ('extract', 'count', 'split')
+
+
+def load_manifest(path):
+    """
+    Read a benchmark manifest.
+
+    The manifest lists videos (relative to the manifest's folder) with the
+    exercise type to count and, where known, the true number of reps:
+
+        {"videos": [{"video": "pose_data/.../good_sp1.mov",
+                     "exercise_type": "shoulder_press", "expected_reps": 3}, ...]}
+
+    Args:
+        path (str): Path to the manifest JSON
+
+    Returns:
+        list: Manifest entries with absolute video paths
+    """
+    with open(path) as f:
+        manifest = json.load(f)
+    root = os.path.dirname(os.path.abspath(path))
+    entries = []
+    for entry in manifest['videos']:
+        entry = dict(entry)
+        entry['path'] = os.path.join(root, entry['video'])
+        entries.append(entry)
+    return entries
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+
+
+def _run_video(entry, preset, extract_options):
+    """
+    Run every stage on one video; called in a fresh process so peak RSS is per video.
+    """
+    from instrumentation import MemorySink, instrumented
+    from reps import ExerciseRepProcessor
+
+    processor = ExerciseRepProcessor(preset)
+    sink = MemorySink()
+    record = {'video': entry['video'], 'exercise_type': entry['exercise_type'],
+              'expected_reps': entry.get('expected_reps')}
+    seconds = {}
+
+    with instrumented(sink):
+        start = time.perf_counter()
+        sequence = processor.extract_poses(entry['path'], output_format=None, **extract_options)
+        seconds['extract'] = time.perf_counter() - start
+        record['frames'] = 0 if sequence is None else len(sequence)
+
+        count, signal = 0, None
+        if sequence is not None:
+            start = time.perf_counter()
+            count, _, signal, _ = processor.count_reps(sequence=sequence, exercise_type=entry['exercise_type'])
+            seconds['count'] = time.perf_counter() - start
+
+        if signal is not None:
+            with tempfile.TemporaryDirectory() as output_dir:
+                start = time.perf_counter()
+                processor.split_video(entry['path'], signal, entry['exercise_type'], output_dir=output_dir)
+                seconds['split'] = time.perf_counter() - start
+
+    record['seconds'] = seconds
+    # Finer-grained stage timings (decode, resize, inference, ...) from the instrumentation layer
+    record['stages'] = {name: stats['total_seconds'] for name, stats in sink.summary()['timers'].items()}
+    record['fps'] = record['frames'] / seconds['extract'] if seconds['extract'] else 0.0
+    record['count'] = int(count)
+    expected = entry.get('expected_reps')
+    record['count_error'] = None if expected is None else int(count) - expected
+    record['peak_rss_mb'] = _peak_rss_mb()
+    return record
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(entries, preset=DEFAULT_PRESET, extract_options=None):
+    """
+    Benchmark every manifest entry, each in its own worker process.
+
+    Args:
+        entries (list): Entries from load_manifest
+        preset (str): Pose configuration preset
+        extract_options (dict, optional): Extra keyword arguments for extract_poses
+
+    Returns:
+        dict: Run settings, per-video records and a summary
+    """
+    extract_options = extract_options or {}
+    records = []
+    # maxtasksperchild=1 gives every video a fresh process (and RSS high-water mark)
+    with mp.get_context('spawn').Pool(1, maxtasksperchild=1) as pool:
+        for entry in entries:
+            record = pool.apply(_run_video, (entry, preset, extract_options))
+            print(f"{record['video']}: {record['count']} reps (expected {record['expected_reps']}), "
+                  f"{record['fps']:.1f} fps, peak RSS {record['peak_rss_mb']:.0f} MB")
+            records.append(record)
+
+    labelled = [r for r in records if r['count_error'] is not None]
+    summary = {
+        'videos': len(records),
+        'labelled': len(labelled),
+        'mean_abs_count_error': (sum(abs(r['count_error']) for r in labelled) / len(labelled)
+                                 if labelled else None),
+        'exact_counts': sum(r['count_error'] == 0 for r in labelled),
+        'total_frames': sum(r['frames'] for r in records),
+        'seconds': {stage: sum(r['seconds'].get(stage, 0.0) for r in records) for stage in STAGES},
+        'max_peak_rss_mb': max((r['peak_rss_mb'] for r in records), default=0.0),
+    }
+    summary['fps'] = (summary['total_frames'] / summary['seconds']['extract']
+                      if summary['seconds']['extract'] else 0.0)
+
+    return {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'preset': preset,
+        'extract_options': extract_options,
+        'results': records,
+        'summary': summary,
+    }
+
+
+def compare_with_baseline(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Find speed and accuracy regressions relative to a baseline run.
+
+    A stage regresses when it is more than `threshold` slower than in the
+    baseline; accuracy regresses when a video's absolute count error grows.
+
+    Args:
+        current (dict): Results of run_suite
+        baseline (dict): Earlier results of run_suite
+        threshold (float): Tolerated relative slowdown
+
+    Returns:
+        list: Human-readable regression descriptions (empty if none)
+    """
+    regressions = []
+    previous = {r['video']: r for r in baseline['results']}
+    for record in current['results']:
+        before = previous.get(record['video'])
+        if before is None:
+            continue
+        for stage in STAGES:
+            old, new = before['seconds'].get(stage), record['seconds'].get(stage)
+            if old is None or new is None or old < MIN_COMPARABLE_SECONDS:
+                continue
+            if new > old * (1 + threshold):
+                regressions.append(f"{record['video']}: {stage} {old:.2f}s -> {new:.2f}s "
+                                   f"(+{100 * (new / old - 1):.0f}%)")
+        if record['count_error'] is not None and before['count_error'] is not None:
+            if abs(record['count_error']) > abs(before['count_error']):
+                regressions.append(f"{record['video']}: count error {before['count_error']:+d} -> "
+                                   f"{record['count_error']:+d}")
+
+    old_fps, new_fps = baseline['summary']['fps'], current['summary']['fps']
+    if old_fps and new_fps < old_fps / (1 + threshold):
+        regressions.append(f"overall: {old_fps:.1f} -> {new_fps:.1f} fps")
+    return regressions
+
+
+def main(manifest_path, output_path, baseline_path, threshold, preset, limit):
+    entries = load_manifest(manifest_path)[:limit]
+    results = run_suite(entries, preset)
+
+    with open(output_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    summary = results['summary']
+    print(f"Results saved to {output_path}")
+    print(f"{summary['videos']} videos, {summary['fps']:.1f} fps, "
+          f"{summary['exact_counts']}/{summary['labelled']} labelled counts exact, "
+          f"peak RSS {summary['max_peak_rss_mb']:.0f} MB")
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, threshold)
+        if regressions:
+            print(f"Regressions against {baseline_path} (threshold {100 * threshold:.0f}%):")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"No regressions against {baseline_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark extraction, counting and splitting over a labelled manifest.")
+    parser.add_argument("--manifest", type=str, default="bench_manifest.json", help="Manifest of videos and true counts")
+    parser.add_argument("--output", type=str, default="bench_results.json", help="Where to write the results JSON")
+    parser.add_argument("--baseline", type=str, default=None, help="Earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative slowdown tolerated before failing")
+    parser.add_argument("--preset", type=str, default=DEFAULT_PRESET, choices=list(POSE_PRESETS),
+                        help="Pose model speed/accuracy preset")
+    parser.add_argument("--limit", type=int, default=None, help="Only benchmark the first N videos")
+
+    args = parser.parse_args()
+    sys.exit(main(args.manifest, args.output, args.baseline, args.threshold, args.preset, args.limit))
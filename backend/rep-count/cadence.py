@@ -0,0 +1,165 @@
+import numpy as np
+
+# Frame rate the hand-tuned peak detection constants were chosen for
+REFERENCE_FPS = 30.0
+
+# Plausible duration of one rep, in seconds
+MIN_PERIOD_SECONDS = 0.8
+MAX_PERIOD_SECONDS = 10.0
+
+# Normalised autocorrelation below which no cadence is trusted
+MIN_STRENGTH = 0.3
+
+# Detection parameters as fractions of the rep period (at a 75 frame period
+# these reproduce the original 15 frame window and width of 5)
+WINDOW_FRACTION = 0.2
+DISTANCE_FRACTION = 0.5
+WIDTH_FRACTION = 1 / 15
+
+
+def autocorrelation(signals):
+    """
+    Normalised autocorrelation of every row of a (signals, frames) array.
+
+    Computed with one zero-padded FFT per row, so it is O(n log n) rather
+    than the O(n^2) of np.correlate. Each row is detrended first so slow
+    drift (the lifter stepping back, camera auto-exposure) does not dominate
+    the long lags.
+
+    Args:
+        signals (np.array): 1D signal or 2D (signals, frames) array
+
+    Returns:
+        np.array: (signals, frames) autocorrelation, 1 at lag 0 (0 for flat rows)
+    """
+    signals = np.atleast_2d(np.nan_to_num(np.asarray(signals, dtype=np.float64)))
+    n = signals.shape[1]
+    t = np.arange(n) - (n - 1) / 2
+    slopes = (signals @ t) / (t @ t) if n > 1 else np.zeros(len(signals))
+    centered = signals - signals.mean(axis=1, keepdims=True) - slopes[:, None] * t
+
+    nfft = 1 << (2 * n - 1).bit_length()
+    spectrum = np.fft.rfft(centered, nfft, axis=1)
+    ac = np.fft.irfft(spectrum * np.conj(spectrum), nfft, axis=1)[:, :n]
+    energy = ac[:, :1]
+    return np.divide(ac, energy, out=np.zeros_like(ac), where=energy > 0)
+
+
+def estimate_period(signals, fps=REFERENCE_FPS, min_period=MIN_PERIOD_SECONDS, max_period=MAX_PERIOD_SECONDS):
+    """
+    Estimate the dominant repetition period of one or more signals.
+
+    The period is the lag of the highest autocorrelation peak after the
+    first zero crossing, within [min_period, max_period] seconds and at most
+    two thirds of the clip (so at least one full repeat is overlapped),
+    refined to sub-frame precision with a parabola through the peak.
+
+    Args:
+        signals (np.array): 1D signal or 2D (signals, frames) array
+        fps (float): Samples per second of the signals
+        min_period (float): Shortest rep considered, in seconds
+        max_period (float): Longest rep considered, in seconds
+
+    Returns:
+        tuple: (periods, strengths), arrays with one entry per signal. The
+            period is in frames (NaN where none was found) and the strength
+            is the normalised autocorrelation at that lag
+    """
+    ac = autocorrelation(signals)
+    rows, n = ac.shape
+    periods = np.full(rows, np.nan)
+    strengths = np.zeros(rows)
+
+    lo = max(2, int(np.floor(min_period * fps)))
+    hi = min(int(np.ceil(max_period * fps)), (2 * n) // 3, n - 2)
+    if hi <= lo:
+        return periods, strengths
+
+    lags = np.arange(n)
+    # Lags before the first zero crossing are the lag-0 peak's shoulder, not a repeat
+    negative = ac < 0
+    first_zero = np.where(negative.any(axis=1), negative.argmax(axis=1), n)
+    local_max = np.zeros_like(negative)
+    local_max[:, 1:-1] = (ac[:, 1:-1] > ac[:, :-2]) & (ac[:, 1:-1] >= ac[:, 2:])
+    valid = local_max & (lags >= lo) & (lags <= hi) & (lags > first_zero[:, None])
+
+    candidates = np.where(valid, ac, -np.inf)
+    best = candidates.argmax(axis=1)
+    found = np.isfinite(candidates[np.arange(rows), best])
+    if not found.any():
+        return periods, strengths
+
+    rows_found = np.flatnonzero(found)
+    lag = best[found]
+    left, center, right = ac[rows_found, lag - 1], ac[rows_found, lag], ac[rows_found, lag + 1]
+    curvature = left - 2 * center + right
+    offset = np.divide(0.5 * (left - right), curvature, out=np.zeros_like(center), where=curvature < 0)
+    periods[found] = lag + offset
+    strengths[found] = center
+    return periods, strengths
+
+
+def cadence_parameters(period, fps=REFERENCE_FPS, window_length=15, width=5, distance_between_peaks=15,
+                       polyorder=3, num_frames=None):
+    """
+    Derive smoothing and peak detection parameters from a rep period.
+
+    Without a usable period the given hand-tuned values are kept, rescaled
+    from REFERENCE_FPS to `fps` so the same tempo maps to the same settings.
+
+    Args:
+        period (float): Rep period in frames, or None / NaN if unknown
+        fps (float): Samples per second of the signal
+        window_length (int): Fallback Savitzky-Golay window at REFERENCE_FPS
+        width (int): Fallback peak width at REFERENCE_FPS
+        distance_between_peaks (int): Fallback peak spacing at REFERENCE_FPS
+        polyorder (int): Savitzky-Golay polynomial order (the window must exceed it)
+        num_frames (int, optional): Signal length, to keep the window shorter than it
+
+    Returns:
+        dict: 'window_length', 'width' and 'distance_between_peaks', in frames
+    """
+    if period is None or not np.isfinite(period):
+        scale = fps / REFERENCE_FPS
+        window_length *= scale
+        width *= scale
+        distance_between_peaks *= scale
+    else:
+        window_length = WINDOW_FRACTION * period
+        width = WIDTH_FRACTION * period
+        distance_between_peaks = DISTANCE_FRACTION * period
+
+    window_length = max(polyorder + 2, int(round(window_length)))
+    if num_frames is not None and num_frames - 1 >= polyorder + 2:
+        window_length = min(window_length, num_frames - 1)
+    if window_length % 2 == 0:
+        window_length += 1
+
+    return {
+        'window_length': window_length,
+        'width': max(1, int(round(width))),
+        'distance_between_peaks': max(1, int(round(distance_between_peaks))),
+    }
+
+
+def tune_detection(signals, fps=REFERENCE_FPS, min_strength=MIN_STRENGTH, **defaults):
+    """
+    Pick peak detection parameters for one or more signals from their cadence.
+
+    With several signals, the period of the most strongly periodic one is
+    used for all of them.
+
+    Args:
+        signals (np.array): 1D signal or 2D (signals, frames) array
+        fps (float): Samples per second of the signals
+        min_strength (float): Autocorrelation needed to trust the period
+        **defaults: Fallback values and polyorder for cadence_parameters
+
+    Returns:
+        tuple: (parameters from cadence_parameters, period in frames or None)
+    """
+    periods, strengths = estimate_period(signals, fps)
+    best = int(strengths.argmax())
+    period = float(periods[best]) if strengths[best] >= min_strength else None
+    num_frames = np.atleast_2d(signals).shape[1]
+    return cadence_parameters(period, fps, num_frames=num_frames, **defaults), period
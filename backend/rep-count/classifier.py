@@ -0,0 +1,219 @@
+import os
+
+import numpy as np
+
+from angles import LANDMARKS, JOINT_TRIPLES, joint_angles, joint_triple_indices
+from cadence import REFERENCE_FPS
+
+# Seconds of pose data the classifier looks at, from the start of a clip
+WINDOW_SECONDS = 3.0
+
+# Below this probability the caller should fall back to another method
+MIN_CONFIDENCE = 0.6
+
+# Model trained by train_classifier.py, loaded by default when present
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'exercise_classifier.npz')
+
+# Bumped whenever window_features changes, so stale models are rejected
+FEATURE_VERSION = 1
+
+_ANGLE_TRIPLES = np.array([joint_triple_indices(LANDMARKS, joint, side)
+                           for joint in JOINT_TRIPLES for side in ('left', 'right')])
+_SPREAD_LANDMARKS = np.array([LANDMARKS[name] for name in
+                              ('nose', 'left_wrist', 'right_wrist', 'left_ankle', 'right_ankle')])
+_SHOULDERS = np.array([LANDMARKS['left_shoulder'], LANDMARKS['right_shoulder']])
+_HIPS = np.array([LANDMARKS['left_hip'], LANDMARKS['right_hip']])
+
+
+def window_features(windows, scale=(1.0, 1.0)):
+    """
+    Fixed-length feature vectors for windows of pose landmarks.
+
+    Features do not depend on where the lifter stands, how large they appear
+    or how the camera is rotated:
+        joint angles: mean, standard deviation and range of both elbows,
+            shoulders, knees and hips (in units of 180 degrees)
+        body layout: mean distance and positional spread of the nose, wrists
+            and ankles around the hip midpoint, in torso lengths
+
+    Args:
+        windows (np.array): (frames, 33, >=2) landmarks of one window, or
+            (windows, frames, 33, >=2) for several windows of equal length
+        scale (tuple): Frame width and height, so x and y share units
+
+    Returns:
+        np.array: (features,) or (windows, features)
+    """
+    windows = np.asarray(windows)
+    single = windows.ndim == 3
+    if single:
+        windows = windows[None]
+    count, frames = windows.shape[:2]
+    xy = windows[..., :2].astype(np.float64) * np.asarray(scale, dtype=np.float64)
+
+    angles = joint_angles(xy[:, :, _ANGLE_TRIPLES].reshape(-1, 3, 2)).reshape(count, frames, -1) / 180.0
+    finite = np.isfinite(angles)
+    valid = np.maximum(finite.sum(axis=1), 1)
+    filled = np.where(finite, angles, 0.0)
+    angle_mean = filled.sum(axis=1) / valid
+    angle_std = np.sqrt(np.maximum((filled ** 2).sum(axis=1) / valid - angle_mean ** 2, 0.0))
+    angle_range = (np.where(finite, angles, -np.inf).max(axis=1) -
+                   np.where(finite, angles, np.inf).min(axis=1))
+    angle_range[~finite.any(axis=1)] = 0.0
+
+    hips = xy[:, :, _HIPS].mean(axis=2)
+    torso = np.linalg.norm(xy[:, :, _SHOULDERS].mean(axis=2) - hips, axis=2)
+    torso = np.median(torso, axis=1)
+    torso[~(torso > 0)] = 1.0
+    offsets = (xy[:, :, _SPREAD_LANDMARKS] - hips[:, :, None]) / torso[:, None, None, None]
+    distance = np.linalg.norm(offsets, axis=3).mean(axis=1)
+    spread = np.sqrt(offsets.var(axis=1).sum(axis=2))
+
+    features = np.concatenate([angle_mean, angle_std, angle_range, distance, spread], axis=1)
+    features = np.nan_to_num(features, nan=0.0, posinf=0.0, neginf=0.0)
+    return features[0] if single else features
+
+
+def window_frames(fps=None, window_seconds=WINDOW_SECONDS):
+    """
+    Number of pose samples in a classification window.
+    """
+    return max(2, int(round(window_seconds * (fps or REFERENCE_FPS))))
+
+
+def sequence_scale(sequence):
+    """
+    (width, height) of the video a sequence came from, or (1, 1) if unknown.
+    """
+    metadata = sequence.metadata or {}
+    return metadata.get('width') or 1.0, metadata.get('height') or 1.0
+
+
+class ExerciseClassifier:
+    """
+    Multinomial logistic regression over window_features.
+
+    Prediction is one standardisation and one small matrix product on top of
+    the feature extraction, so a window classifies in well under a
+    millisecond with nothing beyond NumPy.
+    """
+
+    def __init__(self, classes, mean, scale, weights, bias, window_seconds=WINDOW_SECONDS):
+        """
+        Args:
+            classes (list): Exercise type of each output
+            mean (np.array): Feature means from training
+            scale (np.array): Feature standard deviations from training
+            weights (np.array): (features, classes) weights
+            bias (np.array): (classes,) biases
+            window_seconds (float): Window length the model was trained on
+        """
+        self.classes = [str(c) for c in classes]
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.bias = np.asarray(bias, dtype=np.float64)
+        self.window_seconds = float(window_seconds)
+
+    @classmethod
+    def fit(cls, features, labels, window_seconds=WINDOW_SECONDS, iterations=500, learning_rate=0.5,
+            l2=1e-3):
+        """
+        Train on feature vectors with full-batch gradient descent.
+
+        Args:
+            features (np.array): (windows, features) from window_features
+            labels (list): Exercise type of each window
+            window_seconds (float): Window length the features were computed on
+            iterations (int): Gradient descent steps
+            learning_rate (float): Step size
+            l2 (float): Weight decay
+
+        Returns:
+            ExerciseClassifier: Trained model
+        """
+        classes, targets = np.unique(np.asarray(labels), return_inverse=True)
+        if len(classes) < 2:
+            raise ValueError(f"Need windows of at least two exercise types to train, got: {list(classes)}")
+
+        features = np.asarray(features, dtype=np.float64)
+        mean = features.mean(axis=0)
+        scale = features.std(axis=0)
+        scale[scale == 0] = 1.0
+        x = (features - mean) / scale
+        onehot = np.eye(len(classes))[targets]
+
+        weights = np.zeros((x.shape[1], len(classes)))
+        bias = np.zeros(len(classes))
+        for _ in range(iterations):
+            error = (_softmax(x @ weights + bias) - onehot) / len(x)
+            weights -= learning_rate * (x.T @ error + l2 * weights)
+            bias -= learning_rate * error.sum(axis=0)
+        return cls(classes, mean, scale, weights, bias, window_seconds)
+
+    def predict_proba(self, features):
+        """
+        Class probabilities for one or more feature vectors.
+        """
+        return _softmax((np.asarray(features) - self.mean) / self.scale @ self.weights + self.bias)
+
+    def classify(self, sequence, fps=None):
+        """
+        Classify a clip from its first window of pose data.
+
+        Args:
+            sequence (LandmarkSequence): Pose data of the clip (only the first
+                `window_seconds` are read)
+            fps (float, optional): Pose samples per second (default: from the
+                sequence metadata)
+
+        Returns:
+            tuple: (exercise type, probability)
+        """
+        fps = fps or (sequence.metadata or {}).get('fps')
+        window = sequence.landmarks[:window_frames(fps, self.window_seconds)]
+        probabilities = self.predict_proba(window_features(window, sequence_scale(sequence)))
+        best = int(probabilities.argmax())
+        return self.classes[best], float(probabilities[best])
+
+    def save(self, path):
+        np.savez(path, classes=np.array(self.classes), mean=self.mean, scale=self.scale,
+                 weights=self.weights, bias=self.bias, window_seconds=self.window_seconds,
+                 feature_version=FEATURE_VERSION)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as model:
+            if int(model['feature_version']) != FEATURE_VERSION:
+                raise ValueError(f"{path} was trained on an older feature set; retrain it")
+            return cls(model['classes'].tolist(), model['mean'], model['scale'], model['weights'],
+                       model['bias'], float(model['window_seconds']))
+
+
+def _softmax(logits):
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+def load_classifier(classifier=None):
+    """
+    Resolve an ExerciseRepProcessor `classifier` option.
+
+    Args:
+        classifier: None (the model at DEFAULT_MODEL_PATH if one has been
+            trained), False (no classifier), a model path, or an
+            ExerciseClassifier
+
+    Returns:
+        ExerciseClassifier: The model, or None
+    """
+    if classifier is False:
+        return None
+    if classifier is None:
+        if not os.path.exists(DEFAULT_MODEL_PATH):
+            return None
+        classifier = DEFAULT_MODEL_PATH
+    if isinstance(classifier, str):
+        return ExerciseClassifier.load(classifier)
+    return classifier
@@ -0,0 +1,193 @@
+import cv2
+
+DECODER_BACKENDS = ('opencv', 'pyav')
+
+
+def _scaled_size(width, height, max_size):
+    """
+    Frame size with the long side capped at max_size (never upscaled), or None.
+    """
+    if max_size is None or max(width, height) <= max_size:
+        return None
+    scale = max_size / max(width, height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+class OpenCVDecoder:
+    """
+    Decode with cv2.VideoCapture (FFmpeg backend).
+
+    Frames off the requested stride are only grabbed, not retrieved, which
+    skips their colour conversion and copy. With max_size, frames are
+    downscaled right after decoding.
+    """
+
+    def __init__(self, threads=None, hw_accel=False, max_size=None):
+        """
+        Args:
+            threads (int, optional): FFmpeg decoding threads (None keeps
+                OpenCV's default, 0 lets FFmpeg choose)
+            hw_accel (bool): Ask for any available hardware decoder (VAAPI,
+                D3D11, VideoToolbox, ...), falling back to software
+            max_size (int, optional): Cap on the long side of decoded frames
+        """
+        self.threads = threads
+        self.hw_accel = hw_accel
+        self.max_size = max_size
+
+    def open(self, video_path):
+        params = []
+        if self.threads is not None:
+            params += [cv2.CAP_PROP_N_THREADS, self.threads]
+        if self.hw_accel:
+            params += [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+        if not params:
+            return cv2.VideoCapture(video_path)
+        return cv2.VideoCapture(video_path, cv2.CAP_FFMPEG, params)
+
+    def frames(self, video_path, start_frame=0, end_frame=None, stride=1):
+        """
+        Decode a range of frames.
+
+        Args:
+            video_path (str): Path to the input video
+            start_frame (int): First frame to decode
+            end_frame (int): Frame to stop before (None reads to the end)
+            stride (int): Only return every `stride`-th frame from start_frame
+
+        Yields:
+            tuple: Frame number and BGR frame
+        """
+        cap = self.open(video_path)
+        if start_frame > 0:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        size = None
+        frame_number = start_frame
+        try:
+            while end_frame is None or frame_number < end_frame:
+                if (frame_number - start_frame) % stride:
+                    if not cap.grab():
+                        break
+                    frame_number += 1
+                    continue
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if self.max_size is not None:
+                    if size is None:
+                        size = _scaled_size(frame.shape[1], frame.shape[0], self.max_size) or False
+                    if size:
+                        frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+                yield frame_number, frame
+                frame_number += 1
+        finally:
+            cap.release()
+
+    def __repr__(self):
+        return f"opencv(threads={self.threads}, hw_accel={self.hw_accel}, max_size={self.max_size})"
+
+
+class PyAVDecoder:
+    """
+    Decode with PyAV (FFmpeg's libavcodec directly).
+
+    Compared with OpenCV, this exposes frame- and slice-threaded decoding,
+    scales and converts to BGR in a single swscale pass at the requested
+    size (no full-resolution BGR copy), and with a stride can tell the
+    decoder to skip non-reference frames outright. Skipped frames never
+    reach the caller, so frames are numbered from their timestamps; with
+    skipping on, the frames returned are the first available at or after
+    each stride step rather than exactly on it.
+    """
+
+    def __init__(self, threads=0, max_size=None, skip_nonref=True):
+        """
+        Args:
+            threads (int): Decoding threads (0 lets FFmpeg choose)
+            max_size (int, optional): Cap on the long side of decoded frames
+            skip_nonref (bool): With a stride above 1, have the decoder drop
+                non-reference frames (e.g. non-reference B-frames)
+        """
+        try:
+            import av
+        except ImportError:
+            raise RuntimeError("The PyAV decoder requires PyAV (pip install av)")
+        self.av = av
+        self.threads = threads
+        self.max_size = max_size
+        self.skip_nonref = skip_nonref
+
+    def frames(self, video_path, start_frame=0, end_frame=None, stride=1):
+        """
+        Decode a range of frames.
+
+        Args:
+            video_path (str): Path to the input video
+            start_frame (int): First frame to decode
+            end_frame (int): Frame to stop before (None reads to the end)
+            stride (int): Return one frame per `stride` frames from start_frame
+
+        Yields:
+            tuple: Frame number and BGR frame
+        """
+        with self.av.open(video_path) as container:
+            stream = container.streams.video[0]
+            stream.thread_type = 'AUTO'
+            stream.codec_context.thread_count = self.threads
+            if stride > 1 and self.skip_nonref:
+                stream.codec_context.skip_frame = 'NONREF'
+
+            frames_per_tick = float(stream.time_base * stream.average_rate)
+            first_pts = stream.start_time or 0
+            if start_frame > 0:
+                # Lands on the keyframe at or before start_frame; decode forward from there
+                container.seek(first_pts + int(start_frame / frames_per_tick), stream=stream, backward=True)
+
+            size = _scaled_size(stream.codec_context.width, stream.codec_context.height, self.max_size)
+            next_frame = start_frame
+            for frame in container.decode(stream):
+                if frame.pts is None:
+                    continue
+                frame_number = int(round((frame.pts - first_pts) * frames_per_tick))
+                if frame_number < next_frame:
+                    continue
+                if end_frame is not None and frame_number >= end_frame:
+                    break
+                if size is None:
+                    image = frame.to_ndarray(format='bgr24')
+                else:
+                    image = frame.to_ndarray(format='bgr24', width=size[0], height=size[1])
+                yield frame_number, image
+                next_frame = start_frame + ((frame_number - start_frame) // stride + 1) * stride
+
+    def __repr__(self):
+        return f"pyav(threads={self.threads}, max_size={self.max_size}, skip_nonref={self.skip_nonref})"
+
+
+def make_decoder(decode):
+    """
+    Build a frame decoder from an extract_poses `decode` option.
+
+    Args:
+        decode: None (cv2.VideoCapture with default settings), a backend
+            name from DECODER_BACKENDS, a dict with a 'backend' key plus
+            keyword arguments for that decoder, or a decoder object
+
+    Returns:
+        OpenCVDecoder or PyAVDecoder
+    """
+    if decode is None:
+        return OpenCVDecoder()
+    if isinstance(decode, str):
+        decode = {'backend': decode}
+    if isinstance(decode, dict):
+        options = dict(decode)
+        backend = options.pop('backend', 'opencv')
+        if backend == 'opencv':
+            return OpenCVDecoder(**options)
+        if backend == 'pyav':
+            return PyAVDecoder(**options)
+        raise ValueError(f"Unknown decoder backend: {backend}")
+    if hasattr(decode, 'frames'):
+        return decode
+    raise ValueError(f"Unknown decode option: {decode}")
@@ -0,0 +1,135 @@
+import numpy as np
+from scipy.signal import find_peaks, savgol_filter
+
+# Score at which a candidate is accepted without evaluating the rest
+EARLY_STOP_SCORE = 0.8
+
+# Orientations of one signal scoring within this margin count as a tie
+ORIENTATION_MARGIN = 0.1
+
+# Regularity assumed for two peaks, where one interval says nothing about spacing
+TWO_PEAK_REGULARITY = 0.5
+
+
+def periodicity_score(smoothed, peaks, prominences):
+    """
+    Rate how much a set of peaks looks like repeated reps.
+
+    The score is the product of three terms in [0, 1]:
+        regularity: 1 - coefficient of variation of the peak spacing
+        consistency: median / max peak prominence (partial reps at the start
+            or end of a clip lower the max less than they lower the mean)
+        strength: median prominence relative to the signal's range, so
+            small wiggles on a mostly flat signal score low
+
+    Args:
+        smoothed (np.array): Smoothed signal the peaks were found on
+        peaks (np.array): Peak indices
+        prominences (np.array): Prominence of each peak
+
+    Returns:
+        float: Score in [0, 1]; 0 for fewer than two peaks
+    """
+    if len(peaks) < 2:
+        return 0.0
+
+    if len(peaks) == 2:
+        regularity = TWO_PEAK_REGULARITY
+    else:
+        intervals = np.diff(peaks)
+        regularity = max(0.0, 1.0 - intervals.std() / intervals.mean())
+
+    median_prominence = np.median(prominences)
+    consistency = median_prominence / prominences.max()
+    signal_range = np.ptp(smoothed)
+    strength = min(1.0, median_prominence / signal_range) if signal_range > 0 else 0.0
+    return float(regularity * consistency * strength)
+
+
+def smooth_signals(signals, window_length=15, polyorder=3):
+    """
+    Savitzky-Golay smooth every row of a (signals, frames) array in one call.
+
+    Signals too short for the window are returned unsmoothed.
+    """
+    signals = np.asarray(signals, dtype=np.float64)
+    if signals.shape[1] <= window_length:
+        return signals
+    if window_length % 2 == 0:
+        window_length += 1
+    return savgol_filter(signals, window_length, polyorder, axis=1)
+
+
+def detect_reps_batched(signals, window_length=15, polyorder=3, prominence=0.2, width=5,
+                        distance_between_peaks=15, early_stop_score=EARLY_STOP_SCORE, smoothed=None):
+    """
+    Pick the most periodic of several candidate signals and detect reps on it.
+
+    All signals are smoothed together as one (signals, frames) array. Each
+    signal is then tried as is and inverted (Savitzky-Golay is linear, so the
+    inverted signal's smoothing is just the negation) and the better
+    orientation kept. Signals are evaluated in order and the search stops at
+    the first one whose periodicity_score reaches `early_stop_score`.
+
+    Args:
+        signals (dict): Candidate name -> 1D signal, all of the same length,
+            in the order they should be tried
+        window_length (int): Savitzky-Golay window length
+        polyorder (int): Savitzky-Golay polynomial order
+        prominence (float): Required peak prominence, as a fraction of the
+            signal's standard deviation
+        width (int): Required peak width in frames
+        distance_between_peaks (int): Minimum frames between peaks
+        early_stop_score (float): Score that ends the search early (None
+            evaluates every candidate)
+        smoothed (np.array, optional): Precomputed smoothing of the stacked
+            signals, e.g. from a cache
+
+    Returns:
+        dict: Best candidate with 'name', 'inverted', 'peaks', 'count',
+            'smoothed' (oriented as detected), 'score', and 'evaluated'
+            (number of signals tried). When no candidate has two peaks to
+            score (e.g. a single rep), the candidate with the most peaks;
+            None if there are no peaks at all
+    """
+    names = list(signals)
+    if smoothed is None:
+        smoothed = smooth_signals(np.stack([signals[name] for name in names]), window_length, polyorder)
+
+    best = None
+    most_peaks = None
+    evaluated = 0
+    for row, name in enumerate(names):
+        orientations = []
+        for inverted in (False, True):
+            candidate = -smoothed[row] if inverted else smoothed[row]
+            peaks, properties = find_peaks(candidate, prominence=prominence * np.std(candidate),
+                                           width=width, distance=distance_between_peaks)
+            score = periodicity_score(candidate, peaks, properties['prominences'])
+            orientations.append({'name': name, 'inverted': inverted, 'peaks': peaks, 'count': len(peaks),
+                                 'smoothed': candidate, 'score': score})
+        evaluated += 1
+        for orientation in orientations:
+            if most_peaks is None or orientation['count'] > most_peaks['count']:
+                most_peaks = orientation
+
+        # A clip of n reps has n extremes at the rep's turning point but only
+        # n - 1 between reps, so a near tie goes to the orientation with more peaks
+        normal, inverted = orientations
+        if abs(normal['score'] - inverted['score']) < ORIENTATION_MARGIN:
+            chosen = max(orientations, key=lambda o: (o['count'], o['score']))
+        else:
+            chosen = max(orientations, key=lambda o: o['score'])
+
+        if best is None or chosen['score'] > best['score']:
+            best = chosen
+        if early_stop_score is not None and chosen['score'] >= early_stop_score:
+            break
+
+    if best is None or best['score'] == 0.0:
+        # Periodicity needs two peaks, so a lone rep scores 0 everywhere
+        if most_peaks is None or most_peaks['count'] == 0:
+            return None
+        best = most_peaks
+    best['evaluated'] = evaluated
+    return best
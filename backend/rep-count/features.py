@@ -0,0 +1,70 @@
+class FeatureStore:
+    """
+    Memoized store for signals derived from one video's pose data.
+
+    Values are computed on first request and returned from the cache on every
+    later request with the same key, until the store is invalidated. Keys are
+    tuples such as ('angle', joint, side, dims) or
+    ('smoothed', signal_key, window_length, polyorder).
+    """
+
+    def __init__(self):
+        self._cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, compute):
+        """
+        Return the cached value for key, computing and storing it on a miss.
+
+        Args:
+            key (tuple): Hashable feature key
+            compute (callable): Zero-argument function producing the value
+
+        Returns:
+            The cached or freshly computed value
+        """
+        if key in self._cache:
+            self.hits += 1
+            return self._cache[key]
+
+        self.misses += 1
+        value = compute()
+        if hasattr(value, 'setflags'):
+            # Cached arrays are shared between callers, so guard against
+            # accidental in-place edits
+            value.setflags(write=False)
+        self._cache[key] = value
+        return value
+
+    def invalidate(self):
+        """
+        Drop all cached features (called whenever the pose data is replaced).
+        """
+        self._cache.clear()
+
+    def reset_stats(self):
+        """
+        Reset the hit/miss counters (ExerciseRepProcessor does this with
+        every invalidate, so stats cover one video's pose data).
+        """
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: Hits, misses, hit rate and number of cached entries
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'entries': len(self._cache),
+        }
+
+    def __len__(self):
+        return len(self._cache)
@@ -0,0 +1,279 @@
+import cProfile
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+
+# Active sinks; an empty tuple means instrumentation is off
+_sinks = ()
+
+
+class _NullTimer:
+    """
+    Shared do-nothing context manager returned while instrumentation is off.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ('name', 'sinks', 'started')
+
+    def __init__(self, name, sinks):
+        self.name = name
+        self.sinks = sinks
+
+    def __enter__(self):
+        for sink in self.sinks:
+            sink.start(self.name)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        elapsed = time.perf_counter() - self.started
+        for sink in self.sinks:
+            sink.stop(self.name, elapsed)
+        return False
+
+
+def timer(name):
+    """
+    Time a pipeline stage:
+
+        with timer('inference'):
+            results = pose.process(frame)
+
+    While no sink is installed this returns a shared no-op context manager,
+    so instrumented code costs one function call and a tuple check.
+
+    Args:
+        name (str): Stage name
+
+    Returns:
+        Context manager reporting the elapsed time to every sink
+    """
+    if not _sinks:
+        return _NULL_TIMER
+    return _Timer(name, _sinks)
+
+
+def count(name, value=1):
+    """
+    Add to a named counter (e.g. frames decoded, poses detected).
+    """
+    for sink in _sinks:
+        sink.count(name, value)
+
+
+def enabled():
+    """
+    Whether any sink is installed.
+    """
+    return bool(_sinks)
+
+
+def add_sink(sink):
+    global _sinks
+    _sinks = _sinks + (sink,)
+
+
+def remove_sink(sink):
+    """
+    Uninstall a sink and close it.
+    """
+    global _sinks
+    _sinks = tuple(s for s in _sinks if s is not sink)
+    sink.close()
+
+
+@contextmanager
+def instrumented(*sinks):
+    """
+    Install sinks for the duration of a block, closing them afterwards.
+    """
+    for sink in sinks:
+        add_sink(sink)
+    try:
+        yield sinks
+    finally:
+        for sink in sinks:
+            remove_sink(sink)
+
+
+class Sink:
+    """
+    Base class for instrumentation sinks; every hook is a no-op.
+
+    Hooks may be called from the pipeline's decode and preprocess threads.
+    """
+
+    def start(self, name):
+        pass
+
+    def stop(self, name, seconds):
+        pass
+
+    def count(self, name, value):
+        pass
+
+    def close(self):
+        pass
+
+
+class MemorySink(Sink):
+    """
+    Aggregate timings and counters in memory.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timers = {}
+        self.counters = {}
+
+    def stop(self, name, seconds):
+        with self._lock:
+            stats = self.timers.get(name)
+            if stats is None:
+                self.timers[name] = [1, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                stats[2] = max(stats[2], seconds)
+
+    def count(self, name, value):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def summary(self):
+        """
+        Get the aggregated measurements.
+
+        Returns:
+            dict: 'timers' (name -> calls, total, mean and max seconds) and 'counters'
+        """
+        with self._lock:
+            timers = {name: {'calls': calls, 'total_seconds': total, 'mean_seconds': total / calls,
+                             'max_seconds': longest}
+                      for name, (calls, total, longest) in self.timers.items()}
+            return {'timers': timers, 'counters': dict(self.counters)}
+
+    def print_summary(self):
+        """
+        Print one line per timed stage, slowest first, then the counters.
+        """
+        summary = self.summary()
+        for name, stats in sorted(summary['timers'].items(), key=lambda item: -item[1]['total_seconds']):
+            print(f"{name:>10}: {stats['total_seconds']:.3f}s over {stats['calls']} calls "
+                  f"(mean {1000 * stats['mean_seconds']:.2f} ms, max {1000 * stats['max_seconds']:.2f} ms)")
+        for name, value in sorted(summary['counters'].items()):
+            print(f"{name:>10}: {value}")
+
+
+class JsonLogSink(MemorySink):
+    """
+    Aggregate like MemorySink and append the summary as one JSON line on close.
+    """
+
+    def __init__(self, path, **context):
+        """
+        Args:
+            path (str): JSON-lines file to append to
+            **context: Extra fields written with the summary (video, preset, ...)
+        """
+        super().__init__()
+        self.path = path
+        self.context = context
+
+    def close(self):
+        record = {'time': time.strftime('%Y-%m-%dT%H:%M:%S'), **self.context, **self.summary()}
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+
+class ProfileSink(Sink):
+    """
+    Run cProfile while selected stages execute and write one .prof per stage.
+
+    A stage entered many times (e.g. per-frame inference) accumulates into one
+    profile. cProfile only sees the thread that enters the stage, and nested
+    profiled stages in the same thread are folded into the outer one.
+    """
+
+    def __init__(self, stages, output_dir='profiles'):
+        """
+        Args:
+            stages (iterable): Stage names to profile
+            output_dir (str): Directory for <stage>.prof files (view with
+                `python -m pstats` or snakeviz)
+        """
+        self.stages = set(stages)
+        self.output_dir = output_dir
+        self.profiles = {}
+        self._local = threading.local()
+
+    def start(self, name):
+        if name not in self.stages or getattr(self._local, 'active', None):
+            return
+        profile = self.profiles.setdefault(name, cProfile.Profile())
+        self._local.active = name
+        profile.enable()
+
+    def stop(self, name, seconds):
+        if getattr(self._local, 'active', None) != name:
+            return
+        self.profiles[name].disable()
+        self._local.active = None
+
+    def close(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        for name, profile in self.profiles.items():
+            path = os.path.join(self.output_dir, f"{name}.prof")
+            profile.dump_stats(path)
+            print(f"Profile for {name} saved to {path}")
+
+
+class PySpySink(Sink):
+    """
+    Start a py-spy sampling recording of this process the first time a stage begins.
+
+    py-spy samples native and Python frames of all threads (including the
+    pipeline threads) with little overhead. It needs the py-spy binary on
+    PATH and permission to attach to the process.
+    """
+
+    def __init__(self, stage, output_path='profile.svg', duration=10):
+        """
+        Args:
+            stage (str): Stage whose first start triggers the recording
+            output_path (str): Flame graph written by py-spy
+            duration (int): Seconds to record
+        """
+        self.executable = shutil.which('py-spy')
+        if self.executable is None:
+            raise RuntimeError("py-spy is not installed (pip install py-spy)")
+        self.stage = stage
+        self.output_path = output_path
+        self.duration = duration
+        self.process = None
+
+    def start(self, name):
+        if name != self.stage or self.process is not None:
+            return
+        self.process = subprocess.Popen([self.executable, 'record', '--pid', str(os.getpid()),
+                                         '--duration', str(self.duration), '--threads',
+                                         '--output', self.output_path])
+
+    def close(self):
+        if self.process is not None:
+            self.process.wait()
+            print(f"py-spy recording saved to {self.output_path}")
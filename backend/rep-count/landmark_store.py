@@ -0,0 +1,301 @@
+import json
+import os
+import zipfile
+
+import numpy as np
+
+NUM_LANDMARKS = 33
+LANDMARK_FIELDS = ('x', 'y', 'z', 'visibility')
+
+# Column layout of the legacy CSV / DataFrame representation
+POSE_COLUMNS = [f'landmark_{idx}_{field}' for idx in range(NUM_LANDMARKS)
+                for field in LANDMARK_FIELDS] + ['frame_number']
+
+
+class LandmarkSequence:
+    """
+    Pose landmarks for a sequence of frames.
+
+    Attributes:
+        landmarks (np.array): float32 array of shape (frames, 33, 4) holding
+            x, y, z and visibility per landmark
+        frame_numbers (np.array): int array with the source frame of each row
+        metadata (dict): Free-form metadata (fps, resolution, model settings, ...)
+    """
+
+    def __init__(self, landmarks, frame_numbers, metadata=None):
+        landmarks = np.asarray(landmarks)
+        if landmarks.ndim != 3 or landmarks.shape[1:] != (NUM_LANDMARKS, len(LANDMARK_FIELDS)):
+            raise ValueError(f"Expected landmarks of shape (N, 33, 4), got {landmarks.shape}")
+        if len(frame_numbers) != len(landmarks):
+            raise ValueError("landmarks and frame_numbers must have the same length")
+        self.landmarks = landmarks
+        self.frame_numbers = np.asarray(frame_numbers)
+        self.metadata = dict(metadata or {})
+
+    def __len__(self):
+        return len(self.landmarks)
+
+    @classmethod
+    def from_rows(cls, rows, metadata=None):
+        """
+        Build a sequence from landmark rows (133 values ending in the frame number).
+        """
+        values = np.asarray(rows, dtype=np.float64).reshape(len(rows), len(POSE_COLUMNS))
+        landmarks = values[:, :-1].astype(np.float32).reshape(-1, NUM_LANDMARKS, len(LANDMARK_FIELDS))
+        return cls(landmarks, values[:, -1].astype(np.int32), metadata)
+
+    @classmethod
+    def from_dataframe(cls, df, metadata=None):
+        """
+        Build a sequence from a DataFrame in the legacy column layout.
+        """
+        return cls.from_rows(df[POSE_COLUMNS].to_numpy(dtype=np.float64), metadata)
+
+    def to_dataframe(self):
+        """
+        Convert to a DataFrame in the legacy column layout.
+        """
+        import pandas as pd
+
+        values = np.empty((len(self), len(POSE_COLUMNS)), dtype=np.float64)
+        values[:, :-1] = self.landmarks.reshape(len(self), -1)
+        values[:, -1] = self.frame_numbers
+        df = pd.DataFrame(values, columns=POSE_COLUMNS)
+        df['frame_number'] = df['frame_number'].astype(np.int64)
+        return df
+
+
+class LandmarkBuffer:
+    """
+    Growable float32 buffer that landmarks are captured into frame by frame.
+
+    Storage is preallocated and doubled when full, so capturing a long video
+    costs a handful of reallocations rather than a Python list per frame.
+    """
+
+    def __init__(self, capacity=1024):
+        """
+        Args:
+            capacity (int): Frames to preallocate
+        """
+        capacity = max(1, capacity)
+        self._landmarks = np.empty((capacity, NUM_LANDMARKS, len(LANDMARK_FIELDS)), dtype=np.float32)
+        self._frame_numbers = np.empty(capacity, dtype=np.int32)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def landmarks(self):
+        """
+        (frames, 33, 4) view of the captured landmarks.
+        """
+        return self._landmarks[:self._size]
+
+    @property
+    def frame_numbers(self):
+        """
+        Source frame number of each captured row.
+        """
+        return self._frame_numbers[:self._size]
+
+    def _reserve_row(self, frame_number):
+        if self._size == len(self._landmarks):
+            capacity = 2 * len(self._landmarks)
+            landmarks = np.empty((capacity,) + self._landmarks.shape[1:], dtype=np.float32)
+            landmarks[:self._size] = self._landmarks
+            frame_numbers = np.empty(capacity, dtype=np.int32)
+            frame_numbers[:self._size] = self._frame_numbers
+            self._landmarks, self._frame_numbers = landmarks, frame_numbers
+        self._frame_numbers[self._size] = frame_number
+        self._size += 1
+        return self._landmarks[self._size - 1]
+
+    def append(self, frame_number, landmarks):
+        """
+        Append one frame of landmarks given as a (33, 4) array.
+
+        Returns:
+            np.array: The stored (33, 4) row
+        """
+        row = self._reserve_row(frame_number)
+        row[:] = landmarks
+        return row
+
+    def append_pose(self, frame_number, pose_landmarks):
+        """
+        Append one frame from a MediaPipe NormalizedLandmarkList.
+
+        Returns:
+            np.array: The stored (33, 4) row
+        """
+        values = []
+        for l in pose_landmarks.landmark:
+            values.extend((l.x, l.y, l.z, l.visibility))
+        row = self._reserve_row(frame_number)
+        row.reshape(-1)[:] = values
+        return row
+
+    def to_sequence(self, metadata=None):
+        """
+        Wrap the captured frames in a LandmarkSequence.
+
+        The sequence shares memory with the buffer (no copy), so the buffer
+        should not be appended to afterwards.
+        """
+        return LandmarkSequence(self.landmarks, self.frame_numbers, metadata)
+
+
+def concatenate_sequences(sequences, metadata=None):
+    """
+    Join landmark sequences and order the result by frame number.
+
+    Args:
+        sequences (list): One or more LandmarkSequence objects (e.g. per video segment)
+        metadata (dict, optional): Metadata for the joined sequence
+
+    Returns:
+        LandmarkSequence: All frames in frame order
+    """
+    landmarks = np.concatenate([s.landmarks for s in sequences])
+    frame_numbers = np.concatenate([s.frame_numbers for s in sequences])
+    order = np.argsort(frame_numbers, kind='stable')
+    return LandmarkSequence(landmarks[order], frame_numbers[order], metadata)
+
+
+def write_npz(path, sequence):
+    """
+    Write a sequence as an uncompressed .npz so it can be memory-mapped.
+    """
+    np.savez(path,
+             landmarks=np.ascontiguousarray(sequence.landmarks, dtype=np.float32),
+             frame_numbers=np.ascontiguousarray(sequence.frame_numbers, dtype=np.int32),
+             metadata=np.array(json.dumps(sequence.metadata)))
+
+
+def _mmap_member(path, info):
+    """
+    Memory-map one stored (uncompressed) .npy member of a zip archive.
+    """
+    with open(path, 'rb') as f:
+        f.seek(info.header_offset)
+        local_header = f.read(30)
+        name_length = int.from_bytes(local_header[26:28], 'little')
+        extra_length = int.from_bytes(local_header[28:30], 'little')
+        f.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    if not shape or 0 in shape:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', shape=shape, offset=offset,
+                     order='F' if fortran_order else 'C')
+
+
+def read_npz(path, mmap=True):
+    """
+    Read a sequence written by write_npz.
+
+    Args:
+        path (str): Path to the .npz file
+        mmap (bool): Memory-map the landmark arrays instead of reading them
+
+    Returns:
+        LandmarkSequence: The stored sequence
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            name = info.filename[:-len('.npy')]
+            if mmap and name != 'metadata' and info.compress_type == zipfile.ZIP_STORED:
+                arrays[name] = _mmap_member(path, info)
+            else:
+                with archive.open(info) as f:
+                    arrays[name] = np.lib.format.read_array(f)
+    return LandmarkSequence(arrays['landmarks'], arrays['frame_numbers'], json.loads(str(arrays['metadata'])))
+
+
+def write_csv(path, sequence):
+    """
+    Write a sequence in the legacy 133-column CSV layout (metadata is dropped).
+    """
+    sequence.to_dataframe().to_csv(path, index=False)
+
+
+def read_csv(path, mmap=True):
+    """
+    Read a legacy pose data CSV.
+    """
+    import pandas as pd
+
+    return LandmarkSequence.from_dataframe(pd.read_csv(path), {'source_format': 'csv'})
+
+
+# Registered formats by file extension: (writer, reader)
+STORE_FORMATS = {
+    '.npz': (write_npz, read_npz),
+    '.csv': (write_csv, read_csv),
+}
+
+DEFAULT_FORMAT = '.npz'
+
+
+def register_format(extension, writer, reader):
+    """
+    Register a landmark store format.
+
+    Args:
+        extension (str): File extension including the dot, e.g. '.parquet'
+        writer (callable): writer(path, sequence)
+        reader (callable): reader(path, mmap=True) -> LandmarkSequence
+    """
+    STORE_FORMATS[extension.lower()] = (writer, reader)
+
+
+def _format_for(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in STORE_FORMATS:
+        raise ValueError(f"No landmark store format registered for '{extension}'")
+    return STORE_FORMATS[extension]
+
+
+def save_landmarks(path, sequence):
+    """
+    Save a landmark sequence, choosing the format from the file extension.
+    """
+    writer, _ = _format_for(path)
+    writer(path, sequence)
+
+
+def load_landmarks(path, mmap=True):
+    """
+    Load a landmark sequence, choosing the format from the file extension.
+
+    Args:
+        path (str): Path to the stored sequence
+        mmap (bool): Memory-map arrays where the format supports it
+
+    Returns:
+        LandmarkSequence: The stored sequence
+    """
+    _, reader = _format_for(path)
+    return reader(path, mmap=mmap)
+
+
+def pose_data_path(video_path, extension=DEFAULT_FORMAT):
+    """
+    Default location of the pose data extracted from a video.
+
+    Args:
+        video_path (str): Path to the input video
+        extension (str): Store format extension
+
+    Returns:
+        str: e.g. 'clip_pose_data.npz' next to 'clip.mov' or 'clip.mp4'
+    """
+    return os.path.splitext(video_path)[0] + '_pose_data' + extension
@@ -0,0 +1,229 @@
+import argparse
+import json
+
+import numpy as np
+
+from angles import LANDMARKS, joint_angles, joint_triple_indices, fill_missing
+from cadence import REFERENCE_FPS
+
+# Per exercise: the joint whose angle measures range of motion, the landmark
+# pair tracked as the bar path, and whether the concentric (lifting) phase
+# extends that joint. Exercises not listed (e.g. 'general') use the press.
+EXERCISE_METRICS = {
+    'shoulder_press': {'joint': 'elbow', 'bar': 'wrist', 'concentric_extends': True},
+    'bicep_curl': {'joint': 'elbow', 'bar': 'wrist', 'concentric_extends': False},
+    'pushup': {'joint': 'elbow', 'bar': 'shoulder', 'concentric_extends': True},
+    'squat': {'joint': 'knee', 'bar': 'shoulder', 'concentric_extends': True},
+}
+DEFAULT_EXERCISE = 'shoulder_press'
+
+# Columns of the per-rep table, in order
+METRIC_COLUMNS = (
+    'rep', 'start_frame', 'end_frame', 'duration_s', 'concentric_s', 'eccentric_s',
+    'rom_left_deg', 'rom_right_deg', 'symmetry', 'asymmetry_deg', 'bar_path_deviation',
+)
+
+
+def segment_rows(starts, stops):
+    """
+    Row indices of several [start, stop) ranges, concatenated.
+
+    Ranges may share rows (consecutive reps share their boundary frame) or
+    leave gaps, which plain reduceat over the original rows cannot express;
+    gathering the rows first makes every range a contiguous segment.
+
+    Args:
+        starts (np.array): First row of each range
+        stops (np.array): Row after the last of each range (stops > starts)
+
+    Returns:
+        tuple: (rows, offsets), the gathered row indices and the position
+            of each range's first row in them, ready for ufunc.reduceat
+    """
+    lengths = stops - starts
+    offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    rows = np.arange(lengths.sum()) - np.repeat(offsets - starts, lengths)
+    return rows, offsets
+
+
+def _side_angles(landmarks, joint_name):
+    """(frames, 2) left and right joint angles in degrees, gaps interpolated."""
+    triples = [joint_triple_indices(LANDMARKS, joint_name, side) for side in ('left', 'right')]
+    points = landmarks[:, np.array(triples), :2].astype(np.float64)
+    frames = len(landmarks)
+    angles = joint_angles(points.reshape(frames * 2, 3, 2)).reshape(frames, 2)
+    return np.column_stack([fill_missing(angles[:, 0]), fill_missing(angles[:, 1])])
+
+
+def rep_metrics(sequence, boundaries, exercise_type=None, fps=None):
+    """
+    Per-rep form metrics for all reps of a set in one vectorized pass.
+
+    Every rep's rows are gathered into one array and each metric is a
+    segment-wise reduction over it (np.add/maximum/minimum.reduceat), so the
+    cost does not grow with a Python loop over reps.
+
+        duration_s: Rep length in seconds
+        concentric_s / eccentric_s: Time spent lifting / lowering. The
+            turning point is where the mean of both sides' joint angles hits
+            the extreme opposite to the rep's start, and the phase that
+            extends the joint is concentric unless the exercise flexes it
+            (bicep curl)
+        rom_left_deg / rom_right_deg: Range of the joint angle on each side
+        symmetry: Smaller over larger side ROM (1 is perfectly even)
+        asymmetry_deg: Mean absolute left/right angle difference in the rep
+        bar_path_deviation: Standard deviation of the bar point (midpoint of
+            the tracked landmark pair) across its main direction of travel,
+            relative to shoulder width. The direction is fitted per rep, so
+            a rotated or tilted camera does not read as drift. NaN when the
+            sequence metadata has no frame width and height
+
+    Args:
+        sequence (LandmarkSequence): Landmarks of the set
+        boundaries (list): (start_frame, end_frame) per rep in source video
+            frames, e.g. from ExerciseRepProcessor.rep_boundaries
+        exercise_type (str, optional): Key of EXERCISE_METRICS
+        fps (float, optional): Source frame rate (default: from the sequence
+            metadata, else REFERENCE_FPS)
+
+    Returns:
+        dict: Column name from METRIC_COLUMNS -> np.array with one entry per
+            rep; reps covering fewer than two frames of pose data are dropped
+    """
+    spec = EXERCISE_METRICS.get(exercise_type, EXERCISE_METRICS[DEFAULT_EXERCISE])
+    metadata = sequence.metadata or {}
+    fps = fps or metadata.get('fps') or REFERENCE_FPS
+    frames = np.asarray(sequence.frame_numbers)
+    landmarks = sequence.landmarks
+
+    bounds = np.asarray(boundaries, dtype=np.int64).reshape(-1, 2)
+    starts = np.searchsorted(frames, bounds[:, 0], side='left')
+    stops = np.searchsorted(frames, bounds[:, 1], side='right')
+    keep = stops - starts >= 2
+    bounds, starts, stops = bounds[keep], starts[keep], stops[keep]
+    if not len(bounds):
+        return {column: np.empty(0) for column in METRIC_COLUMNS}
+
+    rows, offsets = segment_rows(starts, stops)
+    lengths = (stops - starts).astype(np.float64)
+    seconds = frames.astype(np.float64) / fps
+
+    # Range of motion and symmetry
+    angles = _side_angles(landmarks, spec['joint'])
+    rep_angles = angles[rows]
+    high = np.maximum.reduceat(rep_angles, offsets)
+    low = np.minimum.reduceat(rep_angles, offsets)
+    rom = high - low
+    larger = rom.max(axis=1)
+    symmetry = np.divide(rom.min(axis=1), larger, out=np.ones_like(larger), where=larger > 0)
+    asymmetry = np.add.reduceat(np.abs(rep_angles[:, 0] - rep_angles[:, 1]), offsets) / lengths
+
+    # Tempo: first row where the mean angle reaches the rep's turning extreme
+    mean_angle = rep_angles.mean(axis=1)
+    turns_at_max = mean_angle[offsets] < np.add.reduceat(mean_angle, offsets) / lengths
+    extreme = np.where(turns_at_max, np.maximum.reduceat(mean_angle, offsets),
+                       np.minimum.reduceat(mean_angle, offsets))
+    position = np.arange(len(rows))
+    at_extreme = mean_angle == np.repeat(extreme, stops - starts)
+    turn = rows[np.minimum.reduceat(np.where(at_extreme, position, len(rows)), offsets)]
+    to_turn = seconds[turn] - seconds[starts]
+    from_turn = seconds[stops - 1] - seconds[turn]
+    extending = np.where(turns_at_max, to_turn, from_turn)
+    flexing = np.where(turns_at_max, from_turn, to_turn)
+    concentric, eccentric = (extending, flexing) if spec['concentric_extends'] else (flexing, extending)
+
+    # Bar path in pixel units, so x and y are on the same scale. Without the
+    # frame size the normalised x and y units differ, so nothing is reported
+    frame_width, frame_height = metadata.get('width'), metadata.get('height')
+    if frame_width and frame_height:
+        scale = np.array([frame_width, frame_height], dtype=np.float64)
+        tracked = [LANDMARKS[f"left_{spec['bar']}"], LANDMARKS[f"right_{spec['bar']}"],
+                   LANDMARKS['left_shoulder'], LANDMARKS['right_shoulder']]
+        points = landmarks[:, tracked, :2][rows].astype(np.float64) * scale
+        bar_xy = points[:, :2].mean(axis=1)
+        shoulder_width = np.linalg.norm(points[:, 2] - points[:, 3], axis=1)
+        x, y = bar_xy[:, 0], bar_xy[:, 1]
+        sums = np.add.reduceat(np.column_stack([x, y, x * x, y * y, x * y, shoulder_width]), offsets) / lengths[:, None]
+        mean_x, mean_y, xx, yy, xy, width = sums.T
+        var_x, var_y, cov_xy = xx - mean_x ** 2, yy - mean_y ** 2, xy - mean_x * mean_y
+        # Smaller eigenvalue of the 2x2 covariance: variance across the travel direction
+        across = (var_x + var_y) / 2 - np.sqrt(((var_x - var_y) / 2) ** 2 + cov_xy ** 2)
+        deviation = np.divide(np.sqrt(np.maximum(across, 0.0)), width, out=np.zeros_like(width), where=width > 0)
+    else:
+        print("Bar path deviation needs the video's frame size, which the pose data does not record")
+        deviation = np.full(len(bounds), np.nan)
+
+    return {
+        'rep': np.flatnonzero(keep) + 1,
+        'start_frame': bounds[:, 0],
+        'end_frame': bounds[:, 1],
+        'duration_s': (bounds[:, 1] - bounds[:, 0]) / fps,
+        'concentric_s': concentric,
+        'eccentric_s': eccentric,
+        'rom_left_deg': rom[:, 0],
+        'rom_right_deg': rom[:, 1],
+        'symmetry': symmetry,
+        'asymmetry_deg': asymmetry,
+        'bar_path_deviation': deviation,
+    }
+
+
+def to_log_data(metrics, decimals=2):
+    """
+    Shape a rep_metrics table as a set entry for workout_logs.log_data.
+
+    Columns are stored as parallel lists (one entry per rep), which keeps the
+    JSON small and maps straight back onto rep_metrics' output. Values that
+    were not measured (NaN) are stored as null.
+
+    Args:
+        metrics (dict): Output of rep_metrics
+        decimals (int): Rounding for float columns
+
+    Returns:
+        dict: {'reps': count, 'rep_metrics': {column: list}}
+    """
+    table = {}
+    for column in METRIC_COLUMNS:
+        values = np.asarray(metrics[column])
+        if np.issubdtype(values.dtype, np.integer):
+            table[column] = [int(v) for v in values]
+        else:
+            table[column] = [round(float(v), decimals) if np.isfinite(v) else None for v in values]
+    return {'reps': len(table['rep']), 'rep_metrics': table}
+
+
+def print_metrics(metrics):
+    """
+    Print a rep_metrics table, one row per rep.
+    """
+    print(f"{'rep':>3} {'frames':>11} {'time':>5} {'up':>5} {'down':>5} {'ROM L':>6} {'ROM R':>6} "
+          f"{'sym':>5} {'L-R':>5} {'path':>5}")
+    for i in range(len(metrics['rep'])):
+        print(f"{metrics['rep'][i]:>3} {metrics['start_frame'][i]:>5}-{metrics['end_frame'][i]:<5} "
+              f"{metrics['duration_s'][i]:>5.2f} {metrics['concentric_s'][i]:>5.2f} {metrics['eccentric_s'][i]:>5.2f} "
+              f"{metrics['rom_left_deg'][i]:>6.1f} {metrics['rom_right_deg'][i]:>6.1f} "
+              f"{metrics['symmetry'][i]:>5.2f} {metrics['asymmetry_deg'][i]:>5.1f} "
+              f"{metrics['bar_path_deviation'][i]:>5.2f}")
+
+
+if __name__ == "__main__":
+    from reps import ExerciseRepProcessor
+
+    parser = argparse.ArgumentParser(description="Count reps in stored pose data and report per-rep form metrics.")
+    parser.add_argument("pose_path", type=str, help="Stored landmark sequence (e.g. a pose data CSV or .npz)")
+    parser.add_argument("exercise_type", type=str, nargs='?', default=None,
+                        help="Exercise type (default: auto-detect)")
+    parser.add_argument("--json", action="store_true", help="Also print the workout_logs entry as JSON")
+
+    args = parser.parse_args()
+    processor = ExerciseRepProcessor()
+    count, exercise_type, signal, peaks = processor.count_reps(pose_path=args.pose_path,
+                                                               exercise_type=args.exercise_type)
+    if signal is None:
+        print("Could not detect repetitions reliably.")
+    else:
+        metrics = processor.rep_metrics(signal, peaks, exercise_type)
+        print_metrics(metrics)
+        if args.json:
+            print(json.dumps(to_log_data(metrics)))
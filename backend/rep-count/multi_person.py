@@ -0,0 +1,501 @@
+import argparse
+import os
+
+import cv2
+import numpy as np
+
+from instrumentation import count as count_event, timer
+from landmark_store import LandmarkBuffer
+from pipeline import FramePipeline
+from presets import DEFAULT_PRESET, POSE_PRESETS
+
+# Minimum overlap for a detection to continue an existing track
+IOU_THRESHOLD = 0.3
+
+# Frames a track survives without a matching detection or pose
+MAX_MISSED = 15
+
+# Two tracks whose boxes overlap more than this for DUPLICATE_FRAMES frames
+# in a row are following the same person, and the newer one is dropped
+DUPLICATE_IOU = 0.7
+DUPLICATE_FRAMES = 5
+
+# Tracks with fewer captured frames than this are dropped before counting
+MIN_TRACK_FRAMES = 30
+
+# Fraction of the box width/height added on each side of the pose crop
+CROP_PADDING = 0.25
+
+# Long side of the image the person detector runs on
+DETECTOR_WIDTH = 640
+
+
+def box_iou(boxes_a, boxes_b):
+    """
+    Pairwise intersection over union of two sets of boxes.
+
+    Args:
+        boxes_a (np.array): (N, 4) boxes as x1, y1, x2, y2
+        boxes_b (np.array): (M, 4) boxes as x1, y1, x2, y2
+
+    Returns:
+        np.array: (N, M) IoU matrix
+    """
+    boxes_a = np.asarray(boxes_a, dtype=np.float64).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float64).reshape(-1, 4)
+    x1 = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    y1 = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    x2 = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    y2 = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+
+def suppress_overlaps(boxes, threshold):
+    """
+    Greedy non-maximum suppression of boxes without scores, largest first.
+
+    Args:
+        boxes (np.array): (N, 4) boxes as x1, y1, x2, y2
+        threshold (float): IoU above which the smaller box is dropped
+
+    Returns:
+        np.array: Indices of the kept boxes, in their original order
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    iou = box_iou(boxes, boxes)
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    keep = []
+    for i in np.argsort(-areas, kind='stable'):
+        if all(iou[i, k] <= threshold for k in keep):
+            keep.append(i)
+    return np.array(sorted(keep), dtype=int)
+
+
+class PersonDetector:
+    """
+    Find people in a frame with OpenCV's HOG pedestrian detector.
+
+    HOG needs no extra model files and is fast enough to run every few
+    frames on a downscaled image; between detections, tracks follow their
+    person through the pose landmarks instead.
+    """
+
+    def __init__(self, width=DETECTOR_WIDTH, min_score=0.5, nms_threshold=0.4):
+        """
+        Args:
+            width (int): Long side of the image the detector runs on
+            min_score (float): Minimum SVM score of a detection
+            nms_threshold (float): IoU above which overlapping detections are merged
+        """
+        self.width = width
+        self.min_score = min_score
+        self.nms_threshold = nms_threshold
+        self.hog = cv2.HOGDescriptor()
+        self.hog.setSVMDetector(cv2.HOGDescriptor_getDefaultPeopleDetector())
+
+    def detect(self, frame_rgb):
+        """
+        Detect people in an RGB frame.
+
+        Args:
+            frame_rgb (np.array): Full-resolution RGB frame
+
+        Returns:
+            np.array: (N, 4) person boxes as x1, y1, x2, y2 in frame pixels
+        """
+        height, width = frame_rgb.shape[:2]
+        scale = min(1.0, self.width / max(height, width))
+        image = frame_rgb if scale == 1.0 else cv2.resize(frame_rgb, None, fx=scale, fy=scale,
+                                                          interpolation=cv2.INTER_AREA)
+        rects, scores = self.hog.detectMultiScale(image, winStride=(8, 8), padding=(8, 8), scale=1.05)
+        if len(rects) == 0:
+            return np.empty((0, 4))
+
+        scores = np.asarray(scores, dtype=np.float64).reshape(-1)
+        keep = cv2.dnn.NMSBoxes([list(map(int, rect)) for rect in rects], scores.tolist(),
+                                self.min_score, self.nms_threshold)
+        keep = np.asarray(keep, dtype=int).reshape(-1)
+        rects = np.asarray(rects, dtype=np.float64)[keep] / scale
+        return np.column_stack([rects[:, :2], rects[:, :2] + rects[:, 2:]])
+
+    def close(self):
+        pass
+
+
+class MaskedPoseDetector:
+    """
+    Find up to `max_people` people with a single-person Pose model by masking.
+
+    Each pass runs a static-image Pose on the frame, takes the box around the
+    landmarks it finds and blanks that box out before the next pass. Unlike
+    HOG, which is trained on upright pedestrians, this finds seated, lying
+    and rotated lifters, at the cost of one Pose pass per person (plus one
+    that finds nobody) on every detection frame.
+    """
+
+    def __init__(self, pose_options, max_people=4, width=DETECTOR_WIDTH, padding=0.1):
+        """
+        Args:
+            pose_options (dict): Pose options (static_image_mode is forced on)
+            max_people (int): Most people looked for per frame
+            width (int): Long side of the image the detector runs on
+            padding (float): Fraction of a found box also masked on each side
+        """
+        import mediapipe as mp
+
+        options = dict(pose_options, static_image_mode=True, smooth_landmarks=False)
+        self.pose = mp.solutions.pose.Pose(**options)
+        self.max_people = max_people
+        self.width = width
+        self.padding = padding
+
+    def detect(self, frame_rgb):
+        """
+        Detect people in an RGB frame.
+
+        Args:
+            frame_rgb (np.array): Full-resolution RGB frame
+
+        Returns:
+            np.array: (N, 4) person boxes as x1, y1, x2, y2 in frame pixels
+        """
+        height, width = frame_rgb.shape[:2]
+        scale = min(1.0, self.width / max(height, width))
+        image = cv2.resize(frame_rgb, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        boxes = []
+        for _ in range(self.max_people):
+            results = self.pose.process(image)
+            if not results.pose_landmarks:
+                break
+            landmarks = np.array([(l.x, l.y, l.z, l.visibility) for l in results.pose_landmarks.landmark])
+            box = landmark_box(landmarks, image.shape)
+            if box is None:
+                break
+            x1, y1, x2, y2 = crop_box(box, image.shape, self.padding)
+            image[y1:y2, x1:x2] = 127
+            boxes.append(box / scale)
+        return np.array(boxes).reshape(-1, 4)
+
+    def close(self):
+        self.pose.close()
+
+
+class Track:
+    """
+    One person followed across frames, with its own Pose graph and landmarks.
+    """
+
+    def __init__(self, track_id, box, pose):
+        self.id = track_id
+        self.box = np.asarray(box, dtype=np.float64)
+        self.pose = pose
+        self.buffer = LandmarkBuffer()
+        self.missed = 0
+
+    def close(self):
+        self.pose.close()
+
+
+class IoUTracker:
+    """
+    Assign stable IDs to person boxes by greedy IoU association.
+
+    Detections overlapping each other by more than `iou_threshold` (e.g. a
+    person found twice) are reduced to the largest before association. Each
+    detection then continues the unmatched track it overlaps most (above
+    `iou_threshold`); leftover detections start new tracks. Tracks whose
+    person has not been seen for `max_missed` frames are retired, so a
+    lifter who leaves and comes back gets a new ID. Tracks that converge on
+    the same person are merged by merge_duplicates.
+    """
+
+    def __init__(self, make_pose, iou_threshold=IOU_THRESHOLD, max_missed=MAX_MISSED,
+                 duplicate_iou=DUPLICATE_IOU, duplicate_frames=DUPLICATE_FRAMES):
+        """
+        Args:
+            make_pose (callable): Zero-argument factory for a Pose graph per track
+            iou_threshold (float): Minimum IoU to associate a detection with a track
+            max_missed (int): Frames without a sighting before a track is retired
+            duplicate_iou (float): IoU above which two tracks may be duplicates
+            duplicate_frames (int): Consecutive overlapping frames before the
+                newer of two duplicate tracks is dropped
+        """
+        self.make_pose = make_pose
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.duplicate_iou = duplicate_iou
+        self.duplicate_frames = duplicate_frames
+        self.tracks = []
+        self.finished = []
+        self.next_id = 1
+        # (older track ID, newer track ID) -> consecutive frames overlapping
+        self._overlaps = {}
+
+    def update(self, detections):
+        """
+        Associate one frame's person detections with the active tracks.
+
+        Args:
+            detections (np.array): (N, 4) person boxes in frame pixels
+        """
+        detections = np.asarray(detections, dtype=np.float64).reshape(-1, 4)
+        detections = detections[suppress_overlaps(detections, self.iou_threshold)]
+        unmatched = set(range(len(detections)))
+        if self.tracks and len(detections):
+            iou = box_iou([track.box for track in self.tracks], detections)
+            matched_tracks = set()
+            for flat in np.argsort(iou, axis=None)[::-1]:
+                t, d = np.unravel_index(flat, iou.shape)
+                if iou[t, d] < self.iou_threshold:
+                    break
+                if t in matched_tracks or d not in unmatched:
+                    continue
+                matched_tracks.add(t)
+                unmatched.discard(d)
+                self.tracks[t].box = np.asarray(detections[d], dtype=np.float64)
+                self.tracks[t].missed = 0
+
+        for d in sorted(unmatched):
+            self.tracks.append(Track(self.next_id, detections[d], self.make_pose()))
+            count_event('tracks_started')
+            self.next_id += 1
+
+    def merge_duplicates(self):
+        """
+        Drop tracks that have followed the same person as an older track.
+
+        Called once per frame after the tracks' boxes are updated; the newer
+        track is closed and discarded once the two boxes have overlapped by
+        more than `duplicate_iou` for `duplicate_frames` frames in a row.
+        """
+        if len(self.tracks) < 2:
+            self._overlaps = {}
+            return
+        iou = box_iou([track.box for track in self.tracks], [track.box for track in self.tracks])
+        overlaps = {}
+        dropped = set()
+        # Tracks are kept in creation order, so the older track comes first
+        for i, older in enumerate(self.tracks):
+            for j in range(i + 1, len(self.tracks)):
+                if i in dropped or j in dropped or iou[i, j] <= self.duplicate_iou:
+                    continue
+                pair = (older.id, self.tracks[j].id)
+                overlaps[pair] = self._overlaps.get(pair, 0) + 1
+                if overlaps[pair] >= self.duplicate_frames:
+                    dropped.add(j)
+        for j in dropped:
+            self.tracks[j].close()
+            count_event('tracks_merged')
+        self.tracks = [track for j, track in enumerate(self.tracks) if j not in dropped]
+        self._overlaps = overlaps
+
+    def retire_lost(self):
+        """
+        Close the tracks that have gone unseen for too long.
+        """
+        lost = [track for track in self.tracks if track.missed > self.max_missed]
+        for track in lost:
+            track.close()
+        self.tracks = [track for track in self.tracks if track.missed <= self.max_missed]
+        self.finished.extend(lost)
+
+    def close(self):
+        """
+        Retire every remaining track and return all tracks ever created.
+        """
+        for track in self.tracks:
+            track.close()
+        self.finished.extend(self.tracks)
+        self.tracks = []
+        return sorted(self.finished, key=lambda track: track.id)
+
+
+def crop_box(box, frame_shape, padding=CROP_PADDING):
+    """
+    Pad a box on every side and clip it to the frame.
+
+    Returns:
+        tuple: Integer x1, y1, x2, y2 pixel bounds (empty if off-frame)
+    """
+    height, width = frame_shape[:2]
+    x1, y1, x2, y2 = box
+    pad_x, pad_y = padding * (x2 - x1), padding * (y2 - y1)
+    return (max(0, int(x1 - pad_x)), max(0, int(y1 - pad_y)),
+            min(width, int(np.ceil(x2 + pad_x))), min(height, int(np.ceil(y2 + pad_y))))
+
+
+def landmark_box(landmarks, frame_shape, min_visibility=0.5):
+    """
+    Pixel bounding box of the visible landmarks of one frame, or None.
+    """
+    height, width = frame_shape[:2]
+    visible = landmarks[landmarks[:, 3] >= min_visibility]
+    if len(visible) < 2:
+        return None
+    x, y = visible[:, 0] * width, visible[:, 1] * height
+    return np.array([x.min(), y.min(), x.max(), y.max()], dtype=np.float64)
+
+
+DETECTORS = ('pose', 'hog')
+
+
+def extract_tracks(processor, video_path, detector='pose', detect_interval=5, max_people=4,
+                   min_track_frames=MIN_TRACK_FRAMES, iou_threshold=IOU_THRESHOLD, max_missed=MAX_MISSED):
+    """
+    Extract pose landmarks for every person in a video.
+
+    A person detector runs every `detect_interval` frames and its boxes are
+    associated with tracks by IoU. On every frame each track runs its own
+    Pose graph on a padded crop around its box; the landmarks are mapped
+    back to full-frame normalized coordinates and the box is updated from
+    them, so tracks follow their person between detections.
+
+    Args:
+        processor (ExerciseRepProcessor): Supplies the Pose configuration
+        video_path (str): Path to the input video
+        detector (str): 'pose' (MaskedPoseDetector, handles any body
+            orientation) or 'hog' (PersonDetector, upright people only)
+        detect_interval (int): Frames between person detector runs
+        max_people (int): Most people the 'pose' detector looks for
+        min_track_frames (int): Tracks with fewer posed frames are dropped
+        iou_threshold (float): Minimum IoU to continue a track
+        max_missed (int): Frames without a sighting before a track ends
+
+    Returns:
+        dict: Track ID -> LandmarkSequence, in full-frame coordinates
+    """
+    cap = cv2.VideoCapture(video_path)
+    metadata = {
+        'video': os.path.basename(video_path),
+        'fps': cap.get(cv2.CAP_PROP_FPS),
+        'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        'pose_options': processor.pose_options,
+    }
+    cap.release()
+
+    if detector == 'pose':
+        detector = MaskedPoseDetector(processor.pose_options, max_people)
+    elif detector == 'hog':
+        detector = PersonDetector()
+    else:
+        raise ValueError(f"Unknown person detector: {detector}")
+    tracker = IoUTracker(lambda: processor.mp_pose.Pose(static_image_mode=False, **processor.pose_options),
+                         iou_threshold, max_missed)
+    frames = FramePipeline(video_path, preprocess=lambda frame: cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+    for frame_count, frame_rgb in frames:
+        if frame_count % detect_interval == 0:
+            with timer('detection'):
+                detections = detector.detect(frame_rgb)
+            count_event('people_detected', len(detections))
+            for track in tracker.tracks:
+                track.missed += 1
+            tracker.update(detections)
+
+        for track in tracker.tracks:
+            x1, y1, x2, y2 = crop_box(track.box, frame_rgb.shape)
+            if x2 - x1 < 2 or y2 - y1 < 2:
+                track.missed += 1
+                continue
+            crop = np.ascontiguousarray(frame_rgb[y1:y2, x1:x2])
+            with timer('inference'):
+                results = track.pose.process(crop)
+            if not results.pose_landmarks:
+                track.missed += 1
+                continue
+
+            count_event('poses_detected')
+            landmarks = track.buffer.append_pose(frame_count, results.pose_landmarks)
+            height, width = frame_rgb.shape[:2]
+            landmarks[:, 0] = (landmarks[:, 0] * (x2 - x1) + x1) / width
+            landmarks[:, 1] = (landmarks[:, 1] * (y2 - y1) + y1) / height
+            # z shares the scale of x
+            landmarks[:, 2] *= (x2 - x1) / width
+
+            box = landmark_box(landmarks, frame_rgb.shape)
+            if box is not None:
+                track.box = box
+                track.missed = 0
+
+        tracker.merge_duplicates()
+        tracker.retire_lost()
+
+    frames.print_report()
+    detector.close()
+    tracks = tracker.close()
+    sequences = {}
+    for track in tracks:
+        if len(track.buffer) < min_track_frames:
+            continue
+        sequences[track.id] = track.buffer.to_sequence({**metadata, 'track_id': track.id})
+    print(f"Kept {len(sequences)} of {len(tracks)} tracks with at least {min_track_frames} posed frames")
+    return sequences
+
+
+def count_reps_per_person(processor, video_path, exercise_type=None, **track_options):
+    """
+    Count reps separately for every person in a video.
+
+    Args:
+        processor (ExerciseRepProcessor): Processor used for pose options and counting
+        video_path (str): Path to the input video
+        exercise_type (str, optional): Exercise type (auto-detected per person if omitted)
+        **track_options: Extra keyword arguments for extract_tracks
+
+    Returns:
+        list: One dict per person with 'track_id', 'count', 'exercise_type',
+            'boundaries' ((start_frame, end_frame) per rep), 'frames'
+            (first and last posed frame), 'signal' and 'peaks'
+    """
+    people = []
+    for track_id, sequence in extract_tracks(processor, video_path, **track_options).items():
+        print(f"Track {track_id}: {len(sequence)} frames")
+        count, detected_type, signal, peaks = processor.count_reps(sequence=sequence, exercise_type=exercise_type)
+        people.append({
+            'track_id': track_id,
+            'count': int(count),
+            'exercise_type': detected_type,
+            'boundaries': processor.rep_boundaries(signal, peaks) if signal is not None else [],
+            'frames': (int(sequence.frame_numbers[0]), int(sequence.frame_numbers[-1])),
+            'signal': signal,
+            'peaks': peaks,
+        })
+    return people
+
+
+def main(video_path, exercise_type, preset, detector, detect_interval, max_people, min_track_frames):
+    from reps import ExerciseRepProcessor
+
+    processor = ExerciseRepProcessor(preset)
+    people = count_reps_per_person(processor, video_path, exercise_type, detector=detector,
+                                   detect_interval=detect_interval, max_people=max_people,
+                                   min_track_frames=min_track_frames)
+    for person in people:
+        first, last = person['frames']
+        print(f"Person {person['track_id']} (frames {first}-{last}): {person['count']} reps of "
+              f"{person['exercise_type']}, boundaries {person['boundaries']}")
+    if not people:
+        print("No people tracked long enough to count reps")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Count reps separately for every person in a video.")
+    parser.add_argument("video_path", type=str, help="Path to the input video file")
+    parser.add_argument("--exercise-type", type=str, default=None, help="Exercise type (auto-detect if omitted)")
+    parser.add_argument("--preset", type=str, default=DEFAULT_PRESET, choices=list(POSE_PRESETS),
+                        help="Pose model speed/accuracy preset")
+    parser.add_argument("--detector", type=str, default='pose', choices=DETECTORS,
+                        help="Person detector: masked repeated Pose passes, or OpenCV HOG (upright people only)")
+    parser.add_argument("--detect-interval", type=int, default=5, help="Frames between person detector runs")
+    parser.add_argument("--max-people", type=int, default=4, help="Most people to look for per frame")
+    parser.add_argument("--min-track-frames", type=int, default=MIN_TRACK_FRAMES,
+                        help="Drop people seen in fewer posed frames than this")
+
+    args = parser.parse_args()
+    main(args.video_path, args.exercise_type, args.preset, args.detector, args.detect_interval, args.max_people,
+         args.min_track_frames)
@@ -0,0 +1,229 @@
+import queue
+import threading
+import time
+
+import cv2
+
+from decoding import make_decoder
+from instrumentation import count, timer
+
+# Sentinel passed down the queues when a stage has no more frames
+_END = object()
+
+
+def default_preprocess(frame):
+    """
+    Resize a BGR frame to the inference size and convert it to RGB.
+    """
+    return cv2.cvtColor(cv2.resize(frame, (1000, 1000)), cv2.COLOR_BGR2RGB)
+
+
+class StageStats:
+    """
+    Throughput and queue-depth counters for one pipeline stage.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.frames = 0
+        self.busy_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.depth_samples = 0
+        self.depth_total = 0
+        self.depth_max = 0
+
+    def sample_depth(self, depth):
+        self.depth_samples += 1
+        self.depth_total += depth
+        self.depth_max = max(self.depth_max, depth)
+
+    def as_dict(self):
+        """
+        Get the stage statistics.
+
+        Returns:
+            dict: Frames, busy/wait time, busy throughput and output queue depth
+        """
+        return {
+            'frames': self.frames,
+            'busy_seconds': self.busy_seconds,
+            'wait_seconds': self.wait_seconds,
+            'fps': self.frames / self.busy_seconds if self.busy_seconds else 0.0,
+            'queue_mean': self.depth_total / self.depth_samples if self.depth_samples else 0.0,
+            'queue_max': self.depth_max,
+        }
+
+
+class FramePipeline:
+    """
+    Threaded decode -> preprocess pipeline feeding an inference loop.
+
+    A decoder thread reads frames (see decoding.make_decoder) and a preprocessing
+    thread resizes and converts them; both hand frames on through bounded
+    queues, so a slow consumer applies backpressure instead of letting decoded
+    frames pile up. The consumer (inference) runs in the calling thread by
+    iterating over the pipeline:
+
+        pipeline = FramePipeline(video_path)
+        for frame_number, frame_rgb in pipeline:
+            results = pose.process(frame_rgb)
+        pipeline.print_report()
+    """
+
+    def __init__(self, video_path, preprocess=default_preprocess, queue_size=8,
+                 start_frame=0, end_frame=None, decoder=None, stride=1):
+        """
+        Initialize the pipeline.
+
+        Args:
+            video_path (str): Path to the input video
+            preprocess (callable): Function mapping a BGR frame to the model input
+            queue_size (int): Capacity of each inter-stage queue
+            start_frame (int): First frame to decode
+            end_frame (int): Frame to stop before (None reads to the end)
+            decoder: Decoder or decode option (see decoding.make_decoder)
+            stride (int): Have the decoder return one frame per `stride`
+        """
+        self.video_path = video_path
+        self.decoder = make_decoder(decoder)
+        self.stride = stride
+        self.preprocess = preprocess
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+
+        self.decoded = queue.Queue(maxsize=queue_size)
+        self.prepared = queue.Queue(maxsize=queue_size)
+        self.stats = {name: StageStats(name) for name in ('decode', 'preprocess', 'inference')}
+
+        self._stop = threading.Event()
+        self._errors = []
+        self._threads = []
+        self._started = None
+        self.elapsed = 0.0
+
+    def __iter__(self):
+        self._started = time.perf_counter()
+        self._threads = [
+            threading.Thread(target=self._run_decoder, name='decode', daemon=True),
+            threading.Thread(target=self._run_preprocessor, name='preprocess', daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+        inference = self.stats['inference']
+        try:
+            while True:
+                wait_start = time.perf_counter()
+                item = self.prepared.get()
+                inference.wait_seconds += time.perf_counter() - wait_start
+                if item is _END:
+                    break
+
+                busy_start = time.perf_counter()
+                yield item
+                inference.busy_seconds += time.perf_counter() - busy_start
+                inference.frames += 1
+        finally:
+            self.close()
+
+        if self._errors:
+            raise self._errors[0]
+
+    def close(self):
+        """
+        Stop the worker threads (safe to call more than once).
+        """
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self._started is not None:
+            self.elapsed = time.perf_counter() - self._started
+
+    def _put(self, out_queue, item, stats):
+        """
+        Put with backpressure, giving up if the pipeline is stopped.
+        """
+        wait_start = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                out_queue.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        stats.wait_seconds += time.perf_counter() - wait_start
+        stats.sample_depth(out_queue.qsize())
+
+    def _get(self, in_queue):
+        """
+        Get the next item, returning the end sentinel if the pipeline is stopped.
+        """
+        while not self._stop.is_set():
+            try:
+                return in_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _run_decoder(self):
+        stats = self.stats['decode']
+        frames = self.decoder.frames(self.video_path, self.start_frame, self.end_frame, self.stride)
+        try:
+            while not self._stop.is_set():
+                busy_start = time.perf_counter()
+                with timer('decode'):
+                    item = next(frames, None)
+                stats.busy_seconds += time.perf_counter() - busy_start
+                if item is None:
+                    break
+                stats.frames += 1
+                count('frames_decoded')
+                self._put(self.decoded, item, stats)
+        except Exception as e:
+            self._errors.append(e)
+        finally:
+            frames.close()
+            self._put(self.decoded, _END, stats)
+
+    def _run_preprocessor(self):
+        stats = self.stats['preprocess']
+        try:
+            while True:
+                item = self._get(self.decoded)
+                if item is _END:
+                    break
+                frame_number, frame = item
+
+                busy_start = time.perf_counter()
+                with timer('resize'):
+                    prepared = self.preprocess(frame)
+                stats.busy_seconds += time.perf_counter() - busy_start
+                stats.frames += 1
+                self._put(self.prepared, (frame_number, prepared), stats)
+        except Exception as e:
+            self._errors.append(e)
+        finally:
+            self._put(self.prepared, _END, stats)
+
+    def report(self):
+        """
+        Get per-stage throughput and queue depths.
+
+        Returns:
+            dict: Stage name -> statistics, plus total elapsed seconds
+        """
+        report = {name: stats.as_dict() for name, stats in self.stats.items()}
+        report['elapsed_seconds'] = self.elapsed
+        return report
+
+    def print_report(self):
+        """
+        Print a one-line summary per stage.
+        """
+        for name, stats in self.stats.items():
+            s = stats.as_dict()
+            line = f"{name:>10}: {s['frames']} frames, {s['fps']:.1f} fps while busy, waited {s['wait_seconds']:.2f}s"
+            if name != 'inference':
+                line += f", output queue mean {s['queue_mean']:.1f} / max {s['queue_max']}"
+            print(line)
+        print(f"{'pipeline':>10}: {self.elapsed:.2f}s total")
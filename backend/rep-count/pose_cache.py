@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from landmark_store import LandmarkSequence, read_npz, write_npz
+
+# Bump when extraction changes in a way that invalidates cached landmarks
+CACHE_VERSION = 1
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def hash_file(path):
+    """
+    Content hash (SHA-256) of a file, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def sequence_checksum(sequence):
+    """
+    Checksum of a sequence's arrays, stored alongside them to detect corruption.
+    """
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(sequence.landmarks, dtype=np.float32).tobytes())
+    digest.update(np.ascontiguousarray(sequence.frame_numbers, dtype=np.int32).tobytes())
+    return digest.hexdigest()
+
+
+class PoseCache:
+    """
+    Content-addressed on-disk cache of extracted pose landmarks.
+
+    Entries are keyed by the SHA-256 of the video bytes together with the
+    model and preprocessing settings, so a renamed or copied video still hits
+    and a changed setting misses. Each entry is an .npz landmark store whose
+    metadata carries a checksum of its arrays; entries that fail the check
+    are deleted and treated as misses. When the cache grows past `max_bytes`
+    the least recently used entries (by modification time, refreshed on every
+    hit) are evicted.
+    """
+
+    def __init__(self, cache_dir, max_bytes=2 * 1024 ** 3):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir (str): Directory holding cache entries (created if missing)
+            max_bytes (int): Size bound for all entries together
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, video_path, settings):
+        """
+        Build the cache key for a video and extraction settings.
+
+        Args:
+            video_path (str): Path to the input video
+            settings (dict): JSON-serializable model and preprocessing settings
+
+        Returns:
+            str: Hex digest identifying the entry
+        """
+        digest = hashlib.sha256()
+        digest.update(hash_file(video_path).encode())
+        digest.update(json.dumps({'version': CACHE_VERSION, 'settings': settings}, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def get(self, key):
+        """
+        Look up an entry.
+
+        Args:
+            key (str): Key from PoseCache.key
+
+        Returns:
+            LandmarkSequence: The cached sequence, or None on a miss
+        """
+        path = self._path(key)
+        try:
+            sequence = read_npz(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            print(f"Discarding unreadable cache entry {path}: {e}")
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        if sequence.metadata.get('checksum') != sequence_checksum(sequence):
+            print(f"Discarding corrupt cache entry {path}")
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        os.utime(path)
+        self.hits += 1
+        return sequence
+
+    def put(self, key, sequence):
+        """
+        Store an entry and evict old entries if the cache is over its size bound.
+
+        Args:
+            key (str): Key from PoseCache.key
+            sequence (LandmarkSequence): Landmarks to cache
+        """
+        metadata = dict(sequence.metadata)
+        metadata['checksum'] = sequence_checksum(sequence)
+        entry = LandmarkSequence(sequence.landmarks, sequence.frame_numbers, metadata)
+
+        # Write to a temporary file and rename so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.npz.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write_npz(f, entry)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+
+        self.evict()
+
+    def evict(self):
+        """
+        Delete least recently used entries until the cache fits in max_bytes.
+
+        Returns:
+            int: Number of entries evicted
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.npz'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+            evicted += 1
+        return evicted
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: Hits, misses, entry count and total size in bytes
+        """
+        sizes = [os.path.getsize(os.path.join(self.cache_dir, name))
+                 for name in os.listdir(self.cache_dir) if name.endswith('.npz')]
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(sizes), 'bytes': sum(sizes)}
@@ -3,6 +3,9 @@ import cv2
 import pandas as pd
 import numpy as np
 
+from pipeline import FramePipeline
+from instrumentation import timer
+
 def extract_poses(video_path, rep_threshold=0.6, min_rep_duration=15, smoothing_window=5):
     mp_pose = mp.solutions.pose
     pose = mp_pose.Pose(static_image_mode=False)
@@ -12,15 +15,13 @@ def extract_poses(video_path, rep_threshold=0.6, min_rep_duration=15, smoothing_
     
     frame_count = 0
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
     print(f"Total frames in video: {total_frames}")
 
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-        
-        frame_rgb = cv2.cvtColor(cv2.resize(frame, (1000, 1000)), cv2.COLOR_BGR2RGB)
-        results = pose.process(frame_rgb)
+    frames = FramePipeline(video_path)
+    for frame_count, frame_rgb in frames:
+        with timer('inference'):
+            results = pose.process(frame_rgb)
 
         if results.pose_landmarks:
             landmarks = []
@@ -30,9 +31,8 @@ def extract_poses(video_path, rep_threshold=0.6, min_rep_duration=15, smoothing_
             landmarks.append(frame_count)
             data.append(landmarks)
 
-        frame_count += 1
-
-    cap.release()
+    frame_count = frames.stats['inference'].frames
+    frames.print_report()
     print(f"Processed {frame_count} frames.")
 
     if not data:
@@ -47,7 +47,8 @@ def extract_poses(video_path, rep_threshold=0.6, min_rep_duration=15, smoothing_
             "x16", "y16", "z16", "v16",
             "frame"]
     
-    df = pd.DataFrame(data, columns=cols)
+    with timer('dataframe'):
+        df = pd.DataFrame(data, columns=cols)
 
     # Focus on wrist movement for shoulder press
     wrist_cols = ['y15', 'y16']  # Left and right wrist y-coordinates
@@ -0,0 +1,63 @@
+# Named MediaPipe Pose configurations for speed/accuracy trade-offs.
+#
+# model_complexity selects the lite (0), full (1) or heavy (2) landmark model.
+# The person detector only runs when tracking is lost, i.e. when the tracked
+# landmarks' confidence falls below min_tracking_confidence, so a lower
+# tracking confidence skips the detector on more frames.
+#
+# Measured with bench_presets.py on pose_data/good_shoulder_press
+# (good_sp1, good_sp10, good_sp2, 1 CPU core, serial decode, stretch@1000).
+# Count error is relative to "balanced":
+#
+#   preset     frames/sec  mean abs count error
+#   realtime   n/a         n/a    (lite model download unavailable offline)
+#   balanced   24.9        0.00
+#   accurate   n/a         n/a    (heavy model download unavailable offline)
+#
+# Re-run bench_presets.py on a deployment machine to fill in all tiers.
+POSE_PRESETS = {
+    'realtime': {
+        'model_complexity': 0,
+        'smooth_landmarks': True,
+        'enable_segmentation': False,
+        'min_detection_confidence': 0.5,
+        'min_tracking_confidence': 0.3,
+    },
+    'balanced': {
+        'model_complexity': 1,
+        'smooth_landmarks': True,
+        'enable_segmentation': False,
+        'min_detection_confidence': 0.5,
+        'min_tracking_confidence': 0.5,
+    },
+    'accurate': {
+        'model_complexity': 2,
+        'smooth_landmarks': True,
+        'enable_segmentation': False,
+        'min_detection_confidence': 0.5,
+        'min_tracking_confidence': 0.7,
+    },
+}
+
+DEFAULT_PRESET = 'balanced'
+
+
+def pose_options(preset=DEFAULT_PRESET, **overrides):
+    """
+    Resolve a preset name and overrides into keyword arguments for Pose.
+
+    Args:
+        preset (str): One of the keys of POSE_PRESETS
+        **overrides: Individual Pose options that replace the preset's values
+
+    Returns:
+        dict: Keyword arguments for mp.solutions.pose.Pose (without static_image_mode)
+    """
+    if preset not in POSE_PRESETS:
+        raise ValueError(f"Unknown pose preset: {preset} (choose from {', '.join(POSE_PRESETS)})")
+    options = dict(POSE_PRESETS[preset])
+    for key, value in overrides.items():
+        if key not in options:
+            raise ValueError(f"Unknown pose option: {key}")
+        options[key] = value
+    return options
@@ -0,0 +1,113 @@
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from batch import _init_worker, _process_one, _worker_info
+from presets import DEFAULT_PRESET
+
+
+class ProcessorPool:
+    """
+    Long-lived pool of worker processes that each keep a warm ExerciseRepProcessor.
+
+    Building the MediaPipe graph and importing the analysis stack costs
+    seconds per process, so workers are started once and reused. Tracking
+    state is reset before every video, and each worker is replaced after
+    `max_jobs_per_worker` jobs so memory growth inside MediaPipe or OpenCV
+    stays bounded. A pool whose worker crashed is rebuilt on the next submit.
+    """
+
+    def __init__(self, workers=None, preset=DEFAULT_PRESET, cache_dir=None, max_jobs_per_worker=100):
+        """
+        Initialize the pool (workers are started by start()).
+
+        Args:
+            workers (int, optional): Number of worker processes (default: CPU count)
+            preset (str): Pose configuration preset for the workers
+            cache_dir (str, optional): Pose landmark cache shared by the workers
+            max_jobs_per_worker (int, optional): Jobs before a worker is
+                replaced, or None to keep workers for the pool's lifetime
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.preset = preset
+        self.cache_dir = cache_dir
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.restarts = 0
+        self._executor = None
+
+    def _make_executor(self):
+        # Spawned workers do not inherit the parent's threads, event loop or
+        # MediaPipe graph; max_tasks_per_child also requires a non-fork context
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=mp.get_context('spawn'),
+                                   initializer=_init_worker, initargs=(self.preset, self.cache_dir),
+                                   max_tasks_per_child=self.max_jobs_per_worker)
+
+    def start(self, warm=True):
+        """
+        Create the worker processes.
+
+        Args:
+            warm (bool): Wait until every worker has built its processor
+
+        Returns:
+            list: Worker info dicts (pid, init_seconds, jobs) if warm, else []
+        """
+        self._executor = self._make_executor()
+        return self.warm() if warm else []
+
+    def warm(self):
+        """
+        Start all workers and wait for their processors to be built.
+
+        The executor spawns a new process for each submit while none is idle,
+        so one cheap task per worker brings the whole pool up.
+
+        Returns:
+            list: Worker info dicts (pid, init_seconds, jobs)
+        """
+        futures = [self._executor.submit(_worker_info) for _ in range(self.workers)]
+        return [f.result() for f in futures]
+
+    def submit(self, video_path, exercise_type=None, timeout=None, extract_options=None):
+        """
+        Queue a video for rep counting.
+
+        Args:
+            video_path (str): Path to input video
+            exercise_type (str, optional): Exercise type, or None to auto-detect
+            timeout (float, optional): Seconds allowed for this video
+            extract_options (dict, optional): Extra keyword arguments for extract_poses
+
+        Returns:
+            concurrent.futures.Future: Resolves to the batch result record;
+                raises BrokenProcessPool if the worker died
+        """
+        if self._executor is None:
+            self.start(warm=False)
+        try:
+            return self._executor.submit(_process_one, video_path, exercise_type, timeout, extract_options)
+        except BrokenProcessPool:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._make_executor()
+            self.restarts += 1
+            return self._executor.submit(_process_one, video_path, exercise_type, timeout, extract_options)
+
+    def shutdown(self, wait=True):
+        """
+        Stop the workers.
+
+        Args:
+            wait (bool): Wait for running jobs to finish
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        if self._executor is None:
+            self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
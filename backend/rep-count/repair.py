@@ -0,0 +1,207 @@
+import numpy as np
+
+from angles import LANDMARKS
+from cadence import REFERENCE_FPS
+from landmark_store import LandmarkSequence
+
+# Landmarks below this MediaPipe visibility are treated as unmeasured
+MIN_VISIBILITY = 0.5
+
+# Longest run of missing samples bridged by interpolation, in seconds
+MAX_GAP_SECONDS = 0.3
+
+# Hampel filter: window length in samples and threshold in robust sigmas
+HAMPEL_WINDOW = 7
+HAMPEL_SIGMAS = 3.0
+
+# Deviations below this (in normalised image units) are never outliers, so
+# a landmark that barely moves (zero MAD) is not flagged for sensor noise
+MIN_DEVIATION = 0.01
+
+# Scale from median absolute deviation to standard deviation for Gaussian noise
+MAD_TO_SIGMA = 1.4826
+
+
+def frame_grid(frame_numbers):
+    """
+    Uniform frame grid covering a sequence's frames.
+
+    The step is the greatest common divisor of the frame spacing, so data
+    inferred every frame gets every frame and data stored at a fixed stride
+    keeps that stride.
+
+    Args:
+        frame_numbers (np.array): Sorted source frame numbers
+
+    Returns:
+        np.array: Grid frame numbers, first to last frame inclusive
+    """
+    frame_numbers = np.asarray(frame_numbers, dtype=np.int64)
+    steps = np.diff(frame_numbers)
+    step = int(np.gcd.reduce(steps[steps > 0])) if (steps > 0).any() else 1
+    return np.arange(frame_numbers[0], frame_numbers[-1] + 1, step)
+
+
+def hampel_outliers(values, window=HAMPEL_WINDOW, sigmas=HAMPEL_SIGMAS, min_deviation=MIN_DEVIATION):
+    """
+    Flag samples far from the median of their neighbourhood (Hampel filter).
+
+    A tracker glitch moves a landmark for a frame or two and back, which is
+    a velocity spike on either side; the rolling median ignores it, so the
+    glitch stands out against the median absolute deviation of its window.
+
+    Args:
+        values (np.array): (samples, columns) array, NaN where missing
+        window (int): Odd window length in samples
+        sigmas (float): Threshold in robust standard deviations
+        min_deviation (float): Deviation that is never flagged
+
+    Returns:
+        np.array: Boolean (samples, columns) mask of outliers
+    """
+    half = window // 2
+    padded = np.pad(values, ((half, half), (0, 0)), constant_values=np.nan)
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window, axis=0)
+    median = _window_median(windows)
+    mad = _window_median(np.abs(windows - median[..., None]))
+    threshold = np.maximum(sigmas * MAD_TO_SIGMA * mad, min_deviation)
+    with np.errstate(invalid='ignore'):
+        return np.abs(values - median) > threshold
+
+
+def _window_median(windows):
+    """
+    Median over the last axis ignoring NaN (NaN where all are NaN).
+
+    Sorting moves NaN to the end, so the median sits at an index given by
+    the count of finite values; several times faster than np.nanmedian.
+    """
+    ordered = np.sort(windows, axis=-1)
+    count = np.isfinite(windows).sum(axis=-1, keepdims=True)
+    low = np.take_along_axis(ordered, np.maximum(count - 1, 0) // 2, axis=-1)
+    high = np.take_along_axis(ordered, count // 2, axis=-1)
+    return ((low + high) / 2)[..., 0]
+
+
+def fill_short_gaps(values, max_gap):
+    """
+    Linearly interpolate runs of at most `max_gap` NaN samples, per column.
+
+    Runs touching either end, or longer than max_gap, stay NaN.
+
+    Args:
+        values (np.array): (samples, columns) array, NaN where missing
+        max_gap (int): Longest run filled
+
+    Returns:
+        tuple: (filled values, boolean mask of the samples filled)
+    """
+    samples = len(values)
+    valid = np.isfinite(values)
+    index = np.broadcast_to(np.arange(samples)[:, None], values.shape)
+    previous = np.maximum.accumulate(np.where(valid, index, -1), axis=0)
+    following = np.minimum.accumulate(np.where(valid, index, samples)[::-1], axis=0)[::-1]
+    fill = ~valid & (previous >= 0) & (following < samples) & (following - previous - 1 <= max_gap)
+
+    filled = values.copy()
+    rows, columns = np.nonzero(fill)
+    left, right = previous[fill], following[fill]
+    weight = (rows - left) / (right - left)
+    filled[fill] = values[left, columns] * (1 - weight) + values[right, columns] * weight
+    return filled, fill
+
+
+def repair_landmarks(sequence, min_visibility=MIN_VISIBILITY, max_gap_seconds=MAX_GAP_SECONDS,
+                     hampel_window=HAMPEL_WINDOW, hampel_sigmas=HAMPEL_SIGMAS, fps=None):
+    """
+    Put pose data on a uniform frame grid with glitches and short dropouts repaired.
+
+    All landmarks are processed together as one array:
+        1. Reindex onto the full frame grid, so frames without a detection
+           become missing samples instead of silently shortening time
+        2. Mask landmarks whose visibility is below min_visibility
+        3. Mask x/y outliers found by a Hampel filter
+        4. Interpolate runs of missing samples up to max_gap_seconds
+    Masked measurements that fall in a gap too long to bridge are restored,
+    since MediaPipe's estimate beats no value, and grid frames that still
+    have no pose at all (long dropouts) are left out again. Frames inserted
+    by interpolation get visibility 0.
+
+    Args:
+        sequence (LandmarkSequence): Pose data, frames in order
+        min_visibility (float): Visibility needed to trust a landmark
+        max_gap_seconds (float): Longest dropout bridged
+        hampel_window (int): Hampel filter window in samples
+        hampel_sigmas (float): Hampel filter threshold in robust sigmas
+        fps (float, optional): Source frame rate (default: from the sequence
+            metadata, else REFERENCE_FPS)
+
+    Returns:
+        tuple: (repaired LandmarkSequence, report dict for print_repair_report)
+    """
+    metadata = sequence.metadata or {}
+    if len(sequence) < 2:
+        return sequence, None
+    fps = fps or metadata.get('fps') or REFERENCE_FPS
+
+    frames = np.asarray(sequence.frame_numbers, dtype=np.int64)
+    grid = frame_grid(frames)
+    rows = np.searchsorted(grid, frames)
+    step = int(grid[1] - grid[0]) if len(grid) > 1 else 1
+    max_gap = max(1, int(round(max_gap_seconds * fps / step)))
+
+    source = np.asarray(sequence.landmarks)
+    num_landmarks = source.shape[1]
+    measured = np.full((len(grid), num_landmarks, 3), np.nan)
+    measured[rows] = source[:, :, :3]
+    visibility = np.zeros((len(grid), num_landmarks), dtype=np.float32)
+    visibility[rows] = source[:, :, 3]
+
+    detected = np.zeros(len(grid), dtype=bool)
+    detected[rows] = True
+    low_visibility = detected[:, None] & (visibility < min_visibility)
+    values = np.where(low_visibility[..., None], np.nan, measured)
+
+    outliers = hampel_outliers(values[:, :, :2].reshape(len(grid), -1), hampel_window, hampel_sigmas)
+    outliers = outliers.reshape(len(grid), num_landmarks, 2).any(axis=2)
+    values[outliers] = np.nan
+
+    filled, interpolated = fill_short_gaps(values.reshape(len(grid), -1), max_gap)
+    filled = filled.reshape(values.shape)
+    interpolated = interpolated.reshape(values.shape).any(axis=2)
+    unrepaired = np.isnan(filled) & np.isfinite(measured)
+    filled[unrepaired] = measured[unrepaired]
+
+    keep = np.isfinite(filled).any(axis=(1, 2))
+    landmarks = np.concatenate([filled, visibility[..., None]], axis=2)[keep].astype(np.float32)
+    repaired = LandmarkSequence(landmarks, grid[keep].astype(np.int32), metadata)
+
+    report = {
+        'grid_frames': len(grid),
+        'inserted_frames': int((keep & ~detected).sum()),
+        'missing_frames': int((~keep).sum()),
+        'landmarks': {
+            name: {
+                'low_visibility': int(low_visibility[:, idx].sum()),
+                'outliers': int(outliers[:, idx].sum()),
+                'interpolated': int(interpolated[:, idx].sum()),
+                'repaired_fraction': float(interpolated[keep, idx].mean()) if keep.any() else 0.0,
+            }
+            for name, idx in LANDMARKS.items()
+        },
+    }
+    return repaired, report
+
+
+def print_repair_report(report):
+    """
+    Print how much of the pose data repair_landmarks changed.
+    """
+    if report is None:
+        return
+    print(f"Repair: {report['grid_frames']} frame grid, {report['inserted_frames']} dropped frames "
+          f"interpolated, {report['missing_frames']} left missing")
+    changed = {name: stats for name, stats in report['landmarks'].items() if stats['interpolated']}
+    for name, stats in changed.items():
+        print(f"  {name}: {100 * stats['repaired_fraction']:.1f}% repaired "
+              f"({stats['low_visibility']} low visibility, {stats['outliers']} outliers)")
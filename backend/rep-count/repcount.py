@@ -1,8 +1,8 @@
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 from scipy.signal import find_peaks, savgol_filter
-from scipy.spatial import distance
+
+from angles import joint_angles, joint_triple_indices, fill_missing
 
 class ExerciseRepCounter:
     def __init__(self, csv_path):
@@ -38,75 +38,34 @@ class ExerciseRepCounter:
     
     def calculate_joint_angle(self, point1, point2, point3):
         """Calculate the angle between three points (in degrees)."""
-        # Convert to numpy arrays
-        point1 = np.array(point1)
-        point2 = np.array(point2)
-        point3 = np.array(point3)
-        
-        # Calculate vectors
-        vector1 = point1 - point2
-        vector2 = point3 - point2
-        
-        # Calculate cosine of the angle
-        cosine = np.dot(vector1, vector2) / (np.linalg.norm(vector1) * np.linalg.norm(vector2))
-        # Clip to handle floating point errors
-        cosine = np.clip(cosine, -1.0, 1.0)
-        
-        # Calculate angle in degrees
-        angle = np.degrees(np.arccos(cosine))
-        return angle
+        points = np.array([[point1, point2, point3]], dtype=np.float64)
+        return joint_angles(points, use_z=points.shape[2] == 3)[0]
     
-    def get_angle_over_time(self, joint_name, side='right'):
+    def get_angle_over_time(self, joint_name, side='right', use_z=False):
         """
         Calculate joint angles over time for common joints.
         
         Args:
             joint_name (str): One of 'elbow', 'shoulder', 'knee', 'hip'
             side (str): 'left' or 'right'
+            use_z (bool): Include MediaPipe's z coordinate (3D angle)
             
         Returns:
             np.array: Array of angles for each frame
         """
-        prefix = f"{side}_"
-        angles = []
+        dims = 3 if use_z else 2
+        points = np.empty((self.num_frames, 3, dims), dtype=np.float64)
         
-        if joint_name == 'elbow':
-            # For elbow: shoulder -> elbow -> wrist
-            point1_idx = self.landmarks[prefix + 'shoulder']
-            point2_idx = self.landmarks[prefix + 'elbow']
-            point3_idx = self.landmarks[prefix + 'wrist']
-        elif joint_name == 'shoulder':
-            # For shoulder: elbow -> shoulder -> hip
-            point1_idx = self.landmarks[prefix + 'elbow']
-            point2_idx = self.landmarks[prefix + 'shoulder']
-            point3_idx = self.landmarks[prefix + 'hip']
-        elif joint_name == 'knee':
-            # For knee: hip -> knee -> ankle
-            point1_idx = self.landmarks[prefix + 'hip']
-            point2_idx = self.landmarks[prefix + 'knee']
-            point3_idx = self.landmarks[prefix + 'ankle']
-        elif joint_name == 'hip':
-            # For hip: shoulder -> hip -> knee
-            point1_idx = self.landmarks[prefix + 'shoulder']
-            point2_idx = self.landmarks[prefix + 'hip']
-            point3_idx = self.landmarks[prefix + 'knee']
-        else:
-            raise ValueError(f"Unknown joint name: {joint_name}")
-        
-        # Get coordinates for the three points
-        p1x, p1y, _, _ = self.get_landmark_coordinates(point1_idx)
-        p2x, p2y, _, _ = self.get_landmark_coordinates(point2_idx)
-        p3x, p3y, _, _ = self.get_landmark_coordinates(point3_idx)
+        # Stack the (point1, vertex, point3) coordinates for every frame
+        for i, landmark_idx in enumerate(joint_triple_indices(self.landmarks, joint_name, side)):
+            x, y, z, _ = self.get_landmark_coordinates(landmark_idx)
+            points[:, i, 0] = x
+            points[:, i, 1] = y
+            if use_z:
+                points[:, i, 2] = z
         
-        # Calculate angle for each frame
-        for i in range(self.num_frames):
-            point1 = [p1x[i], p1y[i]]
-            point2 = [p2x[i], p2y[i]]
-            point3 = [p3x[i], p3y[i]]
-            angle = self.calculate_joint_angle(point1, point2, point3)
-            angles.append(angle)
-        
-        return np.array(angles)
+        # Calculate all angles in one pass; degenerate frames are interpolated
+        return fill_missing(joint_angles(points, use_z=use_z))
     
     def calculate_vertical_movement(self, landmark_idx):
         """Track the vertical movement of a landmark over time."""
@@ -278,6 +237,8 @@ class ExerciseRepCounter:
     
     def visualize_rep_counting(self, signal, peaks, exercise_type):
         """Visualize the signal and detected repetitions."""
+        import matplotlib.pyplot as plt
+        
         plt.figure(figsize=(14, 6))
         plt.plot(signal, label='Smoothed Signal')
         plt.plot(peaks, signal[peaks], 'ro', label='Detected Repetitions')
@@ -1,35 +1,106 @@
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-import mediapipe as mp
 import cv2
 from scipy.signal import find_peaks, savgol_filter
-from scipy.spatial import distance
 import os
 import argparse
 
+from angles import LANDMARKS, joint_angles, joint_triple_indices, fill_missing
+from features import FeatureStore
+from detection import detect_reps_batched, smooth_signals
+from cadence import REFERENCE_FPS, tune_detection
+from pipeline import FramePipeline
+from resolution import make_resize, make_roi
+from decoding import DECODER_BACKENDS, make_decoder
+from presets import DEFAULT_PRESET, POSE_PRESETS, pose_options
+from pose_cache import PoseCache
+from sampling import make_sampler, interpolate_skipped
+from metrics import rep_metrics, print_metrics
+from classifier import MIN_CONFIDENCE, load_classifier
+from repair import repair_landmarks, print_repair_report
+from landmark_store import (DEFAULT_FORMAT, LandmarkBuffer, LandmarkSequence,
+                            save_landmarks, load_landmarks, pose_data_path)
+from instrumentation import count as count_event, timer, instrumented, JsonLogSink, ProfileSink
+
 class ExerciseRepProcessor:
-    def __init__(self):
+    def __init__(self, preset=DEFAULT_PRESET, pose_cache=None, auto_tune=True, classifier=None, repair=True,
+                 **overrides):
         """
-        Initialize the rep processor with MediaPipe Pose detection.
+        Initialize the rep processor (MediaPipe Pose is loaded on first extraction).
+        
+        Args:
+            preset (str): Pose configuration preset ('realtime', 'balanced', 'accurate')
+            pose_cache (PoseCache, optional): Cache of extracted landmarks that
+                lets re-runs on the same video skip pose inference
+            auto_tune (bool): Derive smoothing and peak spacing from each
+                signal's estimated rep period instead of fixed frame counts
+            classifier: Exercise classifier for auto-detection: None uses the
+                trained model if there is one, False always uses the range
+                of motion heuristic (see classifier.load_classifier)
+            repair (bool): Before counting, put pose data on a uniform frame
+                grid, drop low-visibility landmarks and tracker glitches and
+                interpolate short gaps (see repair.repair_landmarks)
+            **overrides: Individual Pose options overriding the preset
         """
-        self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(static_image_mode=False)
+        self.pose_cache = pose_cache
+        self.auto_tune = auto_tune
+        self.classifier = load_classifier(classifier)
+        self.repair = repair
+        self.pose_options = pose_options(preset, **overrides)
+        # Built on first use (see the pose property), so analysis of stored
+        # pose data and pose cache hits never load MediaPipe
+        self._pose = None
+        self.features = FeatureStore()
         self.data = None
         self.frames = None
         self.num_frames = 0
         
-        self.landmarks = {
-            'nose': 0,
-            'left_shoulder': 11, 'right_shoulder': 12,
-            'left_elbow': 13, 'right_elbow': 14,
-            'left_wrist': 15, 'right_wrist': 16,
-            'left_hip': 23, 'right_hip': 24,
-            'left_knee': 25, 'right_knee': 26,
-            'left_ankle': 27, 'right_ankle': 28
-        }
+        self.landmarks = dict(LANDMARKS)
+    
+    @property
+    def mp_pose(self):
+        """
+        MediaPipe's pose solution module, imported on first use.
+        """
+        import mediapipe as mp
+        return mp.solutions.pose
+
+    @property
+    def pose(self):
+        """
+        Tracking MediaPipe Pose graph, built on first use.
+        """
+        if self._pose is None:
+            self._pose = self.mp_pose.Pose(static_image_mode=False, **self.pose_options)
+        return self._pose
+
+    @pose.setter
+    def pose(self, value):
+        self._pose = value
+
+    def reset_tracking(self):
+        """
+        Clear the pose tracker's state before a new video (without building it).
+        """
+        if self._pose is not None:
+            self._pose.reset()
+
+    @property
+    def data(self):
+        """
+        Pose data currently loaded for analysis.
+        """
+        return self._data
+    
+    @data.setter
+    def data(self, value):
+        self._data = value
+        self.features.invalidate()
+        # Cache statistics are reported per video
+        self.features.reset_stats()
     
-    def extract_poses(self, video_path, rep_threshold=0.6, min_rep_duration=15, smoothing_window=5):
+    def extract_poses(self, video_path, rep_threshold=0.6, min_rep_duration=15, smoothing_window=5,
+                      segments=1, warmup_frames=30, pipelined=True, sampling=None, resize=None,
+                      roi=None, decode=None, output_format=DEFAULT_FORMAT):
         """
         Extract pose landmarks from a video file.
         
@@ -38,57 +109,221 @@ class ExerciseRepProcessor:
             rep_threshold (float): Threshold for detecting rep movements
             min_rep_duration (int): Minimum duration of a rep
             smoothing_window (int): Window size for data smoothing
+            segments (int): Number of frame ranges to extract in parallel
+                worker processes (1 extracts serially in this process)
+            warmup_frames (int): Frames run through the tracker before each
+                segment boundary to warm up its tracking state
+            pipelined (bool): Overlap decoding and preprocessing with
+                inference using background threads
+            sampling: None to infer every frame, an int stride, or 'adaptive'
+                to lower the inference rate while motion is predictable;
+                skipped frames are filled by interpolation
+            resize: Inference resolution: None (legacy 1000x1000 stretch),
+                'letterbox', 'cap' or 'native', optionally as "policy@size"
+            roi: Crop each frame around the previous frame's pose before the
+                resize: None/False for full frames, True or a margin fraction
+                (see resolution.RegionOfInterest)
+            decode: Frame decoder: None (OpenCV defaults), 'opencv' or 'pyav',
+                or a dict of decoder settings (see decoding.make_decoder)
+            output_format (str): Extension of the landmark store written next
+                to the video ('.npz' binary, '.csv' legacy), or None to skip
         
         Returns:
-            pd.DataFrame: DataFrame with pose landmark data
+            LandmarkSequence: Pose landmarks of the frames with a detected
+                pose, or None if there are none
         """
         cap = cv2.VideoCapture(video_path)
-        data = []
-        
-        frame_count = 0
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        metadata = {
+            'video': os.path.basename(video_path),
+            'fps': cap.get(cv2.CAP_PROP_FPS),
+            'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            'total_frames': total_frames,
+            'pose_options': self.pose_options,
+            'resize': repr(make_resize(resize)),
+            'sampling': str(sampling),
+            'roi': repr(make_roi(roi)),
+            'decode': repr(make_decoder(decode)),
+        }
+        cap.release()
         print(f"Total frames in video: {total_frames}")
 
-        landmark_indices = list(range(33))
-
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            frame_rgb = cv2.cvtColor(cv2.resize(frame, (1000, 1000)), cv2.COLOR_BGR2RGB)
-            results = self.pose.process(frame_rgb)
+        cache_key = None
+        if self.pose_cache is not None:
+            settings = {key: metadata[key] for key in ('pose_options', 'resize', 'sampling', 'roi', 'decode')}
+            cache_key = self.pose_cache.key(video_path, settings)
+            cached = self.pose_cache.get(cache_key)
+            if cached is not None:
+                print(f"Loaded {len(cached)} frames of pose data from cache")
+                return cached if len(cached) else None
 
-            if results.pose_landmarks:
-                landmarks_row = []
-                for idx in landmark_indices:
-                    l = results.pose_landmarks.landmark[idx]
-                    landmarks_row.extend([l.x, l.y, l.z, l.visibility])
-                landmarks_row.append(frame_count)
-                data.append(landmarks_row)
-
-            frame_count += 1
+        if segments > 1:
+            from segments import extract_landmarks_parallel
+            sequence, frame_count = extract_landmarks_parallel(
+                video_path, total_frames, segments, warmup_frames=warmup_frames,
+                pipelined=pipelined, sampling=sampling, resize=resize, roi=roi, decode=decode,
+                pose_options=self.pose_options)
+        else:
+            sequence, frame_count = self.extract_landmarks(
+                video_path, pipelined=pipelined, sampling=sampling, resize=resize, roi=roi, decode=decode)
+        sequence.metadata.update(metadata)
 
-        cap.release()
         print(f"Processed {frame_count} frames.")
 
-        if not data:
+        if cache_key is not None:
+            self.pose_cache.put(cache_key, sequence)
+
+        if not len(sequence):
             print("No pose data detected in video")
             return None
-
-        cols = []
-        for idx in landmark_indices:
-            cols.extend([f'landmark_{idx}_x', f'landmark_{idx}_y', 
-                         f'landmark_{idx}_z', f'landmark_{idx}_visibility'])
-        cols.append('frame_number')
         
-        df = pd.DataFrame(data, columns=cols)
+        if output_format:
+            pose_path = pose_data_path(video_path, output_format)
+            with timer('write'):
+                save_landmarks(pose_path, sequence)
+            print(f"Pose data saved to {pose_path}")
+        
+        return sequence
+    
+    def extract_landmarks(self, video_path, start_frame=0, end_frame=None, warmup_frames=0,
+                          pipelined=True, sampling=None, resize=None, roi=None, decode=None):
+        """
+        Run pose detection over a range of frames of a video.
         
-        csv_path = video_path.replace('.mov', '_pose_data.csv')
-        df.to_csv(csv_path, index=False)
-        print(f"Pose data saved to {csv_path}")
+        Args:
+            video_path (str): Path to the input video
+            start_frame (int): First frame whose landmarks are kept
+            end_frame (int): Frame to stop before (None reads to the end)
+            warmup_frames (int): Frames before start_frame that are run through
+                the tracker but not kept
+            pipelined (bool): Decode and preprocess in background threads
+                that overlap with inference
+            sampling: None to infer every frame, an int stride, 'adaptive',
+                or a sampler object; skipped frames are interpolated
+            resize: Inference resolution policy (see resolution.make_resize);
+                None keeps the legacy 1000x1000 stretch
+            roi: Region of interest option (see resolution.make_roi); the
+                crop depends on the previous frame's pose, so with it the
+                resize runs in this thread instead of the pipeline's
+            decode: Frame decoder option (see decoding.make_decoder); with
+                an int sampling stride the decoder skips the frames itself
         
-        return df
+        Returns:
+            tuple: LandmarkSequence of the frames with a detected pose and
+                the number of frames of the range covered (including frames
+                the decoder skipped for a stride)
+        """
+        first_frame = max(0, start_frame - warmup_frames)
+        transform = make_resize(resize)
+        roi = make_roi(roi)
+        preprocess = transform if roi is None else _unchanged
+        decoder = make_decoder(decode)
+        # A fixed stride is left to the decoder, which can skip frames without
+        # converting them (or, with PyAV, without decoding them at all)
+        stride = sampling if isinstance(sampling, int) and sampling > 1 else 1
+        if pipelined:
+            frames = FramePipeline(video_path, preprocess=preprocess, start_frame=first_frame, end_frame=end_frame,
+                                   decoder=decoder, stride=stride)
+        else:
+            frames = self._read_frames(video_path, preprocess, first_frame, end_frame, decoder, stride)
+        
+        sampler = make_sampler(sampling) if stride == 1 else None
+        buffer = LandmarkBuffer()
+        inferred = []
+        frames_read = 0
+
+        for frame_count, frame_rgb in frames:
+            if roi is not None:
+                with timer('resize'):
+                    frame_rgb = transform(roi.crop(frame_rgb))
+            if frame_count < start_frame:
+                with timer('inference'):
+                    results = self.pose.process(frame_rgb)
+                if roi is not None:
+                    landmarks = None
+                    if results.pose_landmarks:
+                        landmarks = np.array([(l.x, l.y, l.z, l.visibility)
+                                              for l in results.pose_landmarks.landmark])
+                        landmarks = roi.to_frame(transform.to_frame(landmarks))
+                    roi.update(landmarks)
+                    if roi.changed:
+                        self.pose.reset()
+                continue
+            if stride > 1:
+                # The decoder skipped the frames up to the next stride step, but they were covered
+                frames_read = frame_count + stride - start_frame
+                if end_frame is not None:
+                    frames_read = min(frames_read, end_frame - start_frame)
+            else:
+                frames_read += 1
+            if sampler is not None and not sampler.should_infer(frame_count):
+                continue
+
+            with timer('inference'):
+                results = self.pose.process(frame_rgb)
+            inferred.append(frame_count)
+
+            landmarks = None
+            if results.pose_landmarks:
+                count_event('poses_detected')
+                landmarks = buffer.append_pose(frame_count, results.pose_landmarks)
+                if transform.policy == 'letterbox':
+                    landmarks[:] = transform.to_frame(landmarks)
+                if roi is not None:
+                    landmarks[:] = roi.to_frame(landmarks)
+
+            if roi is not None:
+                roi.update(landmarks)
+                if roi.changed:
+                    # The tracker's state refers to the old crop
+                    self.pose.reset()
+            if sampler is not None:
+                sampler.update(frame_count, landmarks)
+
+        if pipelined:
+            frames.print_report()
+        if roi is not None:
+            roi.print_report()
+        count_event('frames_inferred', len(inferred))
+        sequence = buffer.to_sequence()
+        if sampler is not None:
+            print(f"Ran inference on {len(inferred)} of {frames_read} frames")
+            sequence = interpolate_skipped(sequence, inferred)
+        elif stride > 1:
+            print(f"Ran inference on {len(inferred)} frames decoded at stride {stride}")
+            sequence = interpolate_skipped(sequence, inferred)
+        return sequence, frames_read
+    
+    def _read_frames(self, video_path, preprocess, start_frame=0, end_frame=None, decoder=None, stride=1):
+        """
+        Decode and preprocess frames sequentially in the calling thread.
+        
+        Args:
+            video_path (str): Path to the input video
+            preprocess (callable): Function mapping a BGR frame to the model input
+            start_frame (int): First frame to decode
+            end_frame (int): Frame to stop before (None reads to the end)
+            decoder: Decoder or decode option (see decoding.make_decoder)
+            stride (int): Have the decoder return one frame per `stride`
+        
+        Yields:
+            tuple: Frame number and the RGB frame prepared for inference
+        """
+        frames = make_decoder(decoder).frames(video_path, start_frame, end_frame, stride)
+        try:
+            while True:
+                with timer('decode'):
+                    item = next(frames, None)
+                if item is None:
+                    break
+                count_event('frames_decoded')
+                frame_count, frame = item
+                with timer('resize'):
+                    frame = preprocess(frame)
+                yield frame_count, frame
+        finally:
+            frames.close()
     
     def get_landmark_coordinates(self, landmark_idx):
         """
@@ -100,10 +335,10 @@ class ExerciseRepProcessor:
         Returns:
             tuple: x, y, z coordinates and visibility for the landmark
         """
-        x = self.data[f'landmark_{landmark_idx}_x'].values
-        y = self.data[f'landmark_{landmark_idx}_y'].values
-        z = self.data[f'landmark_{landmark_idx}_z'].values
-        visibility = self.data[f'landmark_{landmark_idx}_visibility'].values
+        def compute():
+            return self.data.landmarks[:, landmark_idx, :].T.astype(np.float64)
+        
+        x, y, z, visibility = self.features.get(('landmark', landmark_idx), compute)
         return x, y, z, visibility
     
     def calculate_joint_angle(self, point1, point2, point3):
@@ -118,64 +353,36 @@ class ExerciseRepProcessor:
         Returns:
             float: Angle in degrees
         """
-        point1 = np.array(point1)
-        point2 = np.array(point2)
-        point3 = np.array(point3)
-        
-        vector1 = point1 - point2
-        vector2 = point3 - point2
-        
-        cosine = np.dot(vector1, vector2) / (np.linalg.norm(vector1) * np.linalg.norm(vector2))
-        cosine = np.clip(cosine, -1.0, 1.0)
-        
-        angle = np.degrees(np.arccos(cosine))
-        return angle
+        points = np.array([[point1, point2, point3]], dtype=np.float64)
+        return joint_angles(points, use_z=points.shape[2] == 3)[0]
     
-    def get_angle_over_time(self, joint_name, side='right'):
+    def get_angle_over_time(self, joint_name, side='right', use_z=False):
         """
         Calculate joint angles over time for common joints.
         
         Args:
             joint_name (str): One of 'elbow', 'shoulder', 'knee', 'hip'
             side (str): 'left' or 'right'
+            use_z (bool): Include MediaPipe's z coordinate (3D angle)
             
         Returns:
             np.array: Array of angles for each frame
         """
-        prefix = f"{side}_"
-        angles = []
-        
-        if joint_name == 'elbow':
-            point1_idx = self.landmarks[prefix + 'shoulder']
-            point2_idx = self.landmarks[prefix + 'elbow']
-            point3_idx = self.landmarks[prefix + 'wrist']
-        elif joint_name == 'shoulder':
-            point1_idx = self.landmarks[prefix + 'elbow']
-            point2_idx = self.landmarks[prefix + 'shoulder']
-            point3_idx = self.landmarks[prefix + 'hip']
-        elif joint_name == 'knee':
-            point1_idx = self.landmarks[prefix + 'hip']
-            point2_idx = self.landmarks[prefix + 'knee']
-            point3_idx = self.landmarks[prefix + 'ankle']
-        elif joint_name == 'hip':
-            point1_idx = self.landmarks[prefix + 'shoulder']
-            point2_idx = self.landmarks[prefix + 'hip']
-            point3_idx = self.landmarks[prefix + 'knee']
-        else:
-            raise ValueError(f"Unknown joint name: {joint_name}")
-        
-        p1x, p1y, _, _ = self.get_landmark_coordinates(point1_idx)
-        p2x, p2y, _, _ = self.get_landmark_coordinates(point2_idx)
-        p3x, p3y, _, _ = self.get_landmark_coordinates(point3_idx)
-        
-        for i in range(self.num_frames):
-            point1 = [p1x[i], p1y[i]]
-            point2 = [p2x[i], p2y[i]]
-            point3 = [p3x[i], p3y[i]]
-            angle = self.calculate_joint_angle(point1, point2, point3)
-            angles.append(angle)
-        
-        return np.array(angles)
+        dims = 3 if use_z else 2
+        triple = joint_triple_indices(self.landmarks, joint_name, side)
+        
+        def compute():
+            with timer('angles'):
+                points = np.empty((self.num_frames, 3, dims), dtype=np.float64)
+                for i, landmark_idx in enumerate(triple):
+                    x, y, z, _ = self.get_landmark_coordinates(landmark_idx)
+                    points[:, i, 0] = x
+                    points[:, i, 1] = y
+                    if use_z:
+                        points[:, i, 2] = z
+                return fill_missing(joint_angles(points, use_z=use_z))
+        
+        return self.features.get(('angle', joint_name, side, dims), compute)
     
     def calculate_vertical_movement(self, landmark_idx):
         """
@@ -192,7 +399,8 @@ class ExerciseRepProcessor:
     
     def detect_reps_from_signal(self, signal, exercise_type="general", 
                                smoothing=True, window_length=15, polyorder=3,
-                               prominence=0.1, width=5, distance_between_peaks=10):
+                               prominence=0.1, width=5, distance_between_peaks=10,
+                               feature_key=None):
         """
         Detect repetitions from a time series signal.
         
@@ -205,6 +413,8 @@ class ExerciseRepProcessor:
             prominence: Required prominence of peaks
             width: Required width of peaks
             distance_between_peaks: Minimum frames between peaks
+            feature_key: Optional key identifying the signal, used to cache
+                the smoothed result in the feature store
             
         Returns:
             peaks: Indices of detected peaks
@@ -214,27 +424,97 @@ class ExerciseRepProcessor:
         if smoothing and len(signal) > window_length:
             if window_length % 2 == 0:
                 window_length += 1
-            smoothed_signal = savgol_filter(signal, window_length, polyorder)
+            def smooth():
+                with timer('smoothing'):
+                    return savgol_filter(signal, window_length, polyorder)
+            
+            if feature_key is None:
+                smoothed_signal = smooth()
+            else:
+                smoothed_signal = self.features.get(
+                    ('smoothed', feature_key, window_length, polyorder), smooth)
         else:
             smoothed_signal = signal
         
-        if exercise_type in ["pushup", "squat"]:
-            inverted_signal = -smoothed_signal
-            peaks, _ = find_peaks(inverted_signal, prominence=prominence*np.std(inverted_signal), 
-                               width=width, distance=distance_between_peaks)
-        else:
-            peaks, _ = find_peaks(smoothed_signal, prominence=prominence*np.std(smoothed_signal), 
-                               width=width, distance=distance_between_peaks)
+        with timer('peaks'):
+            if exercise_type in ["pushup", "squat"]:
+                inverted_signal = -smoothed_signal
+                peaks, _ = find_peaks(inverted_signal, prominence=prominence*np.std(inverted_signal), 
+                                   width=width, distance=distance_between_peaks)
+            else:
+                peaks, _ = find_peaks(smoothed_signal, prominence=prominence*np.std(smoothed_signal), 
+                                   width=width, distance=distance_between_peaks)
         
         return peaks, len(peaks), smoothed_signal
     
+    def signal_fps(self):
+        """
+        Samples per second of signals derived from the loaded pose data.
+        
+        Uses the source video's frame rate when the landmarks carry it (falling
+        back to REFERENCE_FPS for bare CSVs), divided by the typical step
+        between stored frames in case inference skipped frames.
+        
+        Returns:
+            float: Signal sample rate
+        """
+        fps = self.data.metadata.get('fps') or REFERENCE_FPS
+        if len(self.frames) > 1:
+            fps /= max(1, np.median(np.diff(self.frames)))
+        return float(fps)
+    
+    def detection_parameters(self, signal, window_length=15, width=5, distance_between_peaks=15):
+        """
+        Smoothing and peak detection settings for a signal.
+        
+        The defaults are the hand-tuned frame counts for 30 fps footage. With
+        auto_tune enabled they are replaced by values proportional to the
+        signal's estimated rep period, or, if no clear period is found,
+        rescaled to the signal's actual frame rate.
+        
+        Args:
+            signal (np.array): Signal, or (signals, frames) array sharing one setting
+            window_length (int): Savitzky-Golay window at 30 fps
+            width (int): Required peak width at 30 fps
+            distance_between_peaks (int): Minimum peak spacing at 30 fps
+        
+        Returns:
+            dict: 'window_length', 'width' and 'distance_between_peaks' for
+                detect_reps_from_signal
+        """
+        if not self.auto_tune:
+            return {'window_length': window_length, 'width': width,
+                    'distance_between_peaks': distance_between_peaks}
+        
+        fps = self.signal_fps()
+        with timer('cadence'):
+            parameters, period = tune_detection(signal, fps, window_length=window_length, width=width,
+                                                distance_between_peaks=distance_between_peaks)
+        if period is None:
+            print(f"No clear rep cadence found, using defaults scaled to {fps:.0f} fps")
+        else:
+            print(f"Estimated rep period: {period:.1f} frames ({period / fps:.2f}s)")
+        return parameters
+    
     def auto_detect_exercise_type(self):
         """
         Attempt to automatically identify the type of exercise being performed.
         
+        With a trained classifier, only the first window of pose data is
+        classified; the range of motion heuristic over the whole clip is the
+        fallback when there is no model or it is not confident.
+        
         Returns:
             str: Detected exercise type
         """
+        if self.classifier is not None:
+            with timer('classify'):
+                exercise_type, confidence = self.classifier.classify(self.data, self.signal_fps())
+            if confidence >= MIN_CONFIDENCE:
+                print(f"Classifier: {exercise_type} ({confidence:.2f})")
+                return exercise_type
+            print(f"Classifier unsure ({exercise_type}, {confidence:.2f}); using range of motion")
+        
         right_elbow_angles = self.get_angle_over_time('elbow', 'right')
         right_knee_angles = self.get_angle_over_time('knee', 'right')
         right_shoulder_angles = self.get_angle_over_time('shoulder', 'right')
@@ -255,7 +535,7 @@ class ExerciseRepProcessor:
         else:
             return "general"
     
-    def count_reps(self, csv_path=None, df=None, exercise_type=None):
+    def count_reps(self, csv_path=None, df=None, exercise_type=None, pose_path=None, sequence=None):
         """
         Count repetitions using pose data.
         
@@ -263,18 +543,31 @@ class ExerciseRepProcessor:
             csv_path (str): Path to CSV file with pose data
             df (pd.DataFrame): Optional DataFrame with pose data
             exercise_type (str): Optional exercise type to override auto-detection
+            pose_path (str): Path to a stored landmark sequence in any
+                registered format (e.g. '.npz')
+            sequence (LandmarkSequence): Landmarks already in memory, e.g.
+                from extract_poses
         
         Returns:
             tuple: Number of reps, detected exercise type, signal, peaks
         """
-        if df is None:
-            if csv_path is None:
-                raise ValueError("Must provide either CSV path or DataFrame")
-            self.data = pd.read_csv(csv_path)
+        if sequence is not None:
+            self.data = sequence
+        elif df is not None:
+            self.data = LandmarkSequence.from_dataframe(df)
+        elif pose_path is not None:
+            self.data = load_landmarks(pose_path)
+        elif csv_path is not None:
+            self.data = load_landmarks(csv_path)
         else:
-            self.data = df
+            raise ValueError("Must provide a landmark sequence, pose data path, CSV path or DataFrame")
         
-        self.frames = self.data['frame_number'].values
+        if self.repair:
+            with timer('repair'):
+                self.data, report = repair_landmarks(self.data)
+            print_repair_report(report)
+        
+        self.frames = np.asarray(self.data.frame_numbers)
         self.num_frames = len(self.frames)
         print(f"Loaded {self.num_frames} frames of pose data")
         
@@ -285,22 +578,30 @@ class ExerciseRepProcessor:
         if exercise_type == "bicep_curl":
             signal = self.get_angle_over_time('elbow', 'right')
             peaks, count, smoothed_signal = self.detect_reps_from_signal(
-                -signal, exercise_type, prominence=0.3, distance_between_peaks=15)
+                -signal, exercise_type, prominence=0.3,
+                feature_key=('angle', 'elbow', 'right', 2, 'inverted'),
+                **self.detection_parameters(signal, distance_between_peaks=15))
             
         elif exercise_type == "pushup":
             signal = self.calculate_vertical_movement(self.landmarks['nose'])
             peaks, count, smoothed_signal = self.detect_reps_from_signal(
-                signal, exercise_type, prominence=0.15, distance_between_peaks=15)
+                signal, exercise_type, prominence=0.15,
+                feature_key=('vertical', self.landmarks['nose']),
+                **self.detection_parameters(signal, distance_between_peaks=15))
             
         elif exercise_type == "squat":
             signal = self.get_angle_over_time('knee', 'right')
             peaks, count, smoothed_signal = self.detect_reps_from_signal(
-                -signal, exercise_type, prominence=0.25, distance_between_peaks=20)
+                -signal, exercise_type, prominence=0.25,
+                feature_key=('angle', 'knee', 'right', 2, 'inverted'),
+                **self.detection_parameters(signal, distance_between_peaks=20))
             
         elif exercise_type == "shoulder_press":
             signal = self.calculate_vertical_movement(self.landmarks['right_wrist'])
             peaks, count, smoothed_signal = self.detect_reps_from_signal(
-                -signal, exercise_type, prominence=0.5, distance_between_peaks=15)
+                -signal, exercise_type, prominence=0.5,
+                feature_key=('vertical', self.landmarks['right_wrist'], 'inverted'),
+                **self.detection_parameters(signal, distance_between_peaks=15))
         else:
             signals = {
                 "right_elbow": self.get_angle_over_time('elbow', 'right'),
@@ -309,41 +610,42 @@ class ExerciseRepProcessor:
                 "right_wrist_y": self.calculate_vertical_movement(self.landmarks['right_wrist']),
                 "nose_y": self.calculate_vertical_movement(self.landmarks['nose'])
             }
+            signal_keys = {
+                "right_elbow": ('angle', 'elbow', 'right', 2),
+                "right_knee": ('angle', 'knee', 'right', 2),
+                "right_shoulder": ('angle', 'shoulder', 'right', 2),
+                "right_wrist_y": ('vertical', self.landmarks['right_wrist']),
+                "nose_y": ('vertical', self.landmarks['nose'])
+            }
             
-            best_count = 0
-            best_signal = None
-            best_peaks = None
-            best_smoothed = None
+            names = list(signals)
+            stacked = np.stack([signals[name] for name in names])
+            parameters = self.detection_parameters(stacked, distance_between_peaks=15)
+            window_length = parameters.pop('window_length')
             
-            for name, sig in signals.items():
-                peaks1, count1, smoothed1 = self.detect_reps_from_signal(
-                    sig, prominence=0.2, distance_between_peaks=15)
-                peaks2, count2, smoothed2 = self.detect_reps_from_signal(
-                    -sig, prominence=0.2, distance_between_peaks=15)
-                
-                if count1 >= count2 and count1 > best_count:
-                    best_count = count1
-                    best_signal = sig
-                    best_peaks = peaks1
-                    best_smoothed = smoothed1
-                    best_name = name + " (normal)"
-                elif count2 > count1 and count2 > best_count:
-                    best_count = count2
-                    best_signal = -sig
-                    best_peaks = peaks2
-                    best_smoothed = smoothed2
-                    best_name = name + " (inverted)"
+            def smooth():
+                with timer('smoothing'):
+                    return smooth_signals(stacked, window_length)
             
-            if best_signal is not None:
-                print(f"Best signal for rep counting: {best_name}")
-                signal = best_signal
-                count = best_count
-                peaks = best_peaks
-                smoothed_signal = best_smoothed
+            smoothed = self.features.get(
+                ('smoothed_batch',) + tuple(signal_keys[name] for name in names) + (window_length,), smooth)
+            with timer('peaks'):
+                best = detect_reps_batched(signals, smoothed=smoothed, **parameters)
+            
+            if best is not None:
+                orientation = "inverted" if best['inverted'] else "normal"
+                print(f"Best signal for rep counting: {best['name']} ({orientation}), "
+                      f"periodicity score {best['score']:.2f} after {best['evaluated']} of {len(names)} signals")
+                count = best['count']
+                peaks = best['peaks']
+                smoothed_signal = best['smoothed']
             else:
                 print("Could not detect any reliable repetition pattern")
                 return 0, exercise_type, None, None
         
+        stats = self.features.stats()
+        print(f"Feature cache: {stats['hits']} hits, {stats['misses']} misses")
+        
         return count, exercise_type, smoothed_signal, peaks
     
     def visualize_rep_counting(self, signal, peaks, exercise_type):
@@ -355,6 +657,9 @@ class ExerciseRepProcessor:
             peaks (np.array): Indices of detected peaks
             exercise_type (str): Type of exercise
         """
+        # Imported here so counting without plots does not pay for matplotlib
+        import matplotlib.pyplot as plt
+        
         plt.figure(figsize=(14, 6))
         plt.plot(signal, label='Smoothed Signal')
         plt.plot(peaks, signal[peaks], 'ro', label='Detected Repetitions')
@@ -365,26 +670,69 @@ class ExerciseRepProcessor:
         plt.grid(True)
         plt.show()
     
-    def process_video(self, video_path, exercise_type=None):
+    def process_video(self, video_path, exercise_type=None, **extract_options):
         """
         Complete pipeline to process video and count reps.
         
         Args:
             video_path (str): Path to input video
             exercise_type (str, optional): Specific exercise type
+            **extract_options: Extra keyword arguments for extract_poses
         
         Returns:
             tuple: Number of reps, detected exercise type, signal, peaks
         """
-        pose_df = self.extract_poses(video_path)
+        sequence = self.extract_poses(video_path, **extract_options)
         
-        if pose_df is None:
+        if sequence is None:
             print("Could not extract pose data")
             return 0, None, None, None
         
-        return self.count_reps(df=pose_df, exercise_type=exercise_type)
+        return self.count_reps(sequence=sequence, exercise_type=exercise_type)
 
-    def split_video(self, video_path, signal, exercise_type):
+    def rep_boundaries(self, signal, peaks=None):
+        """
+        Frame ranges of individual reps, delimited by consecutive signal troughs.
+        
+        Args:
+            signal (np.array): Processed signal
+            peaks (np.array, optional): Detected rep peaks; if given, each rep
+                runs between the deepest turning points on either side of its
+                peak, so there is exactly one range per counted rep
+        
+        Returns:
+            list: (start_frame, end_frame) pairs in source video frames
+        """
+        if peaks is not None and len(peaks):
+            # pushup/squat peaks are found on the inverted signal, so look for
+            # whichever extreme the peaks are not
+            sign = 1 if np.mean(signal[peaks]) >= np.mean(signal) else -1
+            edges = np.concatenate([[0], peaks, [len(signal) - 1]])
+            troughs = np.array([lo + np.argmin(sign * signal[lo:hi + 1]) for lo, hi in zip(edges[:-1], edges[1:])])
+        else:
+            troughs, _ = find_peaks(-signal)
+        # Signal samples are rows of pose data; map them back to video frames
+        if self.frames is not None and len(self.frames) == len(signal):
+            troughs = self.frames[troughs]
+        return [(int(start), int(end)) for start, end in zip(troughs[:-1], troughs[1:])]
+    
+    def rep_metrics(self, signal, peaks, exercise_type):
+        """
+        Per-rep form metrics (tempo, range of motion, symmetry, bar path)
+        for the reps counted on the loaded pose data.
+        
+        Args:
+            signal (np.array): Processed signal from count_reps
+            peaks (np.array): Detected rep peaks from count_reps
+            exercise_type (str): Type of exercise
+        
+        Returns:
+            dict: Per-rep table from metrics.rep_metrics
+        """
+        with timer('metrics'):
+            return rep_metrics(self.data, self.rep_boundaries(signal, peaks), exercise_type)
+    
+    def split_video(self, video_path, signal, exercise_type, mode='reencode', output_dir=None, decode=None):
         """
         Split video into individual reps based on detected troughs.
         
@@ -392,60 +740,256 @@ class ExerciseRepProcessor:
             video_path (str): Path to input video
             signal (np.array): Processed signal
             exercise_type (str): Type of exercise
+            mode (str): 'reencode' decodes the video once and writes every rep
+                clip in a single sequential pass; 'copy' remuxes compressed
+                packets without re-encoding, cutting at the nearest keyframe
+                at or before each rep boundary (requires PyAV)
+            output_dir (str, optional): Directory for the clips (default:
+                '<video name>_reps' next to the video)
+            decode: Frame decoder option for 'reencode' (see
+                decoding.make_decoder)
+        
+        Returns:
+            list: (output_path, start_frame, end_frame) per written clip
         """
         
-        base_name = os.path.splitext(os.path.basename(video_path))[0]
-        output_dir = os.path.join(os.path.dirname(video_path), f"{base_name}_reps")
+        if output_dir is None:
+            base_name = os.path.splitext(os.path.basename(video_path))[0]
+            output_dir = os.path.join(os.path.dirname(video_path), f"{base_name}_reps")
         
         os.makedirs(output_dir, exist_ok=True)
         
-        cap = cv2.VideoCapture(video_path)
-        frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        
-        troughs, _ = find_peaks(-signal)
+        ranges = self.rep_boundaries(signal)
         
-        for i, trough in enumerate(troughs[:-1]):
-            start_frame = troughs[i]
-            end_frame = min(len(signal), troughs[i+1])
-            
-            output_path = os.path.join(output_dir, f"rep_{i+1}.mp4")
-            
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(output_path, fourcc, fps, (frame_width, frame_height))
-            
-            cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
-            
-            for frame_num in range(start_frame, end_frame):
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                out.write(frame)
-            
-            out.release()
-            print(f"Saved rep {i+1} to {output_path} with {end_frame - start_frame} frames from {start_frame} to {end_frame}")
+        if mode not in ('copy', 'reencode'):
+            raise ValueError(f"Unknown split mode: {mode}")
+        with timer('split'):
+            if mode == 'copy':
+                outputs = split_video_stream_copy(video_path, ranges, output_dir)
+            else:
+                outputs = split_video_single_pass(video_path, ranges, output_dir, decode)
         
-        cap.release()
+        for output_path, start_frame, end_frame in outputs:
+            print(f"Saved {output_path} with {end_frame - start_frame} frames from {start_frame} to {end_frame}")
         
-        print(f"Split {len(troughs)} reps into separate videos in {output_dir}")
+        print(f"Split {len(outputs)} reps into separate videos in {output_dir}")
+        return outputs
+
+
+def _unchanged(frame):
+    """
+    Pipeline preprocess that hands decoded frames on as they are.
+    """
+    return frame
+
+
+def split_video_single_pass(video_path, ranges, output_dir, decode=None):
+    """
+    Write rep clips in one sequential decode of the video.
+    
+    Args:
+        video_path (str): Path to input video
+        ranges (list): Sorted, non-overlapping (start_frame, end_frame) pairs
+        output_dir (str): Directory for rep_<n>.mp4 files
+        decode: Frame decoder option (see decoding.make_decoder); clips are
+            written at the size it decodes to
+    
+    Returns:
+        list: (output_path, start_frame, end_frame) per written clip
+    """
+    outputs = []
+    if not ranges:
+        return outputs
+    
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    cap.release()
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    
+    rep = 0
+    out = None
+    last_frame = ranges[-1][1]
+    
+    # Seeking straight to the first rep skips decoding the lead-in
+    for frame_num, frame in make_decoder(decode).frames(video_path, start_frame=ranges[0][0], end_frame=last_frame):
+        while rep < len(ranges) and frame_num >= ranges[rep][1]:
+            # Rep ended inside frames the decoder did not return
+            if out is not None:
+                out.release()
+                out = None
+                outputs.append((output_path, ranges[rep][0], ranges[rep][1]))
+            rep += 1
+        if rep == len(ranges):
+            break
+        start_frame, end_frame = ranges[rep]
+        if frame_num < start_frame:
+            continue
+        
+        if out is None:
+            output_path = os.path.join(output_dir, f"rep_{rep+1}.mp4")
+            out = cv2.VideoWriter(output_path, fourcc, fps, (frame.shape[1], frame.shape[0]))
+        out.write(frame)
+        
+        if frame_num + 1 >= end_frame:
+            out.release()
+            out = None
+            outputs.append((output_path, start_frame, end_frame))
+            rep += 1
+    
+    if out is not None:
+        out.release()
+        outputs.append((output_path, ranges[rep][0], frame_num + 1))
+    return outputs
+
 
-def main(video_path, exercise_type):
-    processor = ExerciseRepProcessor()
-    count, exercise_type, signal, peaks = processor.process_video(video_path, exercise_type)
+def split_video_stream_copy(video_path, ranges, output_dir):
+    """
+    Write rep clips by copying compressed packets, without decoding or re-encoding.
+    
+    Each clip starts at the last keyframe at or before its rep's start frame,
+    so boundaries are only as precise as the video's keyframe interval.
+    
+    Args:
+        video_path (str): Path to input video
+        ranges (list): Sorted, non-overlapping (start_frame, end_frame) pairs
+        output_dir (str): Directory for rep_<n> clips (same container as the input)
+    
+    Returns:
+        list: (output_path, start_frame, end_frame) per written clip, with
+            frames snapped to keyframes
+    """
+    try:
+        import av
+    except ImportError:
+        raise RuntimeError("Stream-copy splitting requires PyAV (pip install av)")
+    
+    extension = os.path.splitext(video_path)[1]
+    outputs = []
+    with av.open(video_path) as source:
+        stream = source.streams.video[0]
+        frames_per_tick = float(stream.time_base * stream.average_rate)
+        first_pts = stream.start_time or 0
+        
+        def frame_index(packet):
+            return int(round((packet.pts - first_pts) * frames_per_tick))
+        
+        # First pass: demux only, to find keyframe positions
+        keyframes = [frame_index(p) for p in source.demux(stream) if p.pts is not None and p.is_keyframe]
+        if not keyframes:
+            return outputs
+        
+        # Snap each boundary to the last keyframe at or before it
+        starts = [keyframes[max(0, np.searchsorted(keyframes, start, side='right') - 1)] for start, _ in ranges]
+        ends = starts[1:] + [keyframes[max(0, np.searchsorted(keyframes, ranges[-1][1], side='right') - 1)]]
+        # Reps shorter than a keyframe interval collapse to nothing and are skipped
+        cuts = [(rep, start, end) for rep, (start, end) in enumerate(zip(starts, ends)) if end > start]
+        
+        # Second pass: route each GOP's packets to the clip it starts in
+        source.seek(0, stream=stream)
+        cut = None
+        out = out_stream = None
+        offset = 0
+        for packet in source.demux(stream):
+            # Flush packets carry no timestamps and cannot be muxed
+            if packet.dts is None or packet.pts is None:
+                continue
+            if packet.is_keyframe:
+                gop_start = frame_index(packet)
+                next_cut = next((c for c in cuts if c[1] <= gop_start < c[2]), None)
+                if next_cut != cut:
+                    if out is not None:
+                        out.close()
+                        outputs.append((output_path, cut[1], cut[2]))
+                        out = None
+                    cut = next_cut
+                    if cut is not None:
+                        output_path = os.path.join(output_dir, f"rep_{cut[0]+1}{extension}")
+                        out = av.open(output_path, 'w')
+                        out_stream = out.add_stream_from_template(stream)
+                        offset = packet.dts
+            if out is None:
+                continue
+            packet.pts -= offset
+            packet.dts -= offset
+            packet.stream = out_stream
+            out.mux(packet)
+        
+        if out is not None:
+            out.close()
+            outputs.append((output_path, cut[1], cut[2]))
+    return outputs
+
+
+def main(video_path, exercise_type, segments=1, sampling=None, resize=None, preset=DEFAULT_PRESET,
+         cache_dir=None, split_mode='reencode', instrument=None, profile=None, auto_tune=True, roi=None,
+         decode=None, repair=True):
+    sinks = []
+    if instrument:
+        sinks.append(JsonLogSink(instrument, video=os.path.basename(video_path), preset=preset))
+    if profile:
+        sinks.append(ProfileSink(profile))
+    
+    with instrumented(*sinks):
+        pose_cache = PoseCache(cache_dir) if cache_dir else None
+        processor = ExerciseRepProcessor(preset, pose_cache=pose_cache, auto_tune=auto_tune, repair=repair)
+        count, exercise_type, signal, peaks = processor.process_video(
+            video_path, exercise_type, segments=segments, sampling=sampling, resize=resize, roi=roi, decode=decode)
+        
+        if signal is not None and peaks is not None:
+            print(f"Detected {count} repetitions of {exercise_type}")
+            print_metrics(processor.rep_metrics(signal, peaks, exercise_type))
+            # Clips are written at full resolution, whatever size pose extraction decoded at
+            split_decode = {key: value for key, value in decode.items() if key != 'max_size'} if decode else None
+            processor.split_video(video_path, signal, exercise_type, mode=split_mode, decode=split_decode)
+        else:
+            print("Could not detect repetitions reliably.")
+        
+        if instrument:
+            sinks[0].print_summary()
     
     if signal is not None and peaks is not None:
-        print(f"Detected {count} repetitions of {exercise_type}")
         processor.visualize_rep_counting(signal, peaks, exercise_type)
 
-        processor.split_video(video_path, signal, exercise_type)
-    else:
-        print("Could not detect repetitions reliably.")
-
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Process exercise reps from a video.")
     parser.add_argument("video_path", type=str, help="Path to the input video file")
     parser.add_argument("exercise_type", type=str, help="Type of exercise")
+    parser.add_argument("--segments", type=int, default=1,
+                        help="Split the video into this many frame ranges extracted in parallel")
+    parser.add_argument("--sampling", type=str, default=None,
+                        help="Frame sampling: an integer stride or 'adaptive' (default: every frame)")
+    parser.add_argument("--resize", type=str, default=None,
+                        help="Inference resolution: stretch, letterbox, cap or native, optionally as policy@size")
+    parser.add_argument("--roi", type=float, nargs='?', const=0.2, default=None,
+                        help="Crop frames around the previous pose before resizing, with this margin (default 0.2)")
+    parser.add_argument("--decoder", type=str, default=None, choices=DECODER_BACKENDS,
+                        help="Video decoder backend (default: OpenCV with its default settings)")
+    parser.add_argument("--decode-threads", type=int, default=None,
+                        help="Decoder threads (0 lets FFmpeg choose)")
+    parser.add_argument("--decode-size", type=int, default=None,
+                        help="Downscale frames at decode time so the long side is at most this")
+    parser.add_argument("--preset", type=str, default=DEFAULT_PRESET, choices=list(POSE_PRESETS),
+                        help="Pose model speed/accuracy preset")
+    parser.add_argument("--cache-dir", type=str, default=None,
+                        help="Directory of cached pose landmarks to reuse across runs")
+    parser.add_argument("--split-mode", type=str, default='reencode', choices=['reencode', 'copy'],
+                        help="Write rep clips by re-encoding, or by stream copy cut at keyframes (needs PyAV)")
+    parser.add_argument("--instrument", type=str, default=None,
+                        help="Append per-stage timings and counters to this JSON-lines file")
+    parser.add_argument("--profile", type=str, nargs='+', default=None,
+                        help="Stages to run under cProfile (e.g. inference smoothing); writes profiles/<stage>.prof")
+    parser.add_argument("--fixed-params", action="store_true",
+                        help="Use the fixed 30 fps peak detection settings instead of tuning them to the rep cadence")
+    parser.add_argument("--no-repair", action="store_true",
+                        help="Count on the pose data as extracted, without gap filling and outlier rejection")
     
     args = parser.parse_args()
-    main(args.video_path, args.exercise_type)
+    sampling = int(args.sampling) if args.sampling and args.sampling.isdigit() else args.sampling
+    decode = None
+    if args.decoder or args.decode_threads is not None or args.decode_size:
+        decode = {'backend': args.decoder or 'opencv', 'max_size': args.decode_size}
+        if args.decode_threads is not None:
+            decode['threads'] = args.decode_threads
+    main(args.video_path, args.exercise_type, args.segments, sampling, args.resize, args.preset,
+         args.cache_dir, args.split_mode, args.instrument, args.profile, not args.fixed_params, args.roi, decode,
+         not args.no_repair)
@@ -0,0 +1,312 @@
+import cv2
+import numpy as np
+
+RESIZE_POLICIES = ('stretch', 'letterbox', 'cap', 'native')
+
+
+class InferenceResize:
+    """
+    Prepare frames for pose inference and map landmarks back to the frame.
+
+    Policies:
+        stretch: resize to size x size, ignoring aspect ratio (legacy behaviour)
+        letterbox: scale the long side to `size` and pad to a size x size square
+        cap: scale down so the long side is at most `size`, never upscale
+        native: pass frames through at their decoded resolution
+
+    MediaPipe returns landmarks normalized to the image it was given; only
+    letterboxing changes that image's geometry, so only letterboxed landmarks
+    need remapping to full-frame normalized coordinates.
+    """
+
+    def __init__(self, policy='stretch', size=1000):
+        """
+        Initialize the resize policy.
+
+        Args:
+            policy (str): One of RESIZE_POLICIES
+            size (int): Target size in pixels (ignored for 'native')
+        """
+        if policy not in RESIZE_POLICIES:
+            raise ValueError(f"Unknown resize policy: {policy}")
+        self.policy = policy
+        self.size = size
+        self.frame_shape = None
+        self.scale = 1.0
+        self.pad = (0, 0)
+
+    def __call__(self, frame):
+        """
+        Resize a BGR frame according to the policy and convert it to RGB.
+
+        Args:
+            frame (np.array): BGR frame of shape (H, W, 3)
+
+        Returns:
+            np.array: RGB image for inference
+        """
+        height, width = frame.shape[:2]
+        if self.frame_shape != (height, width):
+            self._configure(height, width)
+
+        if self.policy == 'stretch':
+            frame = cv2.resize(frame, (self.size, self.size))
+        elif self.policy == 'letterbox':
+            resized = cv2.resize(frame, self.resized_shape[::-1], interpolation=cv2.INTER_AREA)
+            pad_x, pad_y = self.pad
+            frame = cv2.copyMakeBorder(resized, pad_y, self.size - self.resized_shape[0] - pad_y,
+                                       pad_x, self.size - self.resized_shape[1] - pad_x,
+                                       cv2.BORDER_CONSTANT, value=(0, 0, 0))
+        elif self.policy == 'cap' and self.scale < 1.0:
+            frame = cv2.resize(frame, self.resized_shape[::-1], interpolation=cv2.INTER_AREA)
+
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    def _configure(self, height, width):
+        self.frame_shape = (height, width)
+        self.scale = 1.0
+        self.pad = (0, 0)
+        if self.policy in ('letterbox', 'cap'):
+            self.scale = self.size / max(height, width)
+            if self.policy == 'cap':
+                self.scale = min(self.scale, 1.0)
+        self.resized_shape = (max(1, round(height * self.scale)), max(1, round(width * self.scale)))
+        if self.policy == 'letterbox':
+            self.pad = ((self.size - self.resized_shape[1]) // 2, (self.size - self.resized_shape[0]) // 2)
+
+    @property
+    def input_shape(self):
+        """
+        (height, width) of the images passed to inference, once known.
+        """
+        if self.frame_shape is None:
+            return None
+        if self.policy in ('stretch', 'letterbox'):
+            return (self.size, self.size)
+        return self.resized_shape
+
+    def to_frame(self, landmarks):
+        """
+        Map landmarks from inference-image coordinates to full-frame coordinates.
+
+        Args:
+            landmarks (np.array): Array of shape (..., 4) with x, y, z, visibility
+
+        Returns:
+            np.array: Landmarks normalized to the original frame
+        """
+        if self.policy != 'letterbox':
+            return landmarks
+        landmarks = np.array(landmarks, dtype=np.float64)
+        pad_x, pad_y = self.pad
+        resized_h, resized_w = self.resized_shape
+        landmarks[..., 0] = (landmarks[..., 0] * self.size - pad_x) / resized_w
+        landmarks[..., 1] = (landmarks[..., 1] * self.size - pad_y) / resized_h
+        # z shares the scale of x
+        landmarks[..., 2] = landmarks[..., 2] * self.size / resized_w
+        return landmarks
+
+    def __repr__(self):
+        if self.policy == 'native':
+            return "native"
+        return f"{self.policy}@{self.size}"
+
+
+def make_resize(resize):
+    """
+    Build an InferenceResize from an extract_poses `resize` option.
+
+    Args:
+        resize: None (legacy 1000x1000 stretch), a policy name, a
+            "policy@size" string, a (policy, size) tuple, or an InferenceResize
+
+    Returns:
+        InferenceResize: A fresh resize object for one video
+    """
+    if resize is None:
+        return InferenceResize()
+    if isinstance(resize, InferenceResize):
+        return InferenceResize(resize.policy, resize.size)
+    if isinstance(resize, tuple):
+        return InferenceResize(*resize)
+    if isinstance(resize, str):
+        policy, _, size = resize.partition('@')
+        return InferenceResize(policy, int(size)) if size else InferenceResize(policy)
+    raise ValueError(f"Unknown resize option: {resize}")
+
+
+class RegionOfInterest:
+    """
+    Crop each frame to the area around the previous frame's pose.
+
+    A fixed camera usually sees the lifter in a small, slowly moving part of
+    the frame, so cropping before the inference resize spends fewer pixels
+    on background (and gives the model a larger view of the lifter). The
+    crop is the bounding box of the previous frame's visible landmarks plus
+    twice `margin` on every side. It only moves when the pose (plus `margin`)
+    leaves it or shrinks well inside it: MediaPipe's own tracking state is
+    kept in the coordinates of the image it was given, so it has to be reset
+    whenever the crop changes (see `changed`).
+
+    When no pose is found, or too few landmarks are visible, the next frame
+    is processed whole, so a lost lifter is re-acquired anywhere in view.
+    """
+
+    def __init__(self, margin=0.2, min_visibility=0.5, min_visible=8, shrink_ratio=0.25, max_fraction=0.8):
+        """
+        Initialize the region of interest.
+
+        Args:
+            margin (float): Fraction of the pose box's size that must stay
+                clear on each side; the crop is re-fitted with twice this
+            min_visibility (float): Visibility for a landmark to count as seen
+            min_visible (int): Seen landmarks needed to trust the pose for cropping
+            shrink_ratio (float): Re-fit the crop when the pose box's padded
+                area falls below this fraction of the crop's area
+            max_fraction (float): Crops covering more of the frame's area than
+                this are not worth it; use the full frame instead
+        """
+        self.margin = margin
+        self.min_visibility = min_visibility
+        self.min_visible = min_visible
+        self.shrink_ratio = shrink_ratio
+        self.max_fraction = max_fraction
+        self.box = None
+        self.changed = False
+        self.crop_box = None
+        self.frame_shape = None
+        self.cropped_frames = 0
+        self.full_frames = 0
+
+    def crop(self, frame):
+        """
+        Cut the current region out of a frame (the whole frame if there is none).
+
+        Args:
+            frame (np.array): Frame of shape (H, W, 3)
+
+        Returns:
+            np.array: View of the region, to pass to the inference resize
+        """
+        height, width = frame.shape[:2]
+        if self.frame_shape != (height, width):
+            self.frame_shape = (height, width)
+            self.box = None
+
+        if self.box is None:
+            self.crop_box = (0, 0, width, height)
+            self.full_frames += 1
+            return frame
+        self.crop_box = self.box
+        self.cropped_frames += 1
+        x1, y1, x2, y2 = self.box
+        return frame[y1:y2, x1:x2]
+
+    def to_frame(self, landmarks):
+        """
+        Map landmarks normalized to the last crop to full-frame coordinates.
+
+        Args:
+            landmarks (np.array): Array of shape (..., 4) with x, y, z, visibility
+
+        Returns:
+            np.array: Landmarks normalized to the original frame
+        """
+        x1, y1, x2, y2 = self.crop_box
+        height, width = self.frame_shape
+        if (x1, y1, x2, y2) == (0, 0, width, height):
+            return landmarks
+        landmarks = np.array(landmarks, dtype=np.float64)
+        landmarks[..., 0] = (landmarks[..., 0] * (x2 - x1) + x1) / width
+        landmarks[..., 1] = (landmarks[..., 1] * (y2 - y1) + y1) / height
+        # z shares the scale of x
+        landmarks[..., 2] = landmarks[..., 2] * (x2 - x1) / width
+        return landmarks
+
+    def update(self, landmarks):
+        """
+        Choose the region for the next frame from this frame's pose.
+
+        Sets `changed` when the next frame will be cropped differently from
+        this one.
+
+        Args:
+            landmarks (np.array): (33, 4) full-frame landmarks, or None if no
+                pose was found
+        """
+        previous = self.box
+        self.box = self._next_box(landmarks)
+        self.changed = self.box != previous
+
+    def _next_box(self, landmarks):
+        if landmarks is None:
+            return None
+        visible = landmarks[landmarks[:, 3] >= self.min_visibility]
+        if len(visible) < self.min_visible:
+            return None
+
+        needed = self._padded_box(visible, self.margin)
+        if needed is None:
+            return None
+        if self.box is not None:
+            x1, y1, x2, y2 = self.box
+            contained = x1 <= needed[0] and y1 <= needed[1] and needed[2] <= x2 and needed[3] <= y2
+            if contained and _area(needed) >= self.shrink_ratio * _area(self.box):
+                return self.box
+
+        # Re-fit with twice the margin, so the crop can stay put while the
+        # lifter moves within it
+        box = self._padded_box(visible, 2 * self.margin)
+        height, width = self.frame_shape
+        if box is None or _area(box) > self.max_fraction * width * height:
+            return None
+        return box
+
+    def _padded_box(self, visible, margin):
+        height, width = self.frame_shape
+        x = np.clip(visible[:, 0], 0, 1) * width
+        y = np.clip(visible[:, 1], 0, 1) * height
+        pad_x, pad_y = margin * (x.max() - x.min()), margin * (y.max() - y.min())
+        x0, y0 = max(0, int(x.min() - pad_x)), max(0, int(y.min() - pad_y))
+        x1, y1 = min(width, int(np.ceil(x.max() + pad_x))), min(height, int(np.ceil(y.max() + pad_y)))
+        # Landmarks all clipped to one edge leave nothing to crop
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return x0, y0, x1, y1
+
+    def print_report(self):
+        total = self.cropped_frames + self.full_frames
+        if total:
+            print(f"ROI: cropped {self.cropped_frames} of {total} frames "
+                  f"({100 * self.cropped_frames / total:.0f}%), full frame for the rest")
+
+    def __repr__(self):
+        return f"roi@{self.margin:g}"
+
+
+def _area(box):
+    x1, y1, x2, y2 = box
+    return (x2 - x1) * (y2 - y1)
+
+
+def make_roi(roi):
+    """
+    Build a RegionOfInterest from an extract_poses `roi` option.
+
+    Args:
+        roi: None or False (no cropping), True (default margin), a margin
+            as a float, or a RegionOfInterest
+
+    Returns:
+        RegionOfInterest: A fresh region for one video, or None
+    """
+    if roi is None or roi is False:
+        return None
+    if roi is True:
+        return RegionOfInterest()
+    if isinstance(roi, RegionOfInterest):
+        return RegionOfInterest(roi.margin, roi.min_visibility, roi.min_visible, roi.shrink_ratio,
+                                roi.max_fraction)
+    if isinstance(roi, (int, float)):
+        return RegionOfInterest(margin=float(roi))
+    raise ValueError(f"Unknown ROI option: {roi}")
@@ -0,0 +1,126 @@
+import numpy as np
+
+from angles import LANDMARKS
+from landmark_store import LandmarkSequence
+
+# Landmarks whose motion drives the adaptive sampling rate
+KEY_LANDMARKS = sorted(set(LANDMARKS.values()))
+
+
+class AdaptiveSampler:
+    """
+    Vary the inference rate with how predictable the motion is.
+
+    After each inferred frame the key landmarks are compared with a linear
+    extrapolation from the two previous inferred frames. While the motion is
+    steady (prediction error below `tolerance`) the stride grows by one up to
+    `max_stride`; near turning points, where the extrapolation overshoots, or
+    when the pose is lost, it drops straight back to every frame.
+    """
+
+    def __init__(self, max_stride=4, tolerance=0.03):
+        """
+        Initialize the sampler.
+
+        Args:
+            max_stride (int): Largest gap between inferred frames
+            tolerance (float): Largest extrapolation error (normalized x/y)
+                for which the stride may grow
+        """
+        self.max_stride = max_stride
+        self.tolerance = tolerance
+        self.stride = 1
+        self.next_frame = None
+        self.history = []
+
+    def should_infer(self, frame_number):
+        return self.next_frame is None or frame_number >= self.next_frame
+
+    def update(self, frame_number, landmarks):
+        """
+        Record an inferred frame and choose the next frame to infer.
+
+        Args:
+            frame_number (int): Frame that was just inferred
+            landmarks (np.array): (33, 4) landmarks, or None if no pose was found
+        """
+        if landmarks is None:
+            self.history = []
+            self.stride = 1
+        else:
+            coords = np.asarray(landmarks)[KEY_LANDMARKS, :2]
+            if len(self.history) == 2:
+                (f0, c0), (f1, c1) = self.history
+                predicted = c1 + (c1 - c0) * (frame_number - f1) / (f1 - f0)
+                error = np.abs(predicted - coords).max()
+                if error > self.tolerance:
+                    self.stride = 1
+                else:
+                    self.stride = min(self.stride + 1, self.max_stride)
+            self.history = (self.history + [(frame_number, coords)])[-2:]
+        self.next_frame = frame_number + self.stride
+
+
+def make_sampler(sampling):
+    """
+    Build a frame sampler from an extract_poses `sampling` option.
+
+    An int stride above 1 needs no sampler: extract_landmarks hands it to the
+    decoder, which skips the frames itself.
+
+    Args:
+        sampling: None or 1 (every frame), 'adaptive', or an object with
+            should_infer/update methods
+
+    Returns:
+        Sampler object, or None to infer every frame
+    """
+    if sampling is None or sampling == 1:
+        return None
+    if sampling == 'adaptive':
+        return AdaptiveSampler()
+    if hasattr(sampling, 'should_infer') and hasattr(sampling, 'update'):
+        return sampling
+    raise ValueError(f"Unknown sampling mode: {sampling}")
+
+
+def interpolate_skipped(sequence, inferred):
+    """
+    Fill frames skipped by a sampler by linear interpolation.
+
+    Only gaps whose inferred frames on both sides found a pose are filled, so
+    frames where tracking was genuinely lost stay missing.
+
+    Args:
+        sequence (LandmarkSequence): Landmarks of the inferred frames with a
+            detected pose, in frame order
+        inferred (list): Frame numbers that were run through inference
+
+    Returns:
+        LandmarkSequence: Inferred and interpolated frames, in frame order
+    """
+    if len(sequence) == 0:
+        return sequence
+
+    values = sequence.landmarks
+    detected = sequence.frame_numbers.astype(int)
+    inferred = np.asarray(inferred)
+
+    # A gap between consecutive detected frames is fillable only if no
+    # inference ran inside it (otherwise that frame had no pose)
+    starts, ends = detected[:-1], detected[1:]
+    ran_inside = np.searchsorted(inferred, ends) - np.searchsorted(inferred, starts, side='right')
+    fillable = (ends - starts > 1) & (ran_inside == 0)
+    if not fillable.any():
+        return sequence
+
+    frames = np.concatenate([np.arange(s + 1, e) for s, e in zip(starts[fillable], ends[fillable])])
+    right = np.searchsorted(detected, frames)
+    left = right - 1
+    weight = ((frames - detected[left]) / (detected[right] - detected[left]))[:, np.newaxis, np.newaxis]
+    filled = values[left] * (1 - weight) + values[right] * weight
+
+    landmarks = np.concatenate([values, filled.astype(np.float32)])
+    frame_numbers = np.concatenate([detected, frames])
+    order = np.argsort(frame_numbers, kind='stable')
+    return LandmarkSequence(landmarks[order], frame_numbers[order].astype(np.int32), sequence.metadata)
@@ -0,0 +1,452 @@
+import argparse
+import asyncio
+import collections
+import json
+import os
+import tempfile
+import time
+import uuid
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import parse_qs, urlsplit
+
+from presets import DEFAULT_PRESET, POSE_PRESETS
+from processor_pool import ProcessorPool
+
+UPLOAD_CHUNK_SIZE = 1 << 20
+MAX_HEADER_BYTES = 64 * 1024
+
+# Job states before the worker's result status (ok, no_pose, timeout, error) takes over
+QUEUED = 'queued'
+RUNNING = 'running'
+
+HTTP_REASONS = {
+    200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    411: 'Length Required', 413: 'Payload Too Large', 500: 'Internal Server Error',
+    503: 'Service Unavailable',
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class Job:
+    """
+    One submitted video and its progress through the service.
+    """
+
+    def __init__(self, video_path, exercise_type):
+        self.id = uuid.uuid4().hex
+        self.video_path = video_path
+        self.exercise_type = exercise_type
+        self.status = QUEUED
+        self.result = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._changed = asyncio.Event()
+
+    @property
+    def done(self):
+        return self.status not in (QUEUED, RUNNING)
+
+    def set_status(self, status, result=None):
+        self.status = status
+        self.result = result
+        if status == RUNNING:
+            self.started_at = time.time()
+        elif self.done:
+            self.finished_at = time.time()
+        # Wake everyone waiting on the old event and start a new one
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    @property
+    def changed(self):
+        """
+        Event set on the next status change.
+        """
+        return self._changed
+
+    def to_dict(self, queue_position=None):
+        record = {
+            'id': self.id,
+            'status': self.status,
+            'exercise_type': self.exercise_type,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+        if queue_position is not None:
+            record['queue_position'] = queue_position
+        if self.result is not None and self.result.get('error'):
+            record['error'] = self.result['error']
+        return record
+
+
+class RepCountService:
+    """
+    Asynchronous HTTP front end for rep counting.
+
+    Uploaded videos are streamed to disk and queued; a fixed number of
+    dispatcher tasks feed them to a process pool whose workers each keep a
+    warm ExerciseRepProcessor, so at most `workers` videos are processed at
+    once. Submissions are rejected with 503 once `max_queue` jobs are waiting
+    (uploads in flight count against the limit), which keeps latency bounded
+    instead of letting the backlog grow without limit.
+
+    Endpoints:
+        POST /jobs?exercise_type=<type>  raw video bytes as the body
+        GET  /jobs/<id>                  job status
+        GET  /jobs/<id>/events           status updates as newline-delimited JSON
+        GET  /jobs/<id>/result           count, exercise type, rep boundaries and per-rep metrics
+        GET  /metrics                    queue depth and job counters
+        GET  /health                     liveness check
+    """
+
+    def __init__(self, upload_dir=None, workers=None, max_queue=16, max_upload_bytes=512 * 1024 ** 2,
+                 timeout=None, preset=DEFAULT_PRESET, cache_dir=None, max_finished_jobs=1000,
+                 max_jobs_per_worker=100):
+        """
+        Initialize the service.
+
+        Args:
+            upload_dir (str, optional): Directory for uploaded videos (default: a temp dir)
+            workers (int, optional): Videos processed concurrently (default: CPU count)
+            max_queue (int): Jobs allowed to wait for a worker before submissions are rejected
+            max_upload_bytes (int): Largest accepted upload
+            timeout (float, optional): Seconds allowed per video
+            preset (str): Pose configuration preset for the workers
+            cache_dir (str, optional): Pose landmark cache shared by the workers
+            max_finished_jobs (int): Finished jobs kept for status queries
+            max_jobs_per_worker (int, optional): Jobs before a worker process is recycled
+        """
+        self.upload_dir = upload_dir or tempfile.mkdtemp(prefix='rep-count-uploads-')
+        os.makedirs(self.upload_dir, exist_ok=True)
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.max_upload_bytes = max_upload_bytes
+        self.timeout = timeout
+        self.max_finished_jobs = max_finished_jobs
+        self.pool = ProcessorPool(self.workers, preset, cache_dir, max_jobs_per_worker)
+
+        self.jobs = {}
+        self.finished = collections.deque()
+        self.queue = None
+        self.dispatchers = []
+        self.uploading = 0
+        self.running = 0
+        self.counters = collections.Counter()
+
+    async def start(self, host='127.0.0.1', port=8000):
+        """
+        Start the worker pool, the dispatchers and the HTTP listener.
+
+        Returns:
+            asyncio.Server: The listening server
+        """
+        self.queue = asyncio.Queue()
+        # Bring every worker up before accepting requests so the first jobs
+        # do not pay for MediaPipe startup
+        loop = asyncio.get_running_loop()
+        for info in await loop.run_in_executor(None, self.pool.start):
+            print(f"Worker {info['pid']} ready in {info['init_seconds']:.1f}s")
+        self.dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+        server = await asyncio.start_server(self._handle_connection, host, port, limit=MAX_HEADER_BYTES)
+        print(f"Serving on {', '.join(str(s.getsockname()) for s in server.sockets)} "
+              f"with {self.workers} workers")
+        return server
+
+    async def stop(self):
+        """
+        Cancel the dispatchers and shut the worker pool down.
+        """
+        for task in self.dispatchers:
+            task.cancel()
+        await asyncio.gather(*self.dispatchers, return_exceptions=True)
+        self.pool.shutdown(wait=False)
+
+    def metrics(self):
+        """
+        Current load and job counters.
+
+        Returns:
+            dict: Queue depth, in-flight work and totals per final status
+        """
+        return {
+            'queue_depth': self.queue.qsize() if self.queue is not None else 0,
+            'running': self.running,
+            'uploading': self.uploading,
+            'workers': self.workers,
+            'max_queue': self.max_queue,
+            'jobs': len(self.jobs),
+            'worker_restarts': self.pool.restarts,
+            'counters': dict(self.counters),
+        }
+
+    # Job processing
+
+    async def _dispatch(self):
+        while True:
+            job = await self.queue.get()
+            job.set_status(RUNNING)
+            self.running += 1
+            try:
+                result = await asyncio.wrap_future(self.pool.submit(
+                    job.video_path, job.exercise_type, self.timeout, {'output_format': None}))
+            except BrokenProcessPool:
+                # A worker died (e.g. crashed inside MediaPipe); the pool is
+                # rebuilt on the next submit
+                result = {'status': 'error', 'error': "Worker process died"}
+            except Exception as e:
+                result = {'status': 'error', 'error': f"{type(e).__name__}: {e}"}
+            finally:
+                self.running -= 1
+                self.queue.task_done()
+
+            result.pop('traceback', None)
+            job.set_status(result['status'], result)
+            self.counters[result['status']] += 1
+            self._discard_upload(job)
+            self._retire(job)
+
+    def _discard_upload(self, job):
+        try:
+            os.remove(job.video_path)
+        except FileNotFoundError:
+            pass
+
+    def _retire(self, job):
+        self.finished.append(job.id)
+        while len(self.finished) > self.max_finished_jobs:
+            self.jobs.pop(self.finished.popleft(), None)
+
+    def _queue_position(self, job):
+        if job.status != QUEUED:
+            return None
+        # asyncio.Queue keeps its items in a deque
+        for position, queued in enumerate(self.queue._queue):
+            if queued is job:
+                return position
+        return None
+
+    # HTTP handling
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            try:
+                method, path, query, headers = await self._read_head(reader)
+                await self._route(method, path, query, headers, reader, writer)
+            except HTTPError as e:
+                self._respond(writer, e.status, {'error': str(e)}, e.headers)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                pass
+            except Exception as e:
+                print(f"Error handling request: {type(e).__name__}: {e}")
+                self._respond(writer, 500, {'error': "Internal server error"})
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _read_head(self, reader):
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.LimitOverrunError:
+            raise HTTPError(400, "Request header too large")
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, _ = lines[0].split(' ', 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        return method.upper(), url.path.rstrip('/') or '/', query, headers
+
+    async def _route(self, method, path, query, headers, reader, writer):
+        parts = path.strip('/').split('/')
+        if parts == ['health']:
+            self._respond(writer, 200, {'status': 'ok'})
+        elif parts == ['metrics']:
+            self._respond(writer, 200, self.metrics())
+        elif parts == ['jobs']:
+            if method != 'POST':
+                raise HTTPError(405, "Use POST to submit a video")
+            await self._submit(query, headers, reader, writer)
+        elif len(parts) in (2, 3) and parts[0] == 'jobs':
+            if method != 'GET':
+                raise HTTPError(405, "Use GET to query a job")
+            job = self.jobs.get(parts[1])
+            if job is None:
+                raise HTTPError(404, "Unknown job")
+            if len(parts) == 2:
+                self._respond(writer, 200, job.to_dict(self._queue_position(job)))
+            elif parts[2] == 'events':
+                await self._stream_events(job, writer)
+            elif parts[2] == 'result':
+                self._respond_result(job, writer)
+            else:
+                raise HTTPError(404, "Not found")
+        else:
+            raise HTTPError(404, "Not found")
+
+    async def _submit(self, query, headers, reader, writer):
+        # Admission control happens before reading the body so rejected
+        # clients do not upload a whole video first
+        if self.queue.qsize() + self.uploading >= self.max_queue:
+            self.counters['rejected'] += 1
+            raise HTTPError(503, "Queue is full, retry later", {'Retry-After': '5'})
+
+        chunked = headers.get('transfer-encoding', '').lower() == 'chunked'
+        if not chunked and 'content-length' not in headers:
+            raise HTTPError(411, "Content-Length or chunked transfer encoding required")
+        if not chunked:
+            try:
+                length = int(headers['content-length'])
+            except ValueError:
+                raise HTTPError(400, "Malformed Content-Length")
+            if length < 0:
+                raise HTTPError(400, "Malformed Content-Length")
+            if length > self.max_upload_bytes:
+                raise HTTPError(413, f"Upload exceeds {self.max_upload_bytes} bytes")
+            if length == 0:
+                raise HTTPError(400, "Empty upload")
+
+        extension = query.get('ext', '.mp4')
+        if not extension.startswith('.') or not extension[1:].isalnum():
+            raise HTTPError(400, "Invalid file extension")
+        video_path = os.path.join(self.upload_dir, uuid.uuid4().hex + extension)
+
+        self.uploading += 1
+        try:
+            with open(video_path, 'wb') as f:
+                if chunked:
+                    await self._receive_chunked(reader, f)
+                else:
+                    await self._receive(reader, f, length)
+        except BaseException:
+            try:
+                os.remove(video_path)
+            except FileNotFoundError:
+                pass
+            raise
+        finally:
+            self.uploading -= 1
+
+        job = Job(video_path, query.get('exercise_type'))
+        self.jobs[job.id] = job
+        self.queue.put_nowait(job)
+        self.counters['submitted'] += 1
+        self._respond(writer, 202, job.to_dict(self._queue_position(job)),
+                      {'Location': f"/jobs/{job.id}"})
+
+    async def _receive(self, reader, f, length):
+        remaining = length
+        while remaining:
+            chunk = await reader.read(min(UPLOAD_CHUNK_SIZE, remaining))
+            if not chunk:
+                raise HTTPError(400, "Upload ended early")
+            f.write(chunk)
+            remaining -= len(chunk)
+
+    async def _receive_chunked(self, reader, f):
+        received = 0
+        while True:
+            size_line = await reader.readuntil(b'\r\n')
+            try:
+                size = int(size_line.split(b';', 1)[0], 16)
+            except ValueError:
+                raise HTTPError(400, "Malformed chunk size")
+            if size == 0:
+                await reader.readuntil(b'\r\n')
+                break
+            received += size
+            if received > self.max_upload_bytes:
+                raise HTTPError(413, f"Upload exceeds {self.max_upload_bytes} bytes")
+            await self._receive(reader, f, size)
+            await reader.readexactly(2)
+        if received == 0:
+            raise HTTPError(400, "Empty upload")
+
+    async def _stream_events(self, job, writer):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+                     b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n")
+        while True:
+            # Grab the event before writing so a change during drain is not missed
+            changed = job.changed
+            writer.write(json.dumps(job.to_dict(self._queue_position(job))).encode() + b'\n')
+            await writer.drain()
+            if job.done:
+                return
+            await changed.wait()
+
+    def _respond_result(self, job, writer):
+        if not job.done:
+            self._respond(writer, 202, job.to_dict(self._queue_position(job)))
+            return
+        result = job.result
+        self._respond(writer, 200, {
+            'id': job.id,
+            'status': job.status,
+            'count': result.get('count', 0),
+            'exercise_type': result.get('exercise_type'),
+            'boundaries': result.get('boundaries', []),
+            'peaks': result.get('peaks', []),
+            'rep_metrics': result.get('rep_metrics'),
+            'seconds': result.get('seconds'),
+            'error': result.get('error'),
+        })
+
+    def _respond(self, writer, status, body, headers=None):
+        payload = json.dumps(body).encode()
+        lines = [f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}",
+                 "Content-Type: application/json",
+                 f"Content-Length: {len(payload)}",
+                 "Connection: close"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + payload)
+
+
+async def serve(host, port, **options):
+    service = RepCountService(**options)
+    server = await service.start(host, port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve rep counting over HTTP.")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=None, help="Videos processed concurrently")
+    parser.add_argument("--max-queue", type=int, default=16, help="Waiting jobs before submissions are rejected")
+    parser.add_argument("--max-upload-mb", type=int, default=512, help="Largest accepted upload in MiB")
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds allowed per video")
+    parser.add_argument("--upload-dir", type=str, default=None, help="Directory for uploaded videos")
+    parser.add_argument("--preset", type=str, default=DEFAULT_PRESET, choices=list(POSE_PRESETS),
+                        help="Pose model speed/accuracy preset")
+    parser.add_argument("--cache-dir", type=str, default=None,
+                        help="Directory of cached pose landmarks to reuse across runs")
+    parser.add_argument("--max-jobs-per-worker", type=int, default=100,
+                        help="Jobs before a worker process is recycled to bound memory growth")
+
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, upload_dir=args.upload_dir, workers=args.workers,
+                          max_queue=args.max_queue, max_upload_bytes=args.max_upload_mb * 1024 ** 2,
+                          timeout=args.timeout, preset=args.preset, cache_dir=args.cache_dir,
+                          max_jobs_per_worker=args.max_jobs_per_worker))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,366 @@
+import argparse
+from collections import deque
+
+import numpy as np
+from scipy.signal import savgol_coeffs
+
+from angles import LANDMARKS, joint_angles, joint_triple_indices
+
+# Per-exercise signal definitions, mirroring the batch branches of
+# ExerciseRepProcessor.count_reps. 'invert' is the net sign applied before
+# peak detection (count_reps negates some signals and detect_reps_from_signal
+# negates pushups/squats again).
+EXERCISE_SIGNALS = {
+    'bicep_curl': {'joint': 'elbow', 'invert': True, 'prominence': 0.3, 'distance': 15},
+    'pushup': {'landmark': 'nose', 'invert': True, 'prominence': 0.15, 'distance': 15},
+    'squat': {'joint': 'knee', 'invert': False, 'prominence': 0.25, 'distance': 20},
+    'shoulder_press': {'landmark': 'right_wrist', 'invert': True, 'prominence': 0.5, 'distance': 15},
+}
+
+
+class StreamingRepCounter:
+    """
+    Incremental rep counter that consumes one landmark frame at a time.
+
+    The signal is smoothed with a causal Savitzky-Golay filter evaluated
+    `window_length // 2` frames behind the newest sample, which reproduces the
+    batch `savgol_filter` output exactly. A smoothed sample is confirmed as a
+    peak once it is the maximum of the last `distance` samples and of the next
+    `confirm_frames` samples, and both its rise from the preceding valley and
+    its drop within the look-ahead exceed `prominence` times the running
+    standard deviation. Every rep event is therefore emitted exactly `latency`
+    frames after its turning point.
+
+    Because the standard deviation is only known up to the current frame, peaks
+    close to the batch prominence threshold can differ. On the shoulder press
+    recordings in pose_data every batch peak is found at the same frame, and
+    the count is within one rep of detect_reps_from_signal.
+    """
+
+    def __init__(self, exercise_type='shoulder_press', window_length=15, polyorder=3,
+                 prominence=None, distance_between_peaks=None, confirm_frames=None, side='right'):
+        """
+        Initialize the streaming counter.
+
+        Args:
+            exercise_type (str): One of the keys of EXERCISE_SIGNALS
+            window_length (int): Window length for the Savitzky-Golay filter
+            polyorder (int): Polynomial order for the Savitzky-Golay filter
+            prominence (float): Required rise as a factor of the signal's std
+                (defaults to the batch value for the exercise)
+            distance_between_peaks (int): Minimum frames between peaks
+                (defaults to the batch value for the exercise)
+            confirm_frames (int): Look-ahead frames used to confirm a peak
+                (defaults to the peak distance)
+            side (str): 'left' or 'right' for joint-angle signals
+        """
+        if exercise_type not in EXERCISE_SIGNALS:
+            raise ValueError(f"Streaming counting does not support exercise type: {exercise_type}")
+        if window_length % 2 == 0:
+            window_length += 1
+
+        config = EXERCISE_SIGNALS[exercise_type]
+        self.exercise_type = exercise_type
+        self.sign = -1.0 if config['invert'] else 1.0
+        self.prominence = config['prominence'] if prominence is None else prominence
+        self.distance = config['distance'] if distance_between_peaks is None else distance_between_peaks
+        self.confirm_frames = self.distance if confirm_frames is None else confirm_frames
+
+        if 'joint' in config:
+            self.triple = joint_triple_indices(LANDMARKS, config['joint'], side)
+            self.landmark_idx = None
+        else:
+            self.triple = None
+            self.landmark_idx = LANDMARKS[config['landmark']]
+
+        self.window_length = window_length
+        self.polyorder = polyorder
+        self.lag = window_length // 2
+        self.latency = self.lag + self.confirm_frames
+        # Coefficients that evaluate the fitted polynomial at each position
+        # of the window; the centre row is the steady-state causal filter
+        self.coeffs = np.array([savgol_coeffs(window_length, polyorder, pos=pos, use='dot')
+                                for pos in range(window_length)])
+
+        self.raw = deque(maxlen=window_length)
+        self.frame_numbers = deque(maxlen=window_length)
+        self.smoothed = deque(maxlen=self.distance + self.confirm_frames + 1)
+        self.reset()
+
+    def reset(self):
+        """
+        Clear all buffered state so a new set can be counted.
+        """
+        self.raw.clear()
+        self.frame_numbers.clear()
+        self.smoothed.clear()
+        self.num_samples = 0
+        self.num_smoothed = 0
+        self.count = 0
+        self.last_peak = None
+        self.valley = np.inf
+        self.last_value = None
+        # Welford running statistics of the smoothed signal
+        self._num_finite = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def frame_signal(self, landmarks):
+        """
+        Compute the tracked signal value for a single frame.
+
+        Args:
+            landmarks: MediaPipe pose_landmarks, or an array of shape (33, >=2)
+
+        Returns:
+            float: Signal value (before inversion), NaN if it cannot be computed
+        """
+        if hasattr(landmarks, 'landmark'):
+            landmarks = np.array([[l.x, l.y] for l in landmarks.landmark])
+        landmarks = np.asarray(landmarks, dtype=np.float64)
+
+        if self.triple is not None:
+            return joint_angles(landmarks[list(self.triple), :2][np.newaxis])[0]
+        return landmarks[self.landmark_idx, 1]
+
+    def update(self, landmarks, frame_number=None):
+        """
+        Feed one frame of landmarks into the counter.
+
+        Args:
+            landmarks: MediaPipe pose_landmarks, an array of shape (33, >=2),
+                or None when no pose was detected (the frame is skipped)
+            frame_number (int): Optional source frame number for reporting
+
+        Returns:
+            list: Rep events (dicts) confirmed by this frame
+        """
+        if landmarks is None:
+            return []
+
+        value = self.frame_signal(landmarks)
+        if np.isnan(value):
+            if self.last_value is None:
+                return []
+            value = self.last_value
+        self.last_value = value
+
+        self.raw.append(self.sign * value)
+        self.frame_numbers.append(self.num_samples if frame_number is None else frame_number)
+        self.num_samples += 1
+
+        if len(self.raw) < self.window_length:
+            return []
+
+        window = np.fromiter(self.raw, dtype=np.float64, count=self.window_length)
+        events = []
+        if self.num_samples == self.window_length:
+            # First full window: also fill in the leading edge like mode='interp'
+            for pos in range(self.lag):
+                events.extend(self._push_smoothed(self.coeffs[pos] @ window, self.frame_numbers[pos]))
+        events.extend(self._push_smoothed(self.coeffs[self.lag] @ window, self.frame_numbers[self.lag]))
+        return events
+
+    def flush(self):
+        """
+        Finish the stream: smooth the trailing edge and confirm any final peak.
+
+        Returns:
+            list: Rep events confirmed while flushing
+        """
+        events = []
+        if len(self.raw) == self.window_length:
+            window = np.fromiter(self.raw, dtype=np.float64, count=self.window_length)
+            for pos in range(self.lag + 1, self.window_length):
+                events.extend(self._push_smoothed(self.coeffs[pos] @ window, self.frame_numbers[pos]))
+        # Pad with NaN so the last samples can be tested against a shortened look-ahead
+        for _ in range(self.confirm_frames):
+            events.extend(self._push_smoothed(np.nan, None))
+        return events
+
+    def _push_smoothed(self, value, frame_number):
+        """
+        Append a smoothed sample and test the sample confirm_frames back for a peak.
+        """
+        if np.isfinite(value):
+            self._num_finite += 1
+            delta = value - self._mean
+            self._mean += delta / self._num_finite
+            self._m2 += delta * (value - self._mean)
+        self.smoothed.append((self.num_smoothed, value, frame_number))
+        self.num_smoothed += 1
+
+        candidate_pos = len(self.smoothed) - 1 - self.confirm_frames
+        if candidate_pos < 0:
+            return []
+
+        index, candidate, candidate_frame = self.smoothed[candidate_pos]
+        valley = self.valley
+        self.valley = min(self.valley, candidate)
+
+        if index == 0 or not np.isfinite(candidate):
+            return []
+        # Must be the highest sample in the look-back distance and look-ahead window
+        for other_index, other, _ in self.smoothed:
+            if other_index == index:
+                continue
+            if other > candidate or (other == candidate and other_index < index):
+                if index - other_index < self.distance:
+                    return []
+        if self.last_peak is not None and index - self.last_peak < self.distance:
+            return []
+
+        # Rise from the preceding valley and drop within the look-ahead window
+        # must both exceed the prominence threshold
+        std = np.sqrt(self._m2 / self._num_finite)
+        threshold = self.prominence * std
+        following = [other for other_index, other, _ in self.smoothed
+                     if other_index > index and not np.isnan(other)]
+        if not following or candidate - valley <= threshold or candidate - min(following) <= threshold:
+            return []
+
+        self.count += 1
+        self.last_peak = index
+        self.valley = np.inf
+        return [{
+            'rep': self.count,
+            'peak_index': index,
+            'frame_number': candidate_frame,
+            'detected_at': self.num_smoothed - 1 + self.lag,
+            'value': self.sign * candidate,
+        }]
+
+
+def stream_video(source, exercise_type, preset='realtime'):
+    """
+    Count reps live from a video file or camera, printing each rep as it is confirmed.
+
+    Args:
+        source (str): Video path, or a camera index such as "0"
+        exercise_type (str): Exercise type to count, or 'auto' to classify it
+            from the first seconds of pose data with the trained classifier
+            (frames seen until then are replayed into the counter)
+        preset (str): Pose configuration preset
+
+    Returns:
+        int: Number of reps counted
+    """
+    import cv2
+    import mediapipe as mp
+    from presets import pose_options
+
+    pose = mp.solutions.pose.Pose(static_image_mode=False, **pose_options(preset))
+    cap = cv2.VideoCapture(int(source) if source.isdigit() else source)
+
+    classifier = None
+    pending = []
+    if exercise_type == 'auto':
+        from classifier import load_classifier, window_frames
+        classifier = load_classifier()
+        if classifier is None:
+            raise ValueError("Classifying the exercise needs a trained model (see train_classifier.py)")
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        needed = window_frames(fps, classifier.window_seconds)
+        counter = None
+    else:
+        counter = StreamingRepCounter(exercise_type)
+
+    frame_count = 0
+    events = []
+    while cap.isOpened():
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        frame_rgb = cv2.cvtColor(cv2.resize(frame, (1000, 1000)), cv2.COLOR_BGR2RGB)
+        results = pose.process(frame_rgb)
+        if counter is None:
+            landmarks = results.pose_landmarks
+            if landmarks is not None:
+                pending.append((np.array([[l.x, l.y, l.z, l.visibility] for l in landmarks.landmark],
+                                         dtype=np.float32), frame_count))
+            if len(pending) >= needed:
+                counter, exercise_type = _classified_counter(classifier, pending, fps, frame.shape)
+                for landmarks, frame_number in pending:
+                    events.extend(counter.update(landmarks, frame_number))
+        else:
+            events.extend(counter.update(results.pose_landmarks, frame_count))
+        frame_count += 1
+
+        for event in events:
+            print(f"Rep {event['rep']} at frame {event['frame_number']} (seen at frame {frame_count - 1})")
+        events = []
+
+    cap.release()
+    if counter is None:
+        if not pending:
+            print("No pose detected")
+            return 0
+        counter, exercise_type = _classified_counter(classifier, pending, fps, frame.shape)
+        for landmarks, frame_number in pending:
+            events.extend(counter.update(landmarks, frame_number))
+    for event in counter.flush():
+        print(f"Rep {event['rep']} at frame {event['frame_number']} (end of stream)")
+
+    print(f"Counted {counter.count} reps of {exercise_type}")
+    return counter.count
+
+
+def _classified_counter(classifier, pending, fps, shape):
+    """
+    Classify buffered (landmarks, frame number) pairs and start a counter for the result.
+    """
+    from landmark_store import LandmarkSequence
+
+    landmarks, frame_numbers = zip(*pending)
+    sequence = LandmarkSequence(np.stack(landmarks), np.array(frame_numbers),
+                                {'fps': fps, 'width': shape[1], 'height': shape[0]})
+    exercise_type, confidence = classifier.classify(sequence)
+    print(f"Classified as {exercise_type} ({confidence:.2f}) after {len(pending)} frames with a pose")
+    return StreamingRepCounter(exercise_type), exercise_type
+
+
+def compare_with_batch(pose_path, exercise_type):
+    """
+    Replay stored pose data frame by frame and compare against batch counting.
+
+    Args:
+        pose_path (str): Path to pose data (.npz or legacy .csv)
+        exercise_type (str): Exercise type to count
+    """
+    from landmark_store import load_landmarks
+    from reps import ExerciseRepProcessor
+
+    sequence = load_landmarks(pose_path)
+
+    counter = StreamingRepCounter(exercise_type)
+    events = []
+    for landmarks, frame_number in zip(sequence.landmarks, sequence.frame_numbers):
+        for event in counter.update(landmarks, frame_number):
+            print(f"Rep {event['rep']} at frame {event['frame_number']} "
+                  f"(emitted {event['detected_at'] - event['peak_index']} frames later)")
+            events.append(event)
+    events.extend(counter.flush())
+
+    # The streaming counter uses the fixed detection settings on the raw landmarks, so compare like with like
+    batch_count, _, _, batch_peaks = ExerciseRepProcessor(auto_tune=False, repair=False).count_reps(
+        pose_path=pose_path, exercise_type=exercise_type)
+    stream_peaks = [event['peak_index'] for event in events]
+    print(f"Streaming: {len(stream_peaks)} reps at {stream_peaks}")
+    print(f"Batch:     {batch_count} reps at {list(batch_peaks)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Count reps frame by frame with the streaming rep counter.")
+    parser.add_argument("source", type=str,
+                        help="Video path or camera index, or stored pose data (.npz/.csv) to compare "
+                             "against batch counting")
+    parser.add_argument("exercise_type", type=str,
+                        help="Type of exercise, or 'auto' to classify it from the first seconds (live counting)")
+    parser.add_argument("--preset", type=str, default='realtime', help="Pose model preset for live counting")
+
+    args = parser.parse_args()
+    if args.source.endswith(('.npz', '.csv')):
+        compare_with_batch(args.source, args.exercise_type)
+    else:
+        stream_video(args.source, args.exercise_type, args.preset)
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from angles import LANDMARKS, fill_missing, joint_angles, joint_triple_indices
+
+
+def test_right_and_straight_angles():
+    points = np.array([
+        [[1, 0], [0, 0], [0, 1]],
+        [[-1, 0], [0, 0], [2, 0]],
+        [[1, 1], [0, 0], [2, 2]],
+    ])
+    np.testing.assert_allclose(joint_angles(points), [90, 180, 0], atol=1e-4)
+
+
+def test_3d_angles_use_z():
+    points = np.array([[[1, 0, 0], [0, 0, 0], [0, 0, 1]]])
+    np.testing.assert_allclose(joint_angles(points, use_z=True), [90])
+    # Without z the third point sits on the vertex
+    assert np.isnan(joint_angles(points)[0])
+
+
+def test_collapsed_landmark_pair_is_nan():
+    # The wrist sits on the elbow; the long upper arm must not make the angle valid
+    points = np.array([
+        [[0, -10], [0, 0], [1e-12, 0]],
+        [[0, -10], [0, 0], [0, 0]],
+        [[0, -10], [0, 0], [1, 0]],
+    ])
+    angles = joint_angles(points)
+    assert np.isnan(angles[:2]).all()
+    assert angles[2] == pytest.approx(90)
+
+
+def test_rejects_bad_shapes():
+    with pytest.raises(ValueError):
+        joint_angles(np.zeros((4, 2, 2)))
+    with pytest.raises(ValueError):
+        joint_angles(np.zeros((4, 3, 2)), use_z=True)
+
+
+def test_joint_triple_indices():
+    assert joint_triple_indices(LANDMARKS, 'elbow', 'left') == (11, 13, 15)
+    with pytest.raises(ValueError):
+        joint_triple_indices(LANDMARKS, 'ankle')
+
+
+def test_fill_missing():
+    np.testing.assert_allclose(fill_missing(np.array([np.nan, 1.0, np.nan, 3.0, np.nan])), [1, 1, 2, 3, 3])
+    assert np.isnan(fill_missing(np.full(3, np.nan))).all()
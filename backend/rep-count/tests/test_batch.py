@@ -0,0 +1,81 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+import batch
+from metrics import METRIC_COLUMNS
+from reps import ExerciseRepProcessor
+
+
+class StubProcessor:
+    """Stands in for ExerciseRepProcessor without running pose inference."""
+
+    rep_boundaries = ExerciseRepProcessor.rep_boundaries
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.frames = None
+
+    def reset_tracking(self):
+        pass
+
+    def process_video(self, video_path, exercise_type=None, **extract_options):
+        time.sleep(self.delay)
+        # Four reps, with small wiggles between them that are troughs but not reps
+        t = np.arange(300)
+        smoothed = np.sin(2 * np.pi * t / 75) + 0.05 * np.sin(2 * np.pi * t / 9)
+        peaks = np.array([19, 94, 169, 244])
+        return len(peaks), 'shoulder_press', smoothed, peaks
+
+    def rep_metrics(self, smoothed, peaks, exercise_type):
+        return {column: np.zeros(len(peaks), dtype=int) for column in METRIC_COLUMNS}
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    stub = StubProcessor()
+    monkeypatch.setattr(batch, '_processor', stub)
+    return stub
+
+
+def test_process_one_with_timeout(processor):
+    result = batch._process_one('clip.mov', None, 5.0)
+    assert result['status'] == 'ok'
+    assert result['count'] == 4
+
+
+def test_process_one_times_out(processor):
+    processor.delay = 1.0
+    result = batch._process_one('clip.mov', None, 0.2)
+    assert result['status'] == 'timeout'
+
+
+def test_boundaries_match_count(processor):
+    result = batch._process_one('clip.mov', None, None)
+    assert len(result['boundaries']) == result['count']
+    assert len(result['rep_metrics']['rep']) == result['count']
+
+
+def init_stub_worker(preset, cache_dir):
+    pass
+
+
+def process_or_crash(video_path, exercise_type, timeout, extract_options=None):
+    # Runs in the spawned workers in place of batch._process_one
+    if 'crash' in video_path:
+        os._exit(1)
+    return {'video': video_path, 'status': 'ok', 'count': 3, 'exercise_type': 'squat', 'peaks': [],
+            'seconds': 0.0}
+
+
+def test_batch_survives_a_dead_worker(monkeypatch):
+    monkeypatch.setattr(batch, '_init_worker', init_stub_worker)
+    monkeypatch.setattr(batch, '_process_one', process_or_crash)
+    videos = ['a.mov', 'b.mov', 'crash.mov', 'c.mov', 'd.mov']
+    summary = batch.process_batch(videos, workers=2)
+    assert [r['video'] for r in summary['results']] == videos
+    assert [r['status'] for r in summary['results']] == ['ok', 'ok', 'error', 'ok', 'ok']
+    assert summary['results'][2]['error'] == "Worker process died"
+    assert summary['failed'] == 1
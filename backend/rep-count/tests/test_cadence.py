@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from cadence import MIN_STRENGTH, REFERENCE_FPS, cadence_parameters, estimate_period, tune_detection
+
+
+def rep_signal(period, reps=4, noise=0.3, seed=0):
+    """
+    Rep-like signal with a known period: a sharpened sine (long pauses at the
+    ends of the movement, as in a press), white noise and slow drift.
+    """
+    rng = np.random.default_rng(seed)
+    frames = int(round(period * reps))
+    t = np.arange(frames)
+    wave = np.sin(2 * np.pi * t / period)
+    return np.sign(wave) * np.abs(wave) ** 0.5 + 0.5 * t / frames + noise * rng.standard_normal(frames)
+
+
+@pytest.mark.parametrize('fps', [24, 30, 60])
+@pytest.mark.parametrize('seconds', [1.0, 2.5, 4.0, 8.0])
+def test_estimate_period_of_noisy_reps(fps, seconds):
+    period = seconds * fps
+    (estimated,), (strength,) = estimate_period(rep_signal(period), fps)
+    assert abs(estimated - period) / period < 0.05
+    assert strength >= MIN_STRENGTH
+
+
+def test_estimate_period_of_several_signals():
+    signals = np.stack([rep_signal(60, seed=1), rep_signal(90, seed=2)[:240]])
+    periods, _ = estimate_period(signals)
+    np.testing.assert_allclose(periods, [60, 90], rtol=0.05)
+
+
+def test_flat_signal_has_no_period():
+    (period,), (strength,) = estimate_period(np.ones(300))
+    assert np.isnan(period)
+    assert strength == 0
+    assert tune_detection(np.ones(300))[1] is None
+
+
+def test_noise_has_no_trusted_period():
+    noise = np.random.default_rng(3).standard_normal(300)
+    assert tune_detection(noise)[1] is None
+
+
+def test_too_short_for_a_repeat():
+    # Two thirds of the clip is below the shortest rep considered
+    (period,), _ = estimate_period(rep_signal(10, reps=3))
+    assert np.isnan(period)
+
+
+def test_tune_detection_scales_with_period():
+    parameters, period = tune_detection(rep_signal(75))
+    assert period == pytest.approx(75, rel=0.05)
+    assert parameters == {'window_length': 15, 'width': 5, 'distance_between_peaks': 38}
+
+
+@pytest.mark.parametrize('period', [None, np.nan])
+def test_cadence_parameters_without_period_rescale_defaults(period):
+    assert cadence_parameters(period) == {'window_length': 15, 'width': 5, 'distance_between_peaks': 15}
+    assert cadence_parameters(period, fps=2 * REFERENCE_FPS) == {
+        'window_length': 31, 'width': 10, 'distance_between_peaks': 30}
+
+
+def test_cadence_parameters_limits():
+    # Very fast reps: the window must still exceed the polynomial order, and stay odd
+    tiny = cadence_parameters(3)
+    assert tiny['window_length'] == 5
+    assert tiny['width'] == 1
+    assert tiny['distance_between_peaks'] == 2
+
+    # Very slow reps on a short signal: the window stays shorter than the signal
+    short = cadence_parameters(600, num_frames=40)
+    assert short['window_length'] == 39
@@ -0,0 +1,139 @@
+import numpy as np
+import pytest
+
+import classifier
+from angles import LANDMARKS
+from classifier import ExerciseClassifier, load_classifier, window_features, window_frames
+from landmark_store import LandmarkSequence
+from train_classifier import clip_features, exercise_label, training_windows
+
+FPS = 30.0
+
+
+def exercise_clip(exercise, seconds=8.0, period=2.0, seed=0):
+    """
+    Synthetic lifter: a standing body with either the arms pressing overhead
+    or the knees bending, at a slightly different tempo and position per clip.
+    """
+    rng = np.random.default_rng(seed)
+    frames = int(seconds * FPS)
+    phase = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(frames) / (period * FPS * rng.uniform(0.8, 1.2)))
+    offset = rng.uniform(-0.1, 0.1)
+    landmarks = np.zeros((frames, 33, 4), dtype=np.float32)
+    landmarks[:, :, 3] = 1.0
+    for side, x in (('left', 0.45 + offset), ('right', 0.55 + offset)):
+        points = {'shoulder': (x, 0.3), 'elbow': (x, 0.4), 'wrist': (x, 0.5),
+                  'hip': (x, 0.55), 'knee': (x, 0.7), 'ankle': (x, 0.85)}
+        for name, (px, py) in points.items():
+            landmarks[:, LANDMARKS[f'{side}_{name}'], 0] = px
+            landmarks[:, LANDMARKS[f'{side}_{name}'], 1] = py
+        if exercise == 'shoulder_press':
+            landmarks[:, LANDMARKS[f'{side}_elbow'], 1] = 0.4 - 0.15 * phase
+            landmarks[:, LANDMARKS[f'{side}_wrist'], 1] = 0.35 - 0.25 * phase
+            landmarks[:, LANDMARKS[f'{side}_elbow'], 0] = x + (0.1 - 0.1 * phase) * (1 if side == 'right' else -1)
+        else:
+            landmarks[:, LANDMARKS[f'{side}_knee'], 0] = x + 0.12 * phase * (1 if side == 'right' else -1)
+            for name in ('shoulder', 'elbow', 'wrist', 'hip'):
+                landmarks[:, LANDMARKS[f'{side}_{name}'], 1] += 0.1 * phase
+    landmarks[:, LANDMARKS['nose'], :2] = (0.5 + offset, 0.2)
+    landmarks[:, :, :2] += 0.003 * rng.standard_normal((frames, 33, 2))
+    return LandmarkSequence(landmarks, np.arange(frames), {'fps': FPS, 'width': 1280, 'height': 720})
+
+
+@pytest.fixture(scope='module')
+def clips():
+    return [(exercise, f'{exercise}_{seed}.mov', exercise_clip(exercise, seed=seed))
+            for exercise in ('shoulder_press', 'squat') for seed in range(3)]
+
+
+@pytest.fixture(scope='module')
+def model(clips):
+    features, labels, _ = clip_features(clips)
+    return ExerciseClassifier.fit(features, labels)
+
+
+def test_window_features_batch_matches_single():
+    windows = training_windows(exercise_clip('squat'))
+    batched = window_features(windows, (1280, 720))
+    assert batched.shape[0] == len(windows)
+    np.testing.assert_allclose(batched[2], window_features(windows[2], (1280, 720)))
+    assert np.isfinite(batched).all()
+
+
+def test_window_features_ignore_position_and_size():
+    sequence = exercise_clip('shoulder_press')
+    window = np.array(sequence.landmarks[:90])
+    moved = window.copy()
+    moved[:, :, :2] = 0.2 + 0.5 * moved[:, :, :2]
+    np.testing.assert_allclose(window_features(window), window_features(moved), atol=1e-5)
+
+
+def test_fit_and_classify(model):
+    assert model.classes == ['shoulder_press', 'squat']
+    for seed in (10, 11):
+        for exercise in ('shoulder_press', 'squat'):
+            predicted, probability = model.classify(exercise_clip(exercise, seed=seed))
+            assert predicted == exercise
+            assert probability > classifier.MIN_CONFIDENCE
+
+
+def test_fit_needs_two_classes(clips):
+    features, labels, _ = clip_features(clips[:3])
+    with pytest.raises(ValueError):
+        ExerciseClassifier.fit(features, labels)
+
+
+def test_save_and_load(model, tmp_path):
+    path = str(tmp_path / 'model.npz')
+    model.save(path)
+    loaded = load_classifier(path)
+    assert loaded.classes == model.classes
+    assert loaded.window_seconds == model.window_seconds
+    features = window_features(training_windows(exercise_clip('squat', seed=5)), (1280, 720))
+    np.testing.assert_allclose(loaded.predict_proba(features), model.predict_proba(features))
+
+
+def test_load_rejects_other_feature_version(model, tmp_path, monkeypatch):
+    path = str(tmp_path / 'model.npz')
+    model.save(path)
+    monkeypatch.setattr(classifier, 'FEATURE_VERSION', classifier.FEATURE_VERSION + 1)
+    with pytest.raises(ValueError):
+        ExerciseClassifier.load(path)
+
+
+def test_load_classifier_options(model, tmp_path, monkeypatch):
+    assert load_classifier(False) is None
+    assert load_classifier(model) is model
+    monkeypatch.setattr(classifier, 'DEFAULT_MODEL_PATH', str(tmp_path / 'missing.npz'))
+    assert load_classifier() is None
+
+
+def test_training_windows_of_a_short_clip():
+    short = exercise_clip('squat', seconds=2.0)
+    windows = training_windows(short)
+    assert windows.shape == (0, window_frames(FPS), 33, 4)
+    features, labels, groups = clip_features([('squat', 'short.mov', short)])
+    assert len(features) == len(labels) == len(groups) == 0
+
+
+def test_training_windows_cover_the_clip():
+    windows = training_windows(exercise_clip('squat', seconds=8.0))
+    # 3 s windows every 0.5 s over 8 s
+    assert windows.shape == (11, 90, 33, 4)
+
+
+def test_exercise_label():
+    assert exercise_label('bad_squat') == 'squat'
+    assert exercise_label('good_shoulder_press') == 'shoulder_press'
+    assert exercise_label('pushup') == 'pushup'
+
+
+@pytest.mark.parametrize('exercise', ['shoulder_press', 'squat'])
+def test_processor_auto_detects_with_classifier(model, exercise, capsys):
+    from reps import ExerciseRepProcessor
+
+    processor = ExerciseRepProcessor(classifier=model)
+    # No exercise type: auto-detected from the first window
+    _, detected_type, _, _ = processor.count_reps(sequence=exercise_clip(exercise, seed=20))
+    assert detected_type == exercise
+    assert f"Classifier: {exercise}" in capsys.readouterr().out
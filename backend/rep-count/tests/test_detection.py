@@ -0,0 +1,34 @@
+import numpy as np
+
+from detection import detect_reps_batched, periodicity_score
+
+
+def rep_signal(reps, frames_per_rep=75, lead=30):
+    t = np.arange(reps * frames_per_rep)
+    signal = np.concatenate([np.zeros(lead), (1 - np.cos(2 * np.pi * t / frames_per_rep)) / 2, np.zeros(lead)])
+    return signal + 0.01 * np.random.default_rng(0).standard_normal(len(signal))
+
+
+def test_single_rep_is_counted():
+    signal = rep_signal(1)
+    # A joint that drifts but never turns has no peaks in either orientation
+    signals = {'drifting': np.linspace(0, 1, len(signal)), 'moving': signal}
+    best = detect_reps_batched(signals)
+    assert best is not None
+    assert best['name'] == 'moving'
+    assert best['count'] == 1
+    assert best['score'] == 0.0
+
+
+def test_no_peaks_returns_none():
+    assert detect_reps_batched({'flat': np.zeros(200)}) is None
+
+
+def test_periodic_reps_are_counted():
+    best = detect_reps_batched({'moving': rep_signal(4)})
+    assert best['count'] == 4
+    assert best['score'] > 0
+
+
+def test_periodicity_score_needs_two_peaks():
+    assert periodicity_score(np.ones(10), np.array([5]), np.array([1.0])) == 0.0
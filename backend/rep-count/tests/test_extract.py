@@ -0,0 +1,52 @@
+import os
+
+import cv2
+import pytest
+
+from reps import ExerciseRepProcessor
+
+VIDEO_PATH = os.path.join(os.path.dirname(__file__), '..', 'pose_data', 'good_shoulder_press', 'good_sp1.mov')
+
+
+class NoPose:
+    """Pose stand-in that finds nobody, so only decoding is exercised."""
+
+    class Results:
+        pose_landmarks = None
+
+    def process(self, frame):
+        return self.Results()
+
+    def reset(self):
+        pass
+
+
+@pytest.fixture(scope='module')
+def total_frames():
+    cap = cv2.VideoCapture(VIDEO_PATH)
+    frames = 0
+    while cap.grab():
+        frames += 1
+    cap.release()
+    return frames
+
+
+@pytest.mark.parametrize('pipelined', [False, True])
+@pytest.mark.parametrize('sampling', [None, 4])
+def test_frames_read_covers_the_video(total_frames, pipelined, sampling):
+    processor = ExerciseRepProcessor()
+    processor.pose = NoPose()
+    _, frames_read = processor.extract_landmarks(VIDEO_PATH, pipelined=pipelined, sampling=sampling)
+    if sampling is None:
+        assert frames_read == total_frames
+    else:
+        # Up to the end of the last stride step
+        assert total_frames <= frames_read < total_frames + sampling
+
+
+def test_frames_read_stops_at_end_frame():
+    processor = ExerciseRepProcessor()
+    processor.pose = NoPose()
+    _, frames_read = processor.extract_landmarks(VIDEO_PATH, start_frame=10, end_frame=50, pipelined=False,
+                                                 sampling=4)
+    assert frames_read == 40
@@ -0,0 +1,26 @@
+import os
+
+from features import FeatureStore
+from landmark_store import load_landmarks
+from reps import ExerciseRepProcessor
+
+POSE_PATH = os.path.join(os.path.dirname(__file__), '..', 'pose_data', 'good_shoulder_press',
+                         'good_sp1_pose_data.csv')
+
+
+def test_store_counts_hits_and_misses():
+    store = FeatureStore()
+    store.get(('a',), lambda: 1)
+    store.get(('a',), lambda: 1)
+    assert store.stats()['hits'] == 1 and store.stats()['misses'] == 1
+    store.reset_stats()
+    assert store.stats()['hits'] == 0 and store.stats()['misses'] == 0
+
+
+def test_stats_are_per_video():
+    processor = ExerciseRepProcessor()
+    sequence = load_landmarks(POSE_PATH)
+    processor.count_reps(sequence=sequence, exercise_type='shoulder_press')
+    first = processor.features.stats()
+    processor.count_reps(sequence=sequence, exercise_type='shoulder_press')
+    assert processor.features.stats() == first
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from landmark_store import (LandmarkBuffer, LandmarkSequence, concatenate_sequences, load_landmarks,
+                            pose_data_path, register_format, save_landmarks, STORE_FORMATS)
+
+
+def make_sequence(frames=20, first_frame=0, seed=0):
+    rng = np.random.default_rng(seed)
+    landmarks = rng.random((frames, 33, 4)).astype(np.float32)
+    return LandmarkSequence(landmarks, np.arange(first_frame, first_frame + frames, dtype=np.int32),
+                            {'fps': 30.0, 'width': 1920, 'height': 1080})
+
+
+@pytest.mark.parametrize('mmap', [True, False])
+def test_npz_round_trip(tmp_path, mmap):
+    sequence = make_sequence()
+    path = str(tmp_path / 'clip_pose_data.npz')
+    save_landmarks(path, sequence)
+    loaded = load_landmarks(path, mmap=mmap)
+    np.testing.assert_array_equal(loaded.landmarks, sequence.landmarks)
+    np.testing.assert_array_equal(loaded.frame_numbers, sequence.frame_numbers)
+    assert loaded.landmarks.dtype == np.float32
+    assert loaded.metadata == sequence.metadata
+    # Memory-mapped arrays are read-only views of the file
+    assert isinstance(loaded.landmarks.base, np.memmap) == mmap
+    assert loaded.landmarks.flags.writeable != mmap
+
+
+def test_npz_round_trip_of_empty_sequence(tmp_path):
+    path = str(tmp_path / 'empty.npz')
+    save_landmarks(path, LandmarkSequence(np.zeros((0, 33, 4), np.float32), np.zeros(0, np.int32)))
+    loaded = load_landmarks(path)
+    assert len(loaded) == 0
+    assert loaded.landmarks.shape == (0, 33, 4)
+
+
+def test_csv_round_trip(tmp_path):
+    sequence = make_sequence()
+    path = str(tmp_path / 'clip_pose_data.csv')
+    save_landmarks(path, sequence)
+    loaded = load_landmarks(path)
+    # CSV keeps full float32 precision but not the metadata
+    np.testing.assert_array_equal(loaded.landmarks, sequence.landmarks)
+    np.testing.assert_array_equal(loaded.frame_numbers, sequence.frame_numbers)
+    assert loaded.metadata == {'source_format': 'csv'}
+
+
+def test_dataframe_round_trip():
+    sequence = make_sequence()
+    df = sequence.to_dataframe()
+    assert df.shape == (20, 133)
+    np.testing.assert_array_equal(LandmarkSequence.from_dataframe(df).landmarks, sequence.landmarks)
+
+
+def test_concatenate_orders_by_frame():
+    late, early = make_sequence(5, first_frame=10, seed=1), make_sequence(5, first_frame=0, seed=2)
+    joined = concatenate_sequences([late, early], {'fps': 30.0})
+    np.testing.assert_array_equal(joined.frame_numbers, np.r_[0:5, 10:15])
+    np.testing.assert_array_equal(joined.landmarks[:5], early.landmarks)
+    np.testing.assert_array_equal(joined.landmarks[5:], late.landmarks)
+    assert joined.metadata == {'fps': 30.0}
+
+
+def test_buffer_grows_past_its_capacity():
+    sequence = make_sequence(10)
+    buffer = LandmarkBuffer(capacity=3)
+    for frame_number, landmarks in zip(sequence.frame_numbers, sequence.landmarks):
+        buffer.append(frame_number, landmarks)
+    captured = buffer.to_sequence()
+    np.testing.assert_array_equal(captured.landmarks, sequence.landmarks)
+    np.testing.assert_array_equal(captured.frame_numbers, sequence.frame_numbers)
+
+
+def test_rejects_wrong_shapes():
+    with pytest.raises(ValueError):
+        LandmarkSequence(np.zeros((4, 32, 4)), np.arange(4))
+    with pytest.raises(ValueError):
+        LandmarkSequence(np.zeros((4, 33, 4)), np.arange(3))
+
+
+def test_format_is_chosen_by_extension(tmp_path, monkeypatch):
+    with pytest.raises(ValueError):
+        save_landmarks(str(tmp_path / 'clip.json'), make_sequence())
+
+    monkeypatch.setitem(STORE_FORMATS, '.npy', STORE_FORMATS['.npz'])
+    written = []
+    register_format('.NPY', lambda path, sequence: written.append(path), None)
+    save_landmarks(str(tmp_path / 'clip.npy'), make_sequence())
+    assert written == [str(tmp_path / 'clip.npy')]
+
+
+def test_pose_data_path():
+    assert pose_data_path('videos/clip.mov') == 'videos/clip_pose_data.npz'
+    assert pose_data_path('videos/clip.mp4', '.csv') == 'videos/clip_pose_data.csv'
@@ -0,0 +1,110 @@
+import json
+
+import numpy as np
+import pytest
+
+from angles import LANDMARKS, joint_angles, joint_triple_indices
+from landmark_store import LandmarkSequence
+from metrics import METRIC_COLUMNS, rep_metrics, segment_rows, to_log_data
+
+FPS = 30.0
+
+
+def press_sequence(frames=120, period=40, metadata=None):
+    """Both arms pressing with a slight left/right offset, plus some jitter."""
+    rng = np.random.default_rng(0)
+    t = np.arange(frames)
+    landmarks = np.zeros((frames, 33, 4), dtype=np.float32)
+    landmarks[:, :, 3] = 1.0
+    for side, x, lag in (('left', 0.35, 0), ('right', 0.65, 2)):
+        phase = 0.5 - 0.5 * np.cos(2 * np.pi * (t - lag) / period)
+        landmarks[:, LANDMARKS[f'{side}_shoulder'], :2] = np.column_stack([np.full(frames, x), np.full(frames, 0.4)])
+        landmarks[:, LANDMARKS[f'{side}_elbow'], :2] = np.column_stack([x + 0.1 * (1 - phase), 0.45 - 0.1 * phase])
+        landmarks[:, LANDMARKS[f'{side}_wrist'], 0] = x + 0.01 * rng.standard_normal(frames)
+        landmarks[:, LANDMARKS[f'{side}_wrist'], 1] = 0.3 - 0.2 * phase
+        landmarks[:, LANDMARKS[f'{side}_hip'], :2] = (x, 0.8)
+    if metadata is None:
+        metadata = {'fps': FPS, 'width': 1280, 'height': 720}
+    return LandmarkSequence(landmarks, t, metadata)
+
+
+def reference_metrics(sequence, start, end):
+    """One rep's metrics computed directly from its rows."""
+    rows = (sequence.frame_numbers >= start) & (sequence.frame_numbers <= end)
+    landmarks = sequence.landmarks[rows].astype(np.float64)
+    sides = [joint_angles(landmarks[:, list(joint_triple_indices(LANDMARKS, 'elbow', side)), :2])
+             for side in ('left', 'right')]
+    scale = np.array([sequence.metadata['width'], sequence.metadata['height']])
+    bar = landmarks[:, [LANDMARKS['left_wrist'], LANDMARKS['right_wrist']], :2].mean(axis=1) * scale
+    shoulders = np.linalg.norm((landmarks[:, LANDMARKS['left_shoulder'], :2] -
+                                landmarks[:, LANDMARKS['right_shoulder'], :2]) * scale, axis=1)
+    across = np.linalg.eigvalsh(np.cov(bar.T, bias=True))[0]
+    return {
+        'duration_s': (end - start) / FPS,
+        'rom_left_deg': np.ptp(sides[0]),
+        'rom_right_deg': np.ptp(sides[1]),
+        'asymmetry_deg': np.abs(sides[0] - sides[1]).mean(),
+        'bar_path_deviation': np.sqrt(max(across, 0.0)) / shoulders.mean(),
+    }
+
+
+def test_segment_rows_with_shared_and_skipped_rows():
+    starts, stops = np.array([0, 4, 9]), np.array([5, 7, 12])
+    rows, offsets = segment_rows(starts, stops)
+    np.testing.assert_array_equal(rows, [0, 1, 2, 3, 4, 4, 5, 6, 9, 10, 11])
+    np.testing.assert_array_equal(offsets, [0, 5, 8])
+    # reduceat over the gathered rows gives each range's own reduction
+    values = np.arange(12.0) ** 2
+    np.testing.assert_allclose(np.add.reduceat(values[rows], offsets),
+                               [values[s:e].sum() for s, e in zip(starts, stops)])
+
+
+def test_segment_rows_single_range():
+    rows, offsets = segment_rows(np.array([3]), np.array([6]))
+    np.testing.assert_array_equal(rows, [3, 4, 5])
+    np.testing.assert_array_equal(offsets, [0])
+
+
+def test_metrics_match_per_rep_reference():
+    sequence = press_sequence()
+    boundaries = [(0, 40), (40, 80), (80, 119)]
+    metrics = rep_metrics(sequence, boundaries, 'shoulder_press')
+    np.testing.assert_array_equal(metrics['rep'], [1, 2, 3])
+    for i, (start, end) in enumerate(boundaries):
+        for column, expected in reference_metrics(sequence, start, end).items():
+            assert metrics[column][i] == pytest.approx(expected, rel=1e-6, abs=1e-9), column
+    # The press turns at full extension, halfway through each rep
+    np.testing.assert_allclose(metrics['concentric_s'] + metrics['eccentric_s'], metrics['duration_s'])
+
+
+def test_single_rep():
+    sequence = press_sequence()
+    metrics = rep_metrics(sequence, [(10, 50)], 'shoulder_press')
+    assert set(metrics) == set(METRIC_COLUMNS)
+    assert all(len(values) == 1 for values in metrics.values())
+    for column, expected in reference_metrics(sequence, 10, 50).items():
+        assert metrics[column][0] == pytest.approx(expected, rel=1e-6, abs=1e-9), column
+
+
+def test_zero_length_rep_is_dropped():
+    metrics = rep_metrics(press_sequence(), [(0, 40), (40, 40), (50, 90)], 'shoulder_press')
+    np.testing.assert_array_equal(metrics['rep'], [1, 3])
+    np.testing.assert_array_equal(metrics['start_frame'], [0, 50])
+
+
+def test_no_reps():
+    metrics = rep_metrics(press_sequence(), [], 'shoulder_press')
+    assert all(len(values) == 0 for values in metrics.values())
+    assert to_log_data(metrics)['reps'] == 0
+
+
+def test_bar_path_needs_frame_size(capsys):
+    metrics = rep_metrics(press_sequence(metadata={'fps': FPS}), [(0, 40), (40, 80)], 'shoulder_press')
+    assert np.isnan(metrics['bar_path_deviation']).all()
+    assert "frame size" in capsys.readouterr().out
+    # The other metrics do not depend on it
+    assert np.isfinite(metrics['rom_left_deg']).all()
+
+    log = to_log_data(metrics)
+    assert log['rep_metrics']['bar_path_deviation'] == [None, None]
+    json.loads(json.dumps(log), parse_constant=pytest.fail)
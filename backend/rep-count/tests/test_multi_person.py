@@ -0,0 +1,63 @@
+import numpy as np
+
+from multi_person import DUPLICATE_FRAMES, IoUTracker, box_iou, suppress_overlaps
+
+
+class StubPose:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def make_tracker(**options):
+    return IoUTracker(StubPose, **options)
+
+
+def test_box_iou():
+    iou = box_iou([[0, 0, 10, 10]], [[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]])
+    np.testing.assert_allclose(iou, [[1.0, 1 / 3, 0.0]])
+
+
+def test_suppress_overlaps_keeps_the_largest():
+    boxes = np.array([[0, 0, 10, 20], [1, 1, 11, 22], [50, 0, 60, 20]])
+    np.testing.assert_array_equal(suppress_overlaps(boxes, 0.3), [1, 2])
+    np.testing.assert_array_equal(suppress_overlaps(boxes[[0, 2]], 0.3), [0, 1])
+    assert len(suppress_overlaps(np.empty((0, 4)), 0.3)) == 0
+
+
+def test_double_detection_starts_one_track():
+    tracker = make_tracker()
+    tracker.update(np.array([[100, 100, 200, 400], [105, 95, 205, 410], [400, 100, 500, 400]]))
+    assert len(tracker.tracks) == 2
+    # The next frame's detections continue the same tracks
+    tracker.update(np.array([[102, 100, 202, 400], [398, 100, 498, 400]]))
+    assert [track.id for track in tracker.tracks] == [1, 2]
+
+
+def test_converged_tracks_are_merged():
+    tracker = make_tracker()
+    tracker.update(np.array([[100, 100, 200, 400], [400, 100, 500, 400]]))
+    first, second = tracker.tracks
+
+    # The second track drifts onto the first person
+    second.box = first.box + 2
+    for _ in range(DUPLICATE_FRAMES - 1):
+        tracker.merge_duplicates()
+    assert len(tracker.tracks) == 2
+    tracker.merge_duplicates()
+    assert tracker.tracks == [first]
+    assert second.pose.closed
+    assert tracker.close() == [first]
+
+
+def test_overlap_must_be_consecutive():
+    tracker = make_tracker()
+    tracker.update(np.array([[100, 100, 200, 400], [400, 100, 500, 400]]))
+    first, second = tracker.tracks
+    for frame in range(3 * DUPLICATE_FRAMES):
+        # Two people crossing paths briefly, every other frame
+        second.box = first.box + 2 if frame % 2 else np.array([400, 100, 500, 400.0])
+        tracker.merge_duplicates()
+    assert len(tracker.tracks) == 2
@@ -0,0 +1,110 @@
+import os
+import shutil
+import time
+
+import numpy as np
+import pytest
+
+import pose_cache
+from landmark_store import LandmarkSequence, read_npz, write_npz
+from pose_cache import PoseCache
+
+SETTINGS = {'pose_options': {'model_complexity': 1}, 'resize': None}
+
+
+def make_sequence(seed=0, frames=50):
+    rng = np.random.default_rng(seed)
+    return LandmarkSequence(rng.random((frames, 33, 4)).astype(np.float32), np.arange(frames), {'fps': 30.0})
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / 'clip.mov'
+    path.write_bytes(b'not really a video' * 100)
+    return str(path)
+
+
+def set_age(path, seconds):
+    stamp = time.time() - seconds
+    os.utime(path, (stamp, stamp))
+
+
+def test_key_follows_content_and_settings(tmp_path, video):
+    cache = PoseCache(str(tmp_path / 'cache'))
+    copy = str(tmp_path / 'renamed.mp4')
+    shutil.copy(video, copy)
+    assert cache.key(video, SETTINGS) == cache.key(copy, SETTINGS)
+    assert cache.key(video, SETTINGS) != cache.key(video, dict(SETTINGS, resize='letterbox'))
+
+
+def test_put_and_get(tmp_path, video):
+    cache = PoseCache(str(tmp_path / 'cache'))
+    key = cache.key(video, SETTINGS)
+    assert cache.get(key) is None
+
+    sequence = make_sequence()
+    cache.put(key, sequence)
+    cached = cache.get(key)
+    np.testing.assert_array_equal(cached.landmarks, sequence.landmarks)
+    np.testing.assert_array_equal(cached.frame_numbers, sequence.frame_numbers)
+    assert cached.metadata['fps'] == 30.0
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+    assert cache.stats()['entries'] == 1
+
+
+def test_corrupt_entry_is_discarded(tmp_path):
+    cache = PoseCache(str(tmp_path / 'cache'))
+    cache.put('entry', make_sequence())
+    path = cache._path('entry')
+
+    # Rewrite the arrays but keep the stored checksum
+    stored = read_npz(path, mmap=False)
+    stored.landmarks[3, 5, 0] += 0.5
+    write_npz(path, stored)
+
+    assert cache.get('entry') is None
+    assert not os.path.exists(path)
+    assert cache.misses == 1
+
+
+def test_unreadable_entry_is_discarded(tmp_path):
+    cache = PoseCache(str(tmp_path / 'cache'))
+    cache.put('entry', make_sequence())
+    with open(cache._path('entry'), 'r+b') as f:
+        f.truncate(100)
+    assert cache.get('entry') is None
+    assert not os.path.exists(cache._path('entry'))
+
+
+def test_failed_write_leaves_no_entry(tmp_path, monkeypatch):
+    cache = PoseCache(str(tmp_path / 'cache'))
+    cache.put('entry', make_sequence(seed=1))
+
+    def write_then_fail(f, sequence):
+        f.write(b'partial')
+        raise OSError("disk full")
+
+    monkeypatch.setattr(pose_cache, 'write_npz', write_then_fail)
+    with pytest.raises(OSError):
+        cache.put('entry', make_sequence(seed=2))
+    # The old entry is untouched and no temporary file is left behind
+    assert os.listdir(cache.cache_dir) == ['entry.npz']
+    np.testing.assert_array_equal(cache.get('entry').landmarks, make_sequence(seed=1).landmarks)
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = PoseCache(str(tmp_path / 'cache'))
+    cache.put('a', make_sequence(seed=1))
+    entry_size = os.path.getsize(cache._path('a'))
+    cache.max_bytes = int(2.5 * entry_size)
+
+    set_age(cache._path('a'), 100)
+    cache.put('b', make_sequence(seed=2))
+    set_age(cache._path('b'), 50)
+    # A hit makes 'a' the most recently used
+    assert cache.get('a') is not None
+    cache.put('c', make_sequence(seed=3))
+
+    assert sorted(os.listdir(cache.cache_dir)) == ['a.npz', 'c.npz']
+    assert cache.stats()['bytes'] <= cache.max_bytes
@@ -0,0 +1,20 @@
+import os
+import subprocess
+import sys
+
+REP_COUNT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_counting_stored_pose_data_does_not_load_mediapipe():
+    # A fresh interpreter, since other tests may have imported MediaPipe already
+    script = (
+        "import sys\n"
+        "from reps import ExerciseRepProcessor\n"
+        "processor = ExerciseRepProcessor(classifier=False)\n"
+        "processor.reset_tracking()\n"
+        "count, _, _, _ = processor.count_reps(pose_path=sys.argv[1], exercise_type='shoulder_press')\n"
+        "assert count > 0\n"
+        "assert 'mediapipe' not in sys.modules\n"
+    )
+    pose_path = os.path.join(REP_COUNT_DIR, 'pose_data', 'good_shoulder_press', 'good_sp1_pose_data.csv')
+    subprocess.run([sys.executable, '-c', script, pose_path], cwd=REP_COUNT_DIR, check=True)
@@ -0,0 +1,38 @@
+import numpy as np
+
+from resolution import RegionOfInterest
+
+FRAME = np.zeros((480, 640, 3), dtype=np.uint8)
+
+
+def pose(x, y, visibility=1.0):
+    landmarks = np.zeros((33, 4))
+    landmarks[:, 0] = x
+    landmarks[:, 1] = y
+    landmarks[:, 3] = visibility
+    return landmarks
+
+
+def test_crops_around_the_pose():
+    roi = RegionOfInterest()
+    roi.crop(FRAME)
+    landmarks = pose(np.linspace(0.4, 0.6, 33), np.linspace(0.3, 0.7, 33))
+    roi.update(landmarks)
+    assert roi.box is not None
+    assert roi.crop(FRAME).shape[:2] == (roi.box[3] - roi.box[1], roi.box[2] - roi.box[0])
+
+
+def test_landmarks_clipped_to_one_edge_fall_back_to_full_frame():
+    roi = RegionOfInterest()
+    roi.crop(FRAME)
+    # Every landmark beyond the right edge: clipped to x = 1, zero width
+    roi.update(pose(np.linspace(1.1, 1.3, 33), np.linspace(0.3, 0.7, 33)))
+    assert roi.box is None
+    assert roi.crop(FRAME).shape == FRAME.shape
+
+
+def test_landmarks_clipped_to_a_corner_fall_back_to_full_frame():
+    roi = RegionOfInterest()
+    roi.crop(FRAME)
+    roi.update(pose(np.full(33, -0.2), np.full(33, 1.5)))
+    assert roi.box is None
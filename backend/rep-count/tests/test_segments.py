@@ -0,0 +1,71 @@
+import os
+
+import numpy as np
+import pytest
+
+import segments
+from reps import ExerciseRepProcessor
+
+VIDEO_PATH = os.path.join(os.path.dirname(__file__), '..', 'pose_data', 'good_shoulder_press', 'good_sp1.mov')
+
+# Largest x/y difference from a serial pass documented by extract_landmarks_parallel
+TOLERANCE = 0.04
+
+
+class Landmark:
+    def __init__(self, x, y):
+        self.x, self.y, self.z, self.visibility = x, y, 0.0, 1.0
+
+
+class TrackingPose:
+    """
+    Pose stand-in whose landmarks depend on the frame and on the frames before
+    it, like MediaPipe's landmark smoothing, so segment warm-up matters.
+    """
+
+    class Results:
+        def __init__(self, landmark):
+            self.pose_landmarks = self
+            self.landmark = landmark
+
+    def __init__(self):
+        self.state = np.zeros(3)
+
+    def process(self, frame):
+        # Settles on the frame's mean colour over a few frames after a reset
+        self.state = 0.5 * self.state + 0.5 * frame.mean(axis=(0, 1)) / 255
+        return self.Results([Landmark(self.state[0], self.state[1])] * 33)
+
+    def reset(self):
+        self.state = np.zeros(3)
+
+
+def init_tracking_worker(pose_options):
+    # Runs in the spawned worker processes in place of segments._init_worker
+    segments._processor = ExerciseRepProcessor(**pose_options)
+    segments._processor.pose = TrackingPose()
+
+
+@pytest.mark.parametrize('total_frames, count', [(209, 4), (10, 3), (7, 7), (5, 8)])
+def test_plan_segments_covers_every_frame_once(total_frames, count):
+    ranges = segments.plan_segments(total_frames, count)
+    assert len(ranges) == min(count, total_frames)
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] is None
+    for (_, end), (start, _) in zip(ranges[:-1], ranges[1:]):
+        assert end == start
+    assert all(start < end for start, end in ranges[:-1])
+
+
+def test_stitched_segments_match_serial(monkeypatch):
+    serial_processor = ExerciseRepProcessor()
+    serial_processor.pose = TrackingPose()
+    serial, serial_frames = serial_processor.extract_landmarks(VIDEO_PATH, pipelined=False)
+
+    monkeypatch.setattr(segments, '_init_worker', init_tracking_worker)
+    stitched, stitched_frames = segments.extract_landmarks_parallel(
+        VIDEO_PATH, len(serial), 3, warmup_frames=30, workers=2, pipelined=False)
+
+    assert stitched_frames == serial_frames
+    np.testing.assert_array_equal(stitched.frame_numbers, serial.frame_numbers)
+    assert np.abs(stitched.landmarks[:, :, :2] - serial.landmarks[:, :, :2]).max() <= TOLERANCE
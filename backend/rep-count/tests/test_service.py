@@ -0,0 +1,96 @@
+import asyncio
+import json
+from concurrent.futures import Future
+
+import pytest
+
+import service
+
+
+class StubPool:
+    """Stands in for ProcessorPool: finishes every job at once with a fixed result."""
+
+    def __init__(self, workers, preset, cache_dir, max_jobs_per_worker):
+        self.restarts = 0
+        self.submitted = []
+
+    def start(self):
+        return [{'pid': 0, 'init_seconds': 0.0, 'jobs': 0}]
+
+    def submit(self, video_path, exercise_type, timeout, extract_options=None):
+        self.submitted.append((video_path, exercise_type, timeout))
+        future = Future()
+        future.set_result({'status': 'ok', 'count': 3, 'exercise_type': exercise_type,
+                           'peaks': [26, 104, 179], 'boundaries': [[7, 62], [62, 136], [136, 208]],
+                           'seconds': 0.1})
+        return future
+
+    def shutdown(self, wait=True):
+        pass
+
+
+async def request(port, method, path, body=b'', headers=None):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    headers = {'Content-Length': str(len(body)), **(headers or {})}
+    head = f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+    head += ''.join(f"{name}: {value}\r\n" for name, value in headers.items())
+    writer.write(head.encode() + b'\r\n' + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    status_line, _, rest = response.partition(b'\r\n')
+    _, _, payload = rest.partition(b'\r\n\r\n')
+    return int(status_line.split()[1]), payload
+
+
+def run_service(tmp_path, scenario, **options):
+    async def main():
+        rep_service = service.RepCountService(upload_dir=str(tmp_path), workers=1, **options)
+        server = await rep_service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await scenario(rep_service, port)
+        finally:
+            server.close()
+            await server.wait_closed()
+            await rep_service.stop()
+
+    return asyncio.run(main())
+
+
+@pytest.fixture(autouse=True)
+def stub_pool(monkeypatch):
+    monkeypatch.setattr(service, 'ProcessorPool', StubPool)
+
+
+def test_submit_result_and_events(tmp_path):
+    async def scenario(rep_service, port):
+        status, body = await request(port, 'POST', '/jobs?exercise_type=shoulder_press&ext=.mov', b'video')
+        assert status == 202
+        job_id = json.loads(body)['id']
+
+        await asyncio.wait_for(rep_service.queue.join(), 5)
+        status, body = await request(port, 'GET', f'/jobs/{job_id}/result')
+        assert status == 200
+        result = json.loads(body)
+        assert result['status'] == 'ok'
+        assert result['count'] == len(result['boundaries']) == 3
+
+        status, body = await request(port, 'GET', f'/jobs/{job_id}/events')
+        assert status == 200
+        events = [json.loads(line) for line in body.splitlines()]
+        assert events[-1]['status'] == 'ok'
+        return rep_service.pool.submitted
+
+    submitted = run_service(tmp_path, scenario, timeout=5.0)
+    assert submitted[0][1:] == ('shoulder_press', 5.0)
+
+
+@pytest.mark.parametrize('length', ['abc', '-1'])
+def test_malformed_content_length(tmp_path, length):
+    async def scenario(rep_service, port):
+        return await request(port, 'POST', '/jobs', b'', {'Content-Length': length})
+
+    status, body = run_service(tmp_path, scenario)
+    assert status == 400
+    assert 'Content-Length' in json.loads(body)['error']
@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+import pytest
+from scipy.signal import savgol_filter
+
+from reps import ExerciseRepProcessor
+from streaming import StreamingRepCounter
+
+POSE_DIR = os.path.join(os.path.dirname(__file__), '..', 'pose_data', 'good_shoulder_press')
+
+
+class RecordingCounter(StreamingRepCounter):
+    """Keeps every smoothed sample for comparison with the batch filter."""
+
+    def reset(self):
+        super().reset()
+        self.history = []
+
+    def _push_smoothed(self, value, frame_number):
+        if frame_number is not None:
+            self.history.append(value)
+        return super()._push_smoothed(value, frame_number)
+
+
+def stream(counter, sequence):
+    events = []
+    for landmarks, frame_number in zip(sequence.landmarks, sequence.frame_numbers):
+        events.extend(counter.update(landmarks, frame_number))
+    return events + counter.flush()
+
+
+@pytest.mark.parametrize('window_length', [5, 15, 31])
+def test_smoothing_coefficients_sum_to_one(window_length):
+    counter = StreamingRepCounter(window_length=window_length)
+    np.testing.assert_allclose(counter.coeffs.sum(axis=1), 1.0)
+
+
+def test_smoothing_matches_batch_filter():
+    from landmark_store import LandmarkSequence
+
+    t = np.arange(200)
+    landmarks = np.zeros((len(t), 33, 4), dtype=np.float32)
+    landmarks[:, 16, 1] = 0.5 + 0.2 * np.sin(2 * np.pi * t / 60) + 0.01 * np.cos(t)
+    counter = RecordingCounter('shoulder_press')
+    stream(counter, LandmarkSequence(landmarks, t))
+    expected = savgol_filter(-landmarks[:, 16, 1].astype(np.float64), 15, 3)
+    np.testing.assert_allclose(counter.history, expected, atol=1e-6)
+
+
+@pytest.mark.parametrize('clip', ['good_sp1', 'good_sp2'])
+def test_streaming_count_matches_batch(clip):
+    from landmark_store import load_landmarks
+
+    pose_path = os.path.join(POSE_DIR, f'{clip}_pose_data.csv')
+    events = stream(StreamingRepCounter('shoulder_press'), load_landmarks(pose_path))
+
+    # Same fixed settings on the raw landmarks as the streaming counter
+    count, _, _, peaks = ExerciseRepProcessor(auto_tune=False, repair=False, classifier=False).count_reps(
+        pose_path=pose_path, exercise_type='shoulder_press')
+    stream_peaks = [event['peak_index'] for event in events]
+    # Documented tolerance: every batch peak at the same frame, count within one rep
+    assert set(peaks) <= set(stream_peaks)
+    assert abs(len(events) - count) <= 1
+    assert [event['rep'] for event in events] == list(range(1, len(events) + 1))
+    assert all(event['detected_at'] - event['peak_index'] == StreamingRepCounter().latency for event in events)
@@ -0,0 +1,167 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from classifier import (DEFAULT_MODEL_PATH, WINDOW_SECONDS, ExerciseClassifier, sequence_scale,
+                        window_features, window_frames)
+from landmark_store import STORE_FORMATS, load_landmarks, pose_data_path
+from presets import DEFAULT_PRESET, POSE_PRESETS
+
+VIDEO_EXTENSIONS = ('.mov', '.mp4')
+
+# Folder name prefixes that grade form rather than name the exercise
+FORM_PREFIXES = ('good_', 'bad_')
+
+
+def exercise_label(folder_name):
+    """
+    Exercise type for a pose_data folder, e.g. 'bad_squat' -> 'squat'.
+    """
+    for prefix in FORM_PREFIXES:
+        if folder_name.startswith(prefix):
+            return folder_name[len(prefix):]
+    return folder_name
+
+
+def collect_sequences(pose_root, extract=False, preset=DEFAULT_PRESET):
+    """
+    Load the stored pose data of every clip under pose_root/<exercise folder>/.
+
+    Args:
+        pose_root (str): Folder of per-exercise folders (e.g. pose_data)
+        extract (bool): Extract pose data for videos that have none stored
+            (written next to the video)
+        preset (str): Pose preset used for extraction
+
+    Returns:
+        list: (exercise type, clip path, LandmarkSequence) per clip
+    """
+    processor = None
+    clips = []
+    for folder in sorted(os.listdir(pose_root)):
+        folder_path = os.path.join(pose_root, folder)
+        if not os.path.isdir(folder_path):
+            continue
+        label = exercise_label(folder)
+        for filename in sorted(os.listdir(folder_path)):
+            if not filename.lower().endswith(VIDEO_EXTENSIONS):
+                continue
+            video_path = os.path.join(folder_path, filename)
+            stored = [pose_data_path(video_path, ext) for ext in STORE_FORMATS
+                      if os.path.exists(pose_data_path(video_path, ext))]
+            if stored:
+                sequence = load_landmarks(stored[0])
+            elif extract:
+                if processor is None:
+                    from reps import ExerciseRepProcessor
+                    processor = ExerciseRepProcessor(preset)
+                processor.reset_tracking()
+                sequence = processor.extract_poses(video_path)
+            else:
+                continue
+            if sequence is not None and len(sequence):
+                clips.append((label, video_path, sequence))
+    return clips
+
+
+def training_windows(sequence, window_seconds=WINDOW_SECONDS, stride_seconds=0.5):
+    """
+    Overlapping windows over a clip, so every part of it is seen as a start.
+
+    Args:
+        sequence (LandmarkSequence): Pose data of one clip
+        window_seconds (float): Window length
+        stride_seconds (float): Offset between consecutive windows
+
+    Returns:
+        np.array: (windows, frames, 33, 4), empty if the clip is too short
+    """
+    fps = (sequence.metadata or {}).get('fps')
+    length = window_frames(fps, window_seconds)
+    stride = window_frames(fps, stride_seconds)
+    landmarks = np.asarray(sequence.landmarks)
+    if len(landmarks) < length:
+        return np.empty((0, length) + landmarks.shape[1:], dtype=landmarks.dtype)
+    views = np.lib.stride_tricks.sliding_window_view(landmarks, length, axis=0)[::stride]
+    return np.moveaxis(views, -1, 1)
+
+
+def clip_features(clips, window_seconds=WINDOW_SECONDS, stride_seconds=0.5):
+    """
+    Features, labels and clip index of every training window.
+    """
+    features, labels, groups = [], [], []
+    for index, (label, _, sequence) in enumerate(clips):
+        windows = training_windows(sequence, window_seconds, stride_seconds)
+        if not len(windows):
+            continue
+        features.append(window_features(windows, sequence_scale(sequence)))
+        labels += [label] * len(windows)
+        groups += [index] * len(windows)
+    if not features:
+        return np.empty((0, 0)), np.array(labels), np.array(groups)
+    return np.concatenate(features), np.array(labels), np.array(groups)
+
+
+def leave_one_clip_out(features, labels, groups, window_seconds):
+    """
+    Accuracy on each clip's windows with that clip held out of training.
+    """
+    correct = 0
+    for group in np.unique(groups):
+        held_out = groups == group
+        if len(np.unique(labels[~held_out])) < 2:
+            continue
+        model = ExerciseClassifier.fit(features[~held_out], labels[~held_out], window_seconds)
+        predicted = np.array(model.classes)[model.predict_proba(features[held_out]).argmax(axis=1)]
+        correct += int((predicted == labels[held_out]).sum())
+    return correct / len(labels)
+
+
+def main(pose_root, output, window_seconds, stride_seconds, extract, preset, repeats):
+    clips = collect_sequences(pose_root, extract, preset)
+    features, labels, groups = clip_features(clips, window_seconds, stride_seconds)
+    classes, counts = np.unique(labels, return_counts=True)
+    print(f"{len(labels)} windows of {window_seconds:g}s from {len(clips)} clips")
+    for label, count in zip(classes, counts):
+        print(f"  {label}: {count} windows")
+    if len(classes) < 2:
+        print("Training needs pose data of at least two exercise types (one folder each under "
+              f"{pose_root}); no model written")
+        return None
+
+    accuracy = leave_one_clip_out(features, labels, groups, window_seconds)
+    print(f"Leave-one-clip-out window accuracy: {100 * accuracy:.1f}%")
+
+    model = ExerciseClassifier.fit(features, labels, window_seconds)
+    model.save(output)
+    print(f"Saved model to {output}")
+
+    # Per-window inference cost, feature extraction included
+    _, _, sequence = clips[0]
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.classify(sequence)
+        best = min(best, time.perf_counter() - start)
+    print(f"Inference: {1e3 * best:.3f} ms per window")
+    return model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the exercise classifier on the clips under pose_data.")
+    parser.add_argument("pose_root", type=str, nargs='?', default="pose_data",
+                        help="Folder with one subfolder of clips per exercise (good_/bad_ prefixes are ignored)")
+    parser.add_argument("--output", type=str, default=DEFAULT_MODEL_PATH, help="Where to save the model")
+    parser.add_argument("--window", type=float, default=WINDOW_SECONDS, help="Window length in seconds")
+    parser.add_argument("--stride", type=float, default=0.5, help="Seconds between training windows")
+    parser.add_argument("--extract", action="store_true",
+                        help="Extract pose data for videos that have none stored yet")
+    parser.add_argument("--preset", type=str, default=DEFAULT_PRESET, choices=list(POSE_PRESETS),
+                        help="Pose model preset for --extract")
+    parser.add_argument("--repeats", type=int, default=50, help="Timing repeats (best is reported)")
+
+    args = parser.parse_args()
+    main(args.pose_root, args.output, args.window, args.stride, args.extract, args.preset, args.repeats)